@@ -0,0 +1,4 @@
+from tests.env import apply_test_env
+
+# 벤치마크도 실제 AWS/DB 설정 없이 core 모듈을 import 할 수 있도록 테스트 설정값 사용
+apply_test_env()
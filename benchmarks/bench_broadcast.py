@@ -0,0 +1,103 @@
+# 같은 이벤트를 여러 연결에 보낼 때 인코딩 재사용 효과 (수신자 50/500/5000명)
+# sio_server.emit 은 수신자마다 패킷을 직렬화하고, Broadcaster 는 한 번만 인코딩해 재사용
+# engine.io 소켓은 전송 내용을 버리는 가짜 소켓으로 바꾸므로 직렬화/전송 호출 비용만 측정
+# 실행: python -m benchmarks.bench_broadcast
+import asyncio
+import time
+
+import benchmarks  # noqa: F401
+from core.broadcast import Broadcaster
+from sockets.sockets import sio_server
+
+RECIPIENTS = (50, 500, 5000)
+PAYLOADS = {
+    "movement": {
+        "client_id": "client00001",
+        "position_x": 100,
+        "position_y": 200,
+        "direction": 1,
+        "user_name": "user00001",
+    },
+    "picture 200KB": {"client_id": "client00001", "picture": "A" * 200_000, "seq": 3},
+}
+
+
+class NullSocket:
+    closed = False
+
+    async def send(self, packet):
+        pass
+
+
+def connect(count, room):
+    sids = []
+    for number in range(count):
+        eio_sid = f"{room}-eio{number}"
+        sio_server.eio.sockets[eio_sid] = NullSocket()
+        sid = sio_server.manager.connect(eio_sid, "/")
+        sio_server.enter_room(sid, room)
+        sids.append(sid)
+    return sids
+
+
+async def per_round_ms(func, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await func()
+    return (time.perf_counter() - started) / rounds * 1e3
+
+
+async def bench(label, payload, count):
+    room = f"{label}-{count}"
+    sids = connect(count, room)
+    cached = Broadcaster(max_entries=256, max_bytes=1048576, local=True)
+    uncached = Broadcaster(max_entries=0, max_bytes=0, local=True)
+    for broadcaster in (cached, uncached):
+        broadcaster.configure(sio_server)
+    rounds = max(1, (20_000 if label == "movement" else 500) // count)
+
+    async def sio_room_emit():
+        await sio_server.emit("EV", payload, room=room)
+
+    async def broadcaster_room_emit():
+        await cached.emit("EV", payload, room=room)
+
+    async def sio_per_sid():
+        for sid in sids:
+            await sio_server.emit("EV", payload, to=sid)
+
+    async def broadcaster_per_sid(broadcaster):
+        for sid in sids:
+            await broadcaster.send(sid, "EV", payload)
+
+    results = (
+        await per_round_ms(sio_room_emit, rounds),
+        await per_round_ms(broadcaster_room_emit, rounds),
+        await per_round_ms(sio_per_sid, rounds),
+        await per_round_ms(lambda: broadcaster_per_sid(uncached), rounds),
+        await per_round_ms(lambda: broadcaster_per_sid(cached), rounds),
+    )
+    print(
+        f"  {label:<14} {count:5d}  "
+        + "  ".join(f"{result:10.2f}" for result in results)
+    )
+
+    for sid in sids:
+        await sio_server.manager.disconnect(sid, "/")
+    for number in range(count):
+        sio_server.eio.sockets.pop(f"{room}-eio{number}", None)
+
+
+async def main():
+    print("ms per fan-out")
+    print(
+        f"  {'payload':<14} {'n':>5}  {'sio room':>10}  {'bc room':>10}"
+        f"  {'sio to=sid':>10}  {'bc send':>10}  {'bc cached':>10}"
+    )
+    for label, payload in PAYLOADS.items():
+        for count in RECIPIENTS:
+            await bench(label, payload, count)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+# 연결당 클라이언트 상태 메모리 비교 (10k 연결)
+# 이전 구조: __dict__ 를 가진 일반 클래스에 클라이언트가 보낸 문자열 좌표를 그대로 저장
+# 현재 구조: __slots__ 레코드에 정수로 변환한 좌표 저장, 선택적으로 PositionStore 배열 사용
+# 실행: python -m benchmarks.bench_client_state
+import gc
+import time
+import tracemalloc
+
+import benchmarks  # noqa: F401
+from core.positions import PositionStore
+from sockets.sockets import client_info
+
+CLIENTS = 10_000
+
+
+class LegacyClientInfo:
+    def __init__(self, sid):
+        self.client_id = None
+        self.user_name = None
+        self.position_x = None
+        self.position_y = None
+        self.direction = None
+        self.room_type = None
+        self.room_id = None
+        self.sid = sid
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objects, (after - before) / CLIENTS
+
+
+def build_legacy():
+    store = {}
+    for number in range(CLIENTS):
+        client = LegacyClientInfo(f"sid{number}")
+        client.user_name = f"user{number}"
+        client.position_x = str(350.0 + number % 500)
+        client.position_y = str(170.0 + number % 300)
+        client.direction = "1"
+        store[f"client{number}"] = client
+    return store
+
+
+def build_slotted():
+    store = {}
+    for number in range(CLIENTS):
+        client = client_info(f"sid{number}")
+        client.user_name = f"user{number}"
+        client.set_position(350 + number % 500, 170 + number % 300, 1)
+        store[f"client{number}"] = client
+    return store
+
+
+def build_position_store():
+    store = PositionStore(cell_size=300, capacity=CLIENTS)
+    for number in range(CLIENTS):
+        store.set(f"client{number}", "lobby", 350 + number % 500, 170 + number % 300)
+    return store
+
+
+def time_broadcast_reads(store, convert):
+    started = time.perf_counter()
+    for client in store.values():
+        convert(client.position_x), convert(client.position_y), convert(
+            client.direction
+        )
+    return (time.perf_counter() - started) / CLIENTS * 1e9
+
+
+def main():
+    legacy, legacy_bytes = measure(build_legacy)
+    slotted, slotted_bytes = measure(build_slotted)
+    _, store_bytes = measure(build_position_store)
+
+    print(f"{CLIENTS} clients, bytes per connection (tracemalloc)")
+    print(f"  legacy __dict__ record, string fields : {legacy_bytes:8.1f}")
+    print(f"  __slots__ record, int fields          : {slotted_bytes:8.1f}")
+    print(f"  PositionStore slot (arrays + maps)    : {store_bytes:8.1f}")
+    legacy_read = time_broadcast_reads(legacy, lambda value: int(float(value)))
+    slotted_read = time_broadcast_reads(slotted, lambda value: value)
+    print("per-recipient coordinate read (ns)")
+    print(f"  legacy int(float(...))                : {legacy_read:8.1f}")
+    print(f"  pre-parsed ints                       : {slotted_read:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
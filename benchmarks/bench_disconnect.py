@@ -0,0 +1,148 @@
+# 한 방에 있는 5k 클라이언트의 동시 연결 해제 처리 시간
+# sid -> client_id 역방향 인덱스와 이전 방식(client_info_store 전체 순회)을 비교
+# Redis 는 fakeredis 로 대체하고 전송은 횟수만 셈
+# fakeredis 트랜잭션 비용이 커서, 연결 해제 batch 를 실행하지 않는 경우(프로세스 안의 처리 비용)도 함께 측정
+# 실행: python -m benchmarks.bench_disconnect
+import asyncio
+import contextlib
+import io
+import random
+import time
+from contextlib import asynccontextmanager
+
+import fakeredis
+
+import benchmarks  # noqa: F401
+import sockets.sockets as ss
+from core.movement import apply_movement, interest_manager, sector_registry
+from core.redis import RedisBatch
+from core.room_cache import add_to_room
+
+CLIENTS = 5_000
+ROOM_ID = "lobby"
+
+
+# 이전 방식: 모든 클라이언트를 순회하며 sid 비교
+def find_key_by_sid_linear(sid_to_find):
+    for client_id, client in ss.client_info_store.items():
+        if client.sid == sid_to_find:
+            return client_id
+    return None
+
+
+async def populate(redis_client):
+    rng = random.Random(0)
+    for number in range(CLIENTS):
+        client_id = f"client{number}"
+        sid = f"sid{number}"
+        ss.client_info_store[client_id] = ss.client_info(sid)
+        ss.bind_sid(client_id, sid)
+        client = ss.client_info_store[client_id]
+        client.user_name = f"user{number}"
+        client.room_type = "lobby"
+        client.room_id = ROOM_ID
+        client.set_position(rng.randrange(0, 15000), rng.randrange(0, 15000), 1)
+        apply_movement(client_id, ROOM_ID, client.position_x, client.position_y)
+        await add_to_room(ROOM_ID, client_id, redis_client)
+
+
+# 명령을 기록만 하고 실행하지 않는 redis_batch
+@asynccontextmanager
+async def null_redis_batch(redis_client, transaction=True):
+    yield RedisBatch(redis_client, transaction=transaction)
+
+
+def reset():
+    ss.client_info_store.clear()
+    ss.sid_to_client_id.clear()
+    sector_registry.rooms.clear()
+    sector_registry.client_rooms.clear()
+    interest_manager.views.clear()
+    interest_manager.viewers.clear()
+
+
+async def run_disconnects(find_key_by_sid, batch_factory):
+    redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    async def fake_get_redis():
+        yield redis_client
+
+    sent = 0
+
+    async def count_emit_to_client(target_client, packet, event="SC_MOVEMENT_INFO"):
+        nonlocal sent
+        sent += 1
+
+    async def count_room_emit(event, data, room_id, skip_sid=None):
+        nonlocal sent
+        sent += 1
+
+    ss.get_redis = fake_get_redis
+    ss.find_key_by_sid = find_key_by_sid
+    ss.redis_batch = batch_factory
+    ss.emit_to_client = count_emit_to_client
+    ss.emit_to_room = count_room_emit
+
+    reset()
+    await populate(redis_client)
+    sids = [f"sid{number}" for number in range(CLIENTS)]
+    random.Random(1).shuffle(sids)
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(ss.disconnect(sid) for sid in sids))
+    elapsed = time.perf_counter() - started
+
+    assert not ss.client_info_store and not ss.sid_to_client_id
+    return elapsed, sent
+
+
+def time_lookups(find_key_by_sid):
+    reset()
+    for number in range(CLIENTS):
+        client_id = f"client{number}"
+        ss.client_info_store[client_id] = ss.client_info(f"sid{number}")
+        ss.bind_sid(client_id, f"sid{number}")
+    started = time.perf_counter()
+    for number in range(CLIENTS):
+        find_key_by_sid(f"sid{number}")
+    return time.perf_counter() - started
+
+
+def main():
+    indexed_lookup = ss.find_key_by_sid
+    originals = (
+        ss.get_redis,
+        ss.find_key_by_sid,
+        ss.redis_batch,
+        ss.emit_to_client,
+        ss.emit_to_room,
+    )
+    try:
+        print(f"{CLIENTS} sid lookups (s)")
+        print(f"  linear scan           : {time_lookups(find_key_by_sid_linear):8.4f}")
+        print(f"  sid_to_client_id index: {time_lookups(indexed_lookup):8.4f}")
+
+        print(f"{CLIENTS} concurrent disconnects in one room (s, emits)")
+        cases = (
+            ("linear scan, no batch", find_key_by_sid_linear, null_redis_batch),
+            ("index, no batch", indexed_lookup, null_redis_batch),
+            ("linear scan, fakeredis", find_key_by_sid_linear, originals[2]),
+            ("index, fakeredis", indexed_lookup, originals[2]),
+        )
+        for name, lookup, batch_factory in cases:
+            elapsed, sent = asyncio.run(run_disconnects(lookup, batch_factory))
+            print(f"  {name:<22}: {elapsed:8.4f} {sent:8d}")
+    finally:
+        (
+            ss.get_redis,
+            ss.find_key_by_sid,
+            ss.redis_batch,
+            ss.emit_to_client,
+            ss.emit_to_room,
+        ) = originals
+        reset()
+
+
+if __name__ == "__main__":
+    main()
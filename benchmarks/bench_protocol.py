@@ -0,0 +1,102 @@
+# 이동 정보 인코딩/디코딩 비용과 크기 비교 (수신자 한 명에게 보내는 묶음 크기별)
+# JSON: 이동 패킷 목록을 json 으로 직렬화 (기존 SC_MOVEMENT_INFO 와 같은 필드)
+# binary: BinaryMovementProtocol 프레임 (처음 보는 클라이언트 소개가 끝난 뒤의 상태)
+# delta: DeltaMovementEncoder 변화량 목록 (keyframe 이 끝난 뒤의 상태)
+# 실행: python -m benchmarks.bench_protocol
+import json
+import random
+import time
+
+import benchmarks  # noqa: F401
+from core.protocol import BinaryMovementProtocol, DeltaMovementEncoder, decode_movements
+
+BATCH_SIZES = (1, 50, 500)
+ROUNDS = 200
+
+
+def make_packets(count, rng):
+    return [
+        {
+            "client_id": f"client{number:05d}",
+            "position_x": rng.randrange(0, 5000),
+            "position_y": rng.randrange(0, 5000),
+            "direction": rng.randrange(0, 8),
+            "user_name": f"user{number:05d}",
+        }
+        for number in range(count)
+    ]
+
+
+# 다음 틱의 이동 (모든 클라이언트가 조금씩 움직임)
+def step(packets, rng):
+    return [
+        {
+            **packet,
+            "position_x": packet["position_x"] + rng.randrange(-12, 13),
+            "position_y": packet["position_y"] + rng.randrange(-12, 13),
+        }
+        for packet in packets
+    ]
+
+
+def per_round_us(func, rounds):
+    started = time.perf_counter()
+    for round_number in range(rounds):
+        func(round_number)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def bench(count):
+    rng = random.Random(count)
+    ticks = [make_packets(count, rng)]
+    for _ in range(ROUNDS):
+        ticks.append(step(ticks[-1], rng))
+
+    json_frames = [json.dumps(packets) for packets in ticks]
+    json_encode = per_round_us(lambda i: json.dumps(ticks[i + 1]), ROUNDS)
+    json_decode = per_round_us(lambda i: json.loads(json_frames[i + 1]), ROUNDS)
+
+    binary = BinaryMovementProtocol()
+    binary.encode_for("viewer", ticks[0])
+    binary_frames = []
+    binary_encode = per_round_us(
+        lambda i: binary_frames.append(binary.encode_for("viewer", ticks[i + 1])[1]),
+        ROUNDS,
+    )
+    binary_decode = per_round_us(
+        lambda i: [decode_movements(frame) for frame in binary_frames[i]], ROUNDS
+    )
+
+    delta = DeltaMovementEncoder(quantum=4, keyframe_interval=3600.0)
+    delta.encode_for("viewer", ticks[0])
+    delta_frames = []
+    delta_encode = per_round_us(
+        lambda i: delta_frames.append(
+            json.dumps(delta.encode_for("viewer", ticks[i + 1])[1])
+        ),
+        ROUNDS,
+    )
+
+    def average_size(frames):
+        return sum(map(len, frames)) / len(frames)
+
+    print(f"{count} movements per viewer batch (us per batch, bytes per batch)")
+    print(
+        f"  json   encode {json_encode:9.1f}  decode {json_decode:9.1f}  size {average_size(json_frames[1:]):9.0f}"
+    )
+    print(
+        f"  binary encode {binary_encode:9.1f}  decode {binary_decode:9.1f}"
+        f"  size {average_size([b''.join(frames) for frames in binary_frames]):9.0f}"
+    )
+    print(
+        f"  delta  encode {delta_encode:9.1f}  {'':16}  size {average_size(delta_frames):9.0f}"
+    )
+
+
+def main():
+    for count in BATCH_SIZES:
+        bench(count)
+
+
+if __name__ == "__main__":
+    main()
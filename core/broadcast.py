@@ -0,0 +1,137 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
+
+from socketio import packet as sio_packet
+
+from core.config import settings
+from core.metrics import record_emit
+
+
+# Broadcaster 클래스: 같은 이벤트를 여러 연결에 보낼 때 socket.io 패킷을 한 번만 인코딩해 재사용하는 클래스
+# sio_server.emit 은 수신자마다 패킷을 새로 만들고 JSON 으로 직렬화하므로 수신자가 많거나
+# 데이터가 클수록(그림판 전체 그림 등) 직렬화 비용이 수신자 수만큼 늘어납니다.
+# 방 전송(emit)은 호출 한 번에 모든 수신자에게 보내므로 그 호출 안에서만 인코딩 결과를 재사용하고,
+# 연결별 전송(send)은 같은 데이터 객체가 여러 번 들어오므로(전송 대기열을 거친 이동 정보 등)
+# (이벤트, 데이터 객체) 기준으로 최근 max_entries 개, 합계 max_bytes 이하의 인코딩 결과를 보관합니다.
+# 따라서 연결별로 한 번 보낸 데이터 객체는 수정하지 않고 새 객체를 만들어 보내야 합니다.
+# 다중 노드 모드의 방 전송은 다른 노드에도 전달해야 하므로 sio_server.emit 을 그대로 사용합니다.
+class Broadcaster:
+    def __init__(self, max_entries: int, max_bytes: int, local: bool):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.local = local
+        self.server = None
+        # (이벤트, id(데이터), 네임스페이스) -> (데이터, 인코딩된 패킷 목록, 크기)
+        self.entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.size = 0
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+
+    def configure(self, server):
+        self.server = server
+
+    # 이벤트를 engine.io 로 보낼 문자열/바이트 목록으로 인코딩
+    def encode(self, event: str, data, namespace: str = "/") -> List[Union[str, bytes]]:
+        # sio_server.emit 과 같은 방식으로 [event, *args] 형태의 데이터 구성
+        if isinstance(data, tuple):
+            payload = [event, *data]
+        elif data is not None:
+            payload = [event, data]
+        else:
+            payload = [event]
+        encoded = self.server.packet_class(
+            sio_packet.EVENT, namespace=namespace, data=payload
+        ).encode()
+        if not isinstance(encoded, list):
+            encoded = [encoded]
+        return encoded
+
+    # 인코딩 (같은 데이터 객체면 캐시 사용, max_bytes 보다 큰 결과는 보관하지 않음)
+    def encode_cached(
+        self, event: str, data, namespace: str = "/"
+    ) -> List[Union[str, bytes]]:
+        key = (event, id(data), namespace)
+        cached = self.entries.get(key)
+        # 데이터 객체를 캐시가 참조하고 있으므로 id 가 재사용되지 않지만, 같은 객체인지 한 번 더 확인
+        if cached is not None and cached[0] is data:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        encoded = self.encode(event, data, namespace)
+        size = sum(len(encoded_packet) for encoded_packet in encoded)
+        if self.max_entries > 0 and size <= self.max_bytes:
+            if cached is not None:
+                self.size -= cached[2]
+            self.entries[key] = (data, encoded, size)
+            self.size += size
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, (_, _, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+        return encoded
+
+    # 연결 하나에 전송 (이 노드에 없는 연결이면 sio_server.emit 사용)
+    async def send(self, sid: str, event: str, data, namespace: str = "/"):
+        eio_sid = self.server.manager.eio_sid_from_sid(sid, namespace)
+        if eio_sid is None or eio_sid not in self.server.eio.sockets:
+            self.fallbacks += 1
+            await self.server.emit(event, data, to=sid, namespace=namespace)
+            return
+        encoded = self.encode_cached(event, data, namespace)
+        await self._send_encoded(eio_sid, encoded)
+        record_emit(event, encoded)
+
+    # socket.io room 에 있는 연결 전체에 전송 (skip_sid 제외)
+    async def emit(
+        self,
+        event: str,
+        data,
+        room: str,
+        skip_sid: Optional[str] = None,
+        namespace: str = "/",
+    ):
+        if not self.local:
+            self.fallbacks += 1
+            await self.server.emit(
+                event, data, room=room, skip_sid=skip_sid, namespace=namespace
+            )
+            return
+
+        if namespace not in self.server.manager.rooms:
+            return
+        encoded = None
+        recipients = 0
+        for sid, eio_sid in self.server.manager.get_participants(namespace, room):
+            if sid == skip_sid:
+                continue
+            if encoded is None:
+                encoded = self.encode(event, data, namespace)
+            await self._send_encoded(eio_sid, encoded)
+            recipients += 1
+        if recipients:
+            record_emit(event, encoded, recipients)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self.entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "fallbacks": self.fallbacks,
+        }
+
+    async def _send_encoded(self, eio_sid: str, encoded: List[Union[str, bytes]]):
+        for encoded_packet in encoded:
+            await self.server.eio.send(eio_sid, encoded_packet)
+
+
+# Broadcaster 인스턴스 생성
+broadcaster = Broadcaster(
+    max_entries=settings.broadcast_cache_size,
+    max_bytes=settings.broadcast_cache_bytes,
+    local=not settings.cluster_mode,
+)
@@ -0,0 +1,375 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError, ResponseError
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, SQLModel, select
+
+from core.cluster import NODE_ID
+from core.config import settings
+from core.databases import engine, get_redis
+from core.metrics import chat_outbox_full
+from core.models import ChatMessage
+from core.redis import with_redis_retry
+
+CHAT_STREAM_KEY_TEMPLATE = settings.chat_stream_key_template
+CHAT_OUTBOX_KEY = settings.chat_outbox_key
+CHAT_DEAD_LETTER_KEY = settings.chat_dead_letter_key
+
+# 메시지를 방별 스트림과 DB 저장 대기열(outbox)에 함께 추가하고 방별 스트림의 엔트리 id 를 반환
+# outbox 는 잘라내면 DB 에 저장되지 않은 메시지를 잃으므로, 최대 길이에 도달했으면 아무것도 기록하지 않고 nil 반환
+# KEYS: 방별 스트림, outbox / ARGV: 방 스트림 최대 길이, outbox 최대 길이, room_id, client_id, user_name, message, ts(ms)
+APPEND_CHAT_SCRIPT = """
+if redis.call('XLEN', KEYS[2]) >= tonumber(ARGV[2]) then
+    return false
+end
+local message_id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*',
+    'client_id', ARGV[4], 'user_name', ARGV[5], 'message', ARGV[6], 'ts', ARGV[7])
+redis.call('XADD', KEYS[2], '*',
+    'room_id', ARGV[3], 'message_id', message_id,
+    'client_id', ARGV[4], 'user_name', ARGV[5], 'message', ARGV[6], 'ts', ARGV[7])
+return message_id
+"""
+
+
+# 스트림 엔트리 id("밀리초-순번")를 (밀리초, 순번)으로 분리
+def parse_message_id(message_id: str) -> Tuple[int, int]:
+    id_ms, _, id_seq = message_id.partition("-")
+    return int(id_ms), int(id_seq or 0)
+
+
+# 채팅 메시지를 기록하고 메시지 id 를 반환 (DB 저장은 ChatHistoryWriter 가 나중에 묶어서 처리)
+# DB 저장이 밀려 outbox 가 가득 찼으면 기록하지 않고 None 반환
+# 중복 실행되면 같은 메시지가 두 번 기록되므로 재시도하지 않음
+@with_redis_retry(retryable=False)
+async def append_chat_message(
+    room_id: str,
+    client_id: str,
+    user_name: Optional[str],
+    message: str,
+    redis_client: Redis,
+) -> Optional[str]:
+    message_id = await redis_client.eval(
+        APPEND_CHAT_SCRIPT,
+        2,
+        CHAT_STREAM_KEY_TEMPLATE.format(room_id=room_id),
+        CHAT_OUTBOX_KEY,
+        settings.chat_stream_maxlen,
+        settings.chat_outbox_maxlen,
+        room_id,
+        client_id,
+        user_name or "",
+        message,
+        int(time.time() * 1000),
+    )
+    if message_id is None:
+        chat_outbox_full.inc()
+        print(
+            f"Chat outbox is full ({settings.chat_outbox_maxlen} messages), "
+            f"message not recorded for room {room_id}"
+        )
+    return message_id
+
+
+def _history_entry(message_id: str, fields: dict) -> dict:
+    return {
+        "message_id": message_id,
+        "client_id": fields.get("client_id"),
+        "user_name": fields.get("user_name"),
+        "message": fields.get("message"),
+        "ts": int(fields.get("ts", 0)),
+    }
+
+
+# before(메시지 id) 이전의 최근 메시지를 최대 limit 개, 최신순으로 방별 스트림에서 조회
+@with_redis_retry
+async def get_stream_history(
+    room_id: str, before: Optional[str], limit: int, redis_client: Redis
+) -> List[dict]:
+    entries = await redis_client.xrevrange(
+        CHAT_STREAM_KEY_TEMPLATE.format(room_id=room_id),
+        max=f"({before}" if before else "+",
+        min="-",
+        count=limit,
+    )
+    return [_history_entry(message_id, fields) for message_id, fields in entries]
+
+
+# before(메시지 id) 이전의 메시지를 최대 limit 개, 최신순으로 DB 에서 조회 (동기 함수, 스레드에서 실행)
+def get_db_history(room_id: str, before: Optional[str], limit: int) -> List[dict]:
+    statement = select(ChatMessage).where(ChatMessage.room_id == room_id)
+    if before:
+        before_ms, before_seq = parse_message_id(before)
+        statement = statement.where(
+            or_(
+                ChatMessage.id_ms < before_ms,
+                and_(ChatMessage.id_ms == before_ms, ChatMessage.id_seq < before_seq),
+            )
+        )
+    statement = statement.order_by(
+        ChatMessage.id_ms.desc(), ChatMessage.id_seq.desc()
+    ).limit(limit)
+
+    with Session(engine) as session:
+        rows = session.exec(statement).all()
+    return [
+        {
+            "message_id": row.message_id,
+            "client_id": row.client_id,
+            "user_name": row.user_name,
+            "message": row.message,
+            "ts": int(row.created_at.timestamp() * 1000),
+        }
+        for row in rows
+    ]
+
+
+# 채팅 기록 한 페이지 조회
+# 방별 스트림에서 먼저 읽고, 스트림에 남아 있지 않은 오래된 메시지만 DB 에서 이어서 읽음
+# {"room_id", "messages": 오래된 순, "next_before": 다음 페이지 요청에 쓸 id (더 없으면 None)}
+async def get_chat_history(
+    room_id: str, before: Optional[str], limit: int, redis_client: Redis
+) -> dict:
+    limit = max(1, min(limit, settings.chat_history_page_size))
+    try:
+        messages = await get_stream_history(room_id, before, limit, redis_client)
+    except RedisError as e:
+        print(f"Chat stream unavailable for room {room_id}: {e}")
+        messages = []
+
+    if len(messages) < limit:
+        cursor = messages[-1]["message_id"] if messages else before
+        try:
+            messages.extend(
+                await asyncio.to_thread(
+                    get_db_history, room_id, cursor, limit - len(messages)
+                )
+            )
+        except Exception as e:
+            print(f"Chat history DB error for room {room_id}: {e}")
+
+    messages.reverse()
+    return {
+        "room_id": room_id,
+        "messages": messages,
+        "next_before": messages[0]["message_id"] if len(messages) == limit else None,
+    }
+
+
+# 메시지 묶음을 DB 에 저장 (동기 함수, 스레드에서 실행)
+# 같은 메시지가 다시 전달되어도 (room_id, message_id) 가 같으면 무시
+def insert_chat_messages(rows: List[dict]):
+    with Session(engine) as session:
+        session.execute(
+            insert(ChatMessage)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["room_id", "message_id"])
+        )
+        session.commit()
+
+
+# ChatHistoryWriter 클래스: outbox 스트림의 메시지를 consumer group 으로 읽어 DB 에 묶어서 저장하는 클래스
+# 저장이 끝난 메시지만 XACK/XDEL 하므로 워커가 중간에 죽으면 같은 메시지를 다시 저장하게 되고,
+# 이는 insert_chat_messages 의 중복 무시로 처리합니다. 다른 노드가 남긴 메시지는 chat_claim_idle 후 가져옵니다.
+# 다시 전달된 횟수가 max_deliveries 에 닿은 메시지는 하나씩 저장해 보고, 실패한 메시지만
+# dead-letter 스트림으로 옮겨 손상된 메시지 하나가 나머지 저장을 계속 막지 않도록 합니다.
+class ChatHistoryWriter:
+    def __init__(
+        self,
+        group: str,
+        consumer: str,
+        batch_size: int,
+        block: float,
+        claim_idle: float,
+        max_deliveries: int = 5,
+    ):
+        self.group = group
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.block = block
+        self.claim_idle = claim_idle
+        self.max_deliveries = max_deliveries
+
+        # 통계
+        self.flushed = 0
+        self.batches = 0
+        self.errors = 0
+        self.skipped = 0
+        self.dead_lettered = 0
+
+    async def ensure_group(self, redis_client: Redis):
+        try:
+            await redis_client.xgroup_create(
+                CHAT_OUTBOX_KEY, self.group, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    # 메시지 묶음을 DB 에 저장하고 outbox 에서 제거
+    # (이미 삭제되어 내용이 없는 엔트리는 저장할 수 없으므로 개수를 기록하고 확인 처리만 함)
+    async def flush(self, entries, redis_client: Redis):
+        if not entries:
+            return
+
+        rows = []
+        skipped = 0
+        for entry_id, fields in entries:
+            if not fields:
+                skipped += 1
+                continue
+            id_ms, id_seq = parse_message_id(fields["message_id"])
+            rows.append(
+                {
+                    "room_id": fields["room_id"],
+                    "message_id": fields["message_id"],
+                    "id_ms": id_ms,
+                    "id_seq": id_seq,
+                    "client_id": fields["client_id"],
+                    "user_name": fields.get("user_name") or None,
+                    "message": fields["message"],
+                    "created_at": datetime.fromtimestamp(
+                        int(fields.get("ts") or id_ms) / 1000, tz=timezone.utc
+                    ),
+                }
+            )
+        if rows:
+            await asyncio.to_thread(insert_chat_messages, rows)
+
+        entry_ids = [entry_id for entry_id, _ in entries]
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.xack(CHAT_OUTBOX_KEY, self.group, *entry_ids)
+            pipe.xdel(CHAT_OUTBOX_KEY, *entry_ids)
+            await pipe.execute()
+
+        self.flushed += len(rows)
+        self.batches += 1
+        if skipped:
+            self.skipped += skipped
+            print(f"Chat outbox entries deleted before saving: {skipped}")
+
+    # 다시 전달된 메시지 묶음 저장
+    # 전달 횟수가 max_deliveries 이상인 메시지는 따로 하나씩 저장하고, 그래도 실패하면 dead-letter 로 옮김
+    async def flush_redelivered(self, entries, redis_client: Redis):
+        if not entries:
+            return
+
+        pending = await redis_client.xpending_range(
+            CHAT_OUTBOX_KEY,
+            self.group,
+            min=entries[0][0],
+            max=entries[-1][0],
+            count=len(entries),
+            consumername=self.consumer,
+        )
+        deliveries = {item["message_id"]: item["times_delivered"] for item in pending}
+        retried = []
+        suspects = []
+        for entry in entries:
+            if deliveries.get(entry[0], 0) >= self.max_deliveries:
+                suspects.append(entry)
+            else:
+                retried.append(entry)
+
+        await self.flush(retried, redis_client)
+        for entry in suspects:
+            try:
+                await self.flush([entry], redis_client)
+            except Exception as e:
+                await self.dead_letter(entry, e, redis_client)
+
+    # 저장할 수 없는 메시지를 dead-letter 스트림으로 옮기고 outbox 에서 제거
+    async def dead_letter(self, entry, error: Exception, redis_client: Redis):
+        entry_id, fields = entry
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.xadd(
+                CHAT_DEAD_LETTER_KEY,
+                {**fields, "entry_id": entry_id, "error": str(error)[:200]},
+            )
+            pipe.xack(CHAT_OUTBOX_KEY, self.group, entry_id)
+            pipe.xdel(CHAT_OUTBOX_KEY, entry_id)
+            await pipe.execute()
+        self.dead_lettered += 1
+        print(f"Chat outbox entry {entry_id} moved to {CHAT_DEAD_LETTER_KEY}: {error}")
+
+    # 오래 처리되지 않은 다른 워커의 메시지를 가져와 저장
+    async def claim_stale(self, redis_client: Redis):
+        start = "0-0"
+        while True:
+            start, entries, *_ = await redis_client.xautoclaim(
+                CHAT_OUTBOX_KEY,
+                self.group,
+                self.consumer,
+                min_idle_time=int(self.claim_idle * 1000),
+                start_id=start,
+                count=self.batch_size,
+            )
+            await self.flush_redelivered(entries, redis_client)
+            if start in ("0-0", b"0-0"):
+                return
+
+    async def read(self, stream_id: str, redis_client: Redis):
+        response = await redis_client.xreadgroup(
+            self.group,
+            self.consumer,
+            {CHAT_OUTBOX_KEY: stream_id},
+            count=self.batch_size,
+            block=int(self.block * 1000) if stream_id == ">" else None,
+        )
+        return response[0][1] if response else []
+
+    # DB 나 Redis 오류가 나면 잠시 뒤 테이블 생성부터 다시 시도
+    async def run(self):
+        tables_ready = False
+        while True:
+            try:
+                if not tables_ready:
+                    await asyncio.to_thread(
+                        SQLModel.metadata.create_all, engine, [ChatMessage.__table__]
+                    )
+                    tables_ready = True
+
+                async for redis_client in get_redis():
+                    await self.ensure_group(redis_client)
+
+                    # 이전 실행에서 저장하지 못한 내 메시지, 다른 워커가 남긴 메시지 순으로 처리
+                    while entries := await self.read("0", redis_client):
+                        await self.flush_redelivered(entries, redis_client)
+                    await self.claim_stale(redis_client)
+
+                    last_claim = time.monotonic()
+                    while True:
+                        await self.flush(
+                            await self.read(">", redis_client), redis_client
+                        )
+                        if time.monotonic() - last_claim >= self.claim_idle:
+                            await self.claim_stale(redis_client)
+                            last_claim = time.monotonic()
+            except Exception as e:
+                self.errors += 1
+                print(f"Chat history writer error: {e}")
+                await asyncio.sleep(1)
+
+    def stats(self) -> dict:
+        return {
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "dead_lettered": self.dead_lettered,
+        }
+
+
+# ChatHistoryWriter 인스턴스 생성
+chat_history_writer = ChatHistoryWriter(
+    group=settings.chat_writer_group,
+    consumer=NODE_ID,
+    batch_size=settings.chat_flush_batch_size,
+    block=settings.chat_flush_interval,
+    claim_idle=settings.chat_claim_idle,
+    max_deliveries=settings.chat_max_deliveries,
+)
@@ -0,0 +1,17 @@
+import os
+import socket
+
+import socketio
+
+from core.config import settings
+
+# 현재 노드 식별자
+NODE_ID = settings.node_id or f"{socket.gethostname()}:{os.getpid()}"
+
+
+# socket.io 클라이언트 매니저 생성
+# 다중 노드 모드에서는 Redis pub/sub 으로 다른 노드에 연결된 sid 와 room 에도 emit/disconnect 가 전달됨
+def create_client_manager():
+    if not settings.cluster_mode:
+        return None
+    return socketio.AsyncRedisManager(settings.get_socketio_redis_url())
@@ -36,7 +36,122 @@ class Settings(BaseSettings):
     redis_socket_timeout: float = Field(5.0, env="REDIS_SOCKET_TIMEOUT")
     redis_socket_connect_timeout: float = Field(2.0, env="REDIS_SOCKET_CONNECT_TIMEOUT")
     redis_retry_on_timeout: bool = Field(True, env="REDIS_RETRY_ON_TIMEOUT")
-    redis_max_connections: int = Field(10, env="REDIS_MAX_CONNECTIONS")
+    redis_max_connections: int = Field(64, env="REDIS_MAX_CONNECTIONS")
+    # 연결이 모두 사용 중일 때 빈 연결을 기다리는 최대 시간(초)
+    redis_pool_timeout: float = Field(5.0, env="REDIS_POOL_TIMEOUT")
+    # 백그라운드 상태 확인 주기(초)와 준비 안 됨으로 판단할 연속 실패 횟수
+    redis_health_interval: float = Field(5.0, env="REDIS_HEALTH_INTERVAL")
+    redis_health_failure_threshold: int = Field(3, env="REDIS_HEALTH_FAILURE_THRESHOLD")
+    # Redis 명령 재시도: 최대 시도 횟수, 백오프 기본/최대 대기(초), 호출당 전체 제한 시간(초)
+    redis_retry_attempts: int = Field(3, env="REDIS_RETRY_ATTEMPTS")
+    redis_retry_base_delay: float = Field(0.05, env="REDIS_RETRY_BASE_DELAY")
+    redis_retry_max_delay: float = Field(0.5, env="REDIS_RETRY_MAX_DELAY")
+    redis_call_deadline: float = Field(2.0, env="REDIS_CALL_DEADLINE")
+    # 회로 차단기: 회로를 여는 연속 실패 횟수와 시험 호출까지 기다리는 시간(초)
+    redis_breaker_failure_threshold: int = Field(
+        5, env="REDIS_BREAKER_FAILURE_THRESHOLD"
+    )
+    redis_breaker_reset_timeout: float = Field(5.0, env="REDIS_BREAKER_RESET_TIMEOUT")
+
+    # 이동 정보 틱 전송 주기(Hz). 0 이면 패킷마다 즉시 전송
+    movement_tick_rate: int = Field(0, env="MOVEMENT_TICK_RATE")
+    # 즉시 전송 모드에서 클라이언트별 이동 처리 최대 빈도(Hz). 0 이면 제한 없음
+    movement_max_rate: float = Field(30.0, env="MOVEMENT_MAX_RATE")
+    # delta 전송 연결의 좌표 양자화 단위(픽셀)와 keyframe 간격(초)
+    movement_quantum: int = Field(1, env="MOVEMENT_QUANTUM")
+    movement_keyframe_interval: float = Field(5.0, env="MOVEMENT_KEYFRAME_INTERVAL")
+    # 섹터 인덱스 종류: grid(고정 격자) 또는 adaptive(붐비는 섹터를 나누는 쿼드트리)
+    spatial_index: str = Field("grid", env="SPATIAL_INDEX")
+    sector_split_threshold: int = Field(32, env="SECTOR_SPLIT_THRESHOLD")
+    sector_max_depth: int = Field(3, env="SECTOR_MAX_DEPTH")
+    # 시야에 포함할 최대 인원 (adaptive 에서 가까운 순서로 적용, 0 이면 제한 없음)
+    max_view_neighbors: int = Field(0, env="MAX_VIEW_NEIGHBORS")
+    # 틱 모드 이동 처리 엔진: python 또는 numpy(벡터화, SPATIAL_INDEX=grid 에서만 사용)
+    movement_engine: str = Field("python", env="MOVEMENT_ENGINE")
+
+    # 연결 요청 처리 워커 수, 워커가 한 번에 처리할 최대 요청 수, connect 대기 제한 시간(초)
+    admission_workers: int = Field(4, env="ADMISSION_WORKERS")
+    admission_batch_size: int = Field(32, env="ADMISSION_BATCH_SIZE")
+    connection_admission_timeout: float = Field(
+        10.0, env="CONNECTION_ADMISSION_TIMEOUT"
+    )
+
+    # 방 구성원 캐시 최대 방 수, 노드가 여러 개일 때 Redis pub/sub 으로 캐시 무효화 여부
+    room_cache_max_rooms: int = Field(1024, env="ROOM_CACHE_MAX_ROOMS")
+    room_cache_pubsub: bool = Field(False, env="ROOM_CACHE_PUBSUB")
+
+    # 다중 노드 모드: socket.io 이벤트를 Redis 로 중계하고 클라이언트 소유 노드를 Redis 에 기록
+    cluster_mode: bool = Field(False, env="CLUSTER_MODE")
+    # 노드 식별자 (비어 있으면 호스트명:pid)
+    node_id: str = Field("", env="NODE_ID")
+    # 클라이언트가 이 노드로 다시 연결할 때 사용할 주소
+    # (노드별 URL, 또는 로드 밸런서가 이 노드로 고정 라우팅하는 키. 다른 노드가 맡은 방으로 안내할 때 전달)
+    node_address: str = Field("", env="NODE_ADDRESS")
+    # socket.io 메시지 중계용 Redis URL (비어 있으면 ElastiCache 설정으로 생성)
+    socketio_redis_url: str = Field("", env="SOCKETIO_REDIS_URL")
+    # 방 입장 스냅샷에 모두 포함할 최대 인원 (넘으면 주변 클라이언트만 포함, 0 이면 제한 없음)
+    room_snapshot_max_clients: int = Field(0, env="ROOM_SNAPSHOT_MAX_CLIENTS")
+    # 연결별 전송 대기열: 최대 길이(0 이면 대기열 없이 바로 전송), 전송 계층 버퍼 상한,
+    # 느린 클라이언트로 판단해 연결을 끊기까지의 시간(초)과 쌓일 수 있는 필수 메시지 수
+    outbound_queue_size: int = Field(256, env="OUTBOUND_QUEUE_SIZE")
+    outbound_high_water: int = Field(16, env="OUTBOUND_HIGH_WATER")
+    outbound_slow_timeout: float = Field(10.0, env="OUTBOUND_SLOW_TIMEOUT")
+    outbound_max_reliable: int = Field(1024, env="OUTBOUND_MAX_RELIABLE")
+    # 연결별 전송에서 한 번 인코딩한 socket.io 패킷을 재사용할 최근 데이터 객체 수와
+    # 보관할 인코딩 결과의 최대 크기 합계(bytes, 텍스트 패킷은 문자 수) (둘 중 하나라도 0 이면 재사용하지 않음)
+    broadcast_cache_size: int = Field(256, env="BROADCAST_CACHE_SIZE")
+    broadcast_cache_bytes: int = Field(1048576, env="BROADCAST_CACHE_BYTES")
+    # 미팅룸 그림판: 스냅샷/획 로그 키, 스냅샷으로 압축할 로그 길이, 보관 시간(초),
+    # 전체 그림 이후 쌓을 수 있는 획의 최대 크기(bytes, 넘으면 획을 거절하고 전체 그림을 요청)
+    whiteboard_snapshot_key_template: str = Field(
+        "whiteboard_snapshot:{room_id}", env="WHITEBOARD_SNAPSHOT_KEY_TEMPLATE"
+    )
+    whiteboard_strokes_key_template: str = Field(
+        "whiteboard_strokes:{room_id}", env="WHITEBOARD_STROKES_KEY_TEMPLATE"
+    )
+    whiteboard_compact_threshold: int = Field(200, env="WHITEBOARD_COMPACT_THRESHOLD")
+    whiteboard_ttl: int = Field(86400, env="WHITEBOARD_TTL")
+    whiteboard_max_stroke_bytes: int = Field(1048576, env="WHITEBOARD_MAX_STROKE_BYTES")
+    # 채팅 기록: 방별 Redis Stream 과 DB 저장 대기열(outbox) 사용 여부와 키, 최대 길이
+    # (방별 스트림은 오래된 메시지부터 잘라내고, outbox 는 DB 에 저장되지 않은 메시지를 잃지 않도록
+    #  최대 길이에 도달하면 새 메시지를 기록하지 않음)
+    chat_history_enabled: bool = Field(False, env="CHAT_HISTORY_ENABLED")
+    chat_stream_key_template: str = Field(
+        "chat:{room_id}", env="CHAT_STREAM_KEY_TEMPLATE"
+    )
+    chat_outbox_key: str = Field("chat_outbox", env="CHAT_OUTBOX_KEY")
+    chat_stream_maxlen: int = Field(1000, env="CHAT_STREAM_MAXLEN")
+    chat_outbox_maxlen: int = Field(100000, env="CHAT_OUTBOX_MAXLEN")
+    # DB 저장 워커: consumer group 이름, 한 번에 저장할 최대 메시지 수, 대기열 대기 시간(초)
+    chat_writer_group: str = Field("chat_writers", env="CHAT_WRITER_GROUP")
+    chat_flush_batch_size: int = Field(200, env="CHAT_FLUSH_BATCH_SIZE")
+    chat_flush_interval: float = Field(1.0, env="CHAT_FLUSH_INTERVAL")
+    # 다른 워커가 처리하지 못하고 남긴 메시지를 가져올 때까지의 대기 시간(초)
+    chat_claim_idle: float = Field(60.0, env="CHAT_CLAIM_IDLE")
+    # 이 횟수만큼 다시 전달되고도 저장하지 못한 메시지를 옮겨 둘 스트림 키와 전달 횟수
+    chat_dead_letter_key: str = Field("chat_outbox_dead", env="CHAT_DEAD_LETTER_KEY")
+    chat_max_deliveries: int = Field(5, env="CHAT_MAX_DELIVERIES")
+    # 채팅 기록 한 페이지의 최대 메시지 수
+    chat_history_page_size: int = Field(50, env="CHAT_HISTORY_PAGE_SIZE")
+
+    # 활성 미팅룸 / sid 목록(set) 키
+    meeting_room_registry_key: str = Field(
+        "meeting_rooms", env="MEETING_ROOM_REGISTRY_KEY"
+    )
+    sid_registry_key: str = Field("sids", env="SID_REGISTRY_KEY")
+    client_owner_key_template: str = Field(
+        "client_owner:{client_id}", env="CLIENT_OWNER_KEY_TEMPLATE"
+    )
+    # 다중 노드 모드: 방을 맡은 노드 기록 키와 보관 시간(초)
+    # 위치/시야 상태는 노드 메모리에서 계산하므로 한 방의 구성원은 모두 방을 맡은 노드에 연결되어야 함
+    room_owner_key_template: str = Field(
+        "room_owner:{room_id}", env="ROOM_OWNER_KEY_TEMPLATE"
+    )
+    room_owner_ttl: int = Field(30, env="ROOM_OWNER_TTL")
+    # 노드 주소 기록 키 (room_owner_ttl 동안 갱신이 없으면 사라짐)
+    node_address_key_template: str = Field(
+        "node_address:{node_id}", env="NODE_ADDRESS_KEY_TEMPLATE"
+    )
 
     rooms_key_template: str = Field(..., env="ROOMS_KEY_TEMPLATE")
     client_key_template: str = Field(..., env="CLIENT_KEY_TEMPLATE")
@@ -54,6 +169,16 @@ class Settings(BaseSettings):
     def db_url(self) -> str:
         return self.get_db_url()
 
+    def get_socketio_redis_url(self) -> str:
+        if self.socketio_redis_url:
+            return self.socketio_redis_url
+        return f"redis://{self.aws_elasticache_endpoint}:{self.aws_elasticache_port}/0"
+
+    # 다중 노드 모드에서는 방 구성원 캐시 무효화 알림을 항상 사용
+    @property
+    def room_cache_pubsub_enabled(self) -> bool:
+        return self.room_cache_pubsub or self.cluster_mode
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,9 +1,7 @@
-from typing import Generator, AsyncGenerator
-from redis.asyncio import Redis, ConnectionPool
-from redis.exceptions import RedisError, ConnectionError
+from typing import Dict, Generator, AsyncGenerator
+from redis.asyncio import Redis, BlockingConnectionPool
 from sqlmodel import Session, create_engine
 from core.config import settings
-import asyncio
 
 engine = create_engine(
     settings.db_url,
@@ -13,8 +11,37 @@ engine = create_engine(
     pool_timeout=settings.db_pool_timeout,
 )
 
+
+# InstrumentedConnectionPool 클래스: 사용 중 연결 수의 최댓값과 연결 대기 횟수를 기록하는 연결 풀
+# 연결이 모두 사용 중이면 예외 대신 redis_pool_timeout 만큼 기다리며,
+# 기록된 값은 redis_max_connections 를 실제 동시 사용량에 맞춰 조정하는 근거로 사용합니다.
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.peak_in_use = 0
+        self.waits = 0
+
+    async def get_connection(self, command_name, *keys, **options):
+        if not self.can_get_connection():
+            self.waits += 1
+        connection = await super().get_connection(command_name, *keys, **options)
+        in_use = len(self._in_use_connections)
+        if in_use > self.peak_in_use:
+            self.peak_in_use = in_use
+        return connection
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_connections": self.max_connections,
+            "in_use": len(self._in_use_connections),
+            "available": len(self._available_connections),
+            "peak_in_use": self.peak_in_use,
+            "waits": self.waits,
+        }
+
+
 # Redis 연결 풀 설정
-redis_pool = ConnectionPool(
+redis_pool = InstrumentedConnectionPool(
     host=settings.aws_elasticache_endpoint,
     port=settings.aws_elasticache_port,
     decode_responses=True,
@@ -22,10 +49,11 @@ redis_pool = ConnectionPool(
     socket_connect_timeout=settings.redis_socket_connect_timeout,
     retry_on_timeout=settings.redis_retry_on_timeout,
     max_connections=settings.redis_max_connections,
+    timeout=settings.redis_pool_timeout,
     health_check_interval=30,
 )
 
-# Redis 클라이언트 인스턴스 생성
+# Redis 클라이언트 인스턴스 생성 (프로세스 전체에서 공유)
 redis_client = Redis(
     connection_pool=redis_pool,
     auto_close_connection_pool=True,
@@ -41,38 +69,11 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
-MAX_RETRIES = 3
-RETRY_DELAY = 1  # seconds
-
-
 async def get_redis() -> AsyncGenerator[Redis, None]:
     """
     Redis 클라이언트를 반환하는 비동기 의존성 주입 함수입니다.
     이 함수는 FastAPI의 Depends 의존성 주입 시스템에서 사용되며, Redis 클라이언트를 제공하는 데 사용됩니다.
-    연결 실패 시 최대 3번까지 재시도하며, 각 시도 사이에 1초의 대기 시간을 가집니다.
+    호출마다 PING 을 보내거나 연결을 닫지 않고 공유 클라이언트를 그대로 넘겨주며,
+    연결 오류는 각 명령의 with_redis_retry 에서 재시도합니다.
     """
-    retries = 0
-    last_error = None
-
-    while retries < MAX_RETRIES:
-        try:
-            # Redis 연결 상태 확인
-            await redis_client.ping()
-            yield redis_client
-            return
-        except (RedisError, ConnectionError) as e:
-            last_error = e
-            retries += 1
-            if retries < MAX_RETRIES:
-                print(
-                    f"Redis connection failed: {e}. Retrying... (attempt {retries}/{MAX_RETRIES})"
-                )
-                await asyncio.sleep(RETRY_DELAY)
-            else:
-                print(
-                    f"Redis connection failed after {MAX_RETRIES} attempts: {last_error}"
-                )
-                raise last_error
-        finally:
-            # 연결 풀은 유지하되 현재 연결은 닫음
-            await redis_client.close(close_connection_pool=False)
+    yield redis_client
@@ -0,0 +1,96 @@
+import asyncio
+import time
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from core.config import settings
+from core.databases import InstrumentedConnectionPool, redis_client, redis_pool
+from core.redis import redis_breaker
+
+
+# RedisHealthMonitor 클래스: 주기적으로 Redis 에 PING 을 보내 준비 상태(ready)를 관리하는 클래스
+# 요청 처리 경로에서는 연결 상태를 확인하지 않고, 이 작업이 대신 확인한 결과를 /ready 로 노출합니다.
+class RedisHealthMonitor:
+    def __init__(
+        self,
+        redis_client: Redis,
+        pool: InstrumentedConnectionPool,
+        interval: float,
+        failure_threshold: int,
+    ):
+        self.redis_client = redis_client
+        self.pool = pool
+        self.interval = interval
+        self.failure_threshold = failure_threshold
+
+        self.ready = False
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.last_latency: Optional[float] = None
+        self.last_checked: Optional[float] = None
+        self.reported_peak = 0
+
+    # PING 한 번으로 상태 갱신, 연속 실패가 failure_threshold 이상이면 준비 안 됨
+    async def check(self) -> bool:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.redis_client.ping(), timeout=self.interval)
+        except Exception as e:
+            self.consecutive_failures += 1
+            self.last_error = str(e) or type(e).__name__
+            if self.consecutive_failures >= self.failure_threshold:
+                if self.ready:
+                    print(f"Redis is not ready: {self.last_error}")
+                self.ready = False
+        else:
+            if not self.ready:
+                print("Redis is ready")
+            self.ready = True
+            self.consecutive_failures = 0
+            self.last_error = None
+            self.last_latency = time.perf_counter() - started
+        self.last_checked = time.time()
+        self.report_pool_usage()
+        return self.ready
+
+    # 사용 중 연결 수의 최댓값이 갱신되었고 풀 한도에 닿았으면 크기 조정이 필요하다고 기록
+    def report_pool_usage(self):
+        stats = self.pool.stats()
+        if stats["peak_in_use"] <= self.reported_peak:
+            return
+        self.reported_peak = stats["peak_in_use"]
+        if stats["peak_in_use"] >= stats["max_connections"]:
+            print(
+                f"Redis pool saturated: peak {stats['peak_in_use']}/{stats['max_connections']} "
+                f"connections, {stats['waits']} waits. Consider raising REDIS_MAX_CONNECTIONS"
+            )
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "last_latency_ms": (
+                round(self.last_latency * 1000, 3)
+                if self.last_latency is not None
+                else None
+            ),
+            "last_checked": self.last_checked,
+            "pool": self.pool.stats(),
+            "circuit": redis_breaker.stats(),
+        }
+
+    async def run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+
+# RedisHealthMonitor 인스턴스 생성
+redis_health = RedisHealthMonitor(
+    redis_client,
+    redis_pool,
+    interval=settings.redis_health_interval,
+    failure_threshold=settings.redis_health_failure_threshold,
+)
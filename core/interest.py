@@ -0,0 +1,84 @@
+from typing import Dict, Iterable, List, Set, Tuple
+
+_EMPTY: Set[str] = frozenset()
+
+
+# InterestManager 클래스: 클라이언트별 시야 목록(내가 보는 클라이언트)과
+# 역방향 인덱스(나를 보는 클라이언트)를 함께 관리하는 클래스
+# 두 인덱스를 항상 같이 갱신하므로, 시야 변경과 연결 해제 정리는 주변 클라이언트 수에만 비례합니다.
+class InterestManager:
+    def __init__(self):
+        self.views: Dict[str, Set[str]] = {}
+        self.viewers: Dict[str, Set[str]] = {}
+
+    # observer 가 보고 있는 클라이언트 집합 (수정하지 말 것)
+    def get_view(self, observer: str) -> Set[str]:
+        return self.views.get(observer, _EMPTY)
+
+    # target 을 보고 있는 클라이언트 집합 (수정하지 말 것)
+    def get_viewers(self, target: str) -> Set[str]:
+        return self.viewers.get(target, _EMPTY)
+
+    # observer 의 시야에 target 추가, 새로 추가되었으면 True
+    def add(self, observer: str, target: str) -> bool:
+        view = self.views.setdefault(observer, set())
+        if target in view:
+            return False
+        view.add(target)
+        self.viewers.setdefault(target, set()).add(observer)
+        return True
+
+    # observer 의 시야에서 target 제거, 실제로 제거되었으면 True
+    def discard(self, observer: str, target: str) -> bool:
+        view = self.views.get(observer)
+        if not view or target not in view:
+            return False
+        view.discard(target)
+        if not view:
+            del self.views[observer]
+        self._discard_viewer(target, observer)
+        return True
+
+    # observer 의 시야를 targets 로 교체하고 (새로 보이는 목록, 사라진 목록)을 반환
+    def set_view(
+        self, observer: str, targets: Iterable[str]
+    ) -> Tuple[List[str], List[str]]:
+        new_view = set(targets)
+        new_view.discard(observer)
+        old_view = self.views.get(observer, _EMPTY)
+
+        entered = [target for target in new_view if target not in old_view]
+        left = [target for target in old_view if target not in new_view]
+
+        for target in entered:
+            self.viewers.setdefault(target, set()).add(observer)
+        for target in left:
+            self._discard_viewer(target, observer)
+
+        if new_view:
+            self.views[observer] = new_view
+        else:
+            self.views.pop(observer, None)
+        return entered, left
+
+    # 클라이언트를 모든 시야에서 제거하고, 해당 클라이언트를 보고 있던 클라이언트 목록을 반환
+    def remove_client(self, client_id: str) -> List[str]:
+        for target in self.views.pop(client_id, _EMPTY):
+            self._discard_viewer(target, client_id)
+
+        observers = list(self.viewers.pop(client_id, _EMPTY))
+        for observer in observers:
+            view = self.views.get(observer)
+            if view is not None:
+                view.discard(client_id)
+                if not view:
+                    del self.views[observer]
+        return observers
+
+    def _discard_viewer(self, target: str, observer: str):
+        observers = self.viewers.get(target)
+        if observers is None:
+            return
+        observers.discard(observer)
+        if not observers:
+            del self.viewers[target]
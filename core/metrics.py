@@ -0,0 +1,281 @@
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+# 지연 시간 히스토그램 기본 구간(초)
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+# 라벨 값을 Prometheus 텍스트 형식에 맞게 변환
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+        )
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Counter 클래스: 증가만 하는 값 (라벨 값 튜플별로 따로 집계)
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self.values.items()
+        ]
+
+
+# Histogram 클래스: 관측값을 구간별로 집계 (관측 시에는 구간 찾기와 덧셈만 수행)
+class Histogram:
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # 라벨 값 튜플 -> [구간별 개수(마지막은 +Inf), 합계]
+        self.values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, labels: tuple = ()):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="{}"'.format(_format_value(bound))
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+# Gauge 클래스: 조회 시점에 콜백으로 읽는 값 (요청 처리 경로에는 비용이 없음)
+# 콜백은 값 하나 또는 {라벨 값 튜플: 값} 딕셔너리를 반환
+class Gauge:
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        collect: Callable[[], Union[float, Dict[tuple, float]]],
+        labelnames: Sequence[str] = (),
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        values = self.collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in values.items()
+        ]
+
+
+# 기존 stats() 결과를 Gauge 값으로 변환
+# 숫자는 {prefix}_{key}, 문자열은 {prefix}_{key}{value="..."} 1, 중첩 딕셔너리는 키를 이어 붙임
+def _flatten_stats(
+    prefix: str, stats: dict, out: Dict[str, Tuple[tuple, Dict[tuple, float]]]
+):
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            _flatten_stats(name, value, out)
+        elif isinstance(value, bool):
+            out[name] = ((), {(): int(value)})
+        elif isinstance(value, (int, float)):
+            out[name] = ((), {(): value})
+        elif isinstance(value, str):
+            out[name] = (("value",), {(value,): 1})
+
+
+# MetricsRegistry 클래스: 지표를 모아 Prometheus 텍스트 형식으로 출력하는 클래스
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: List = []
+        self.stats_sources: List[Tuple[str, str, Callable[[], dict]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(
+        self, name: str, help: str, collect, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        metric = Gauge(name, help, collect, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    # stats() 를 제공하는 객체를 등록 (조회할 때마다 호출해 Gauge 로 출력)
+    def register_stats(self, prefix: str, help: str, collect: Callable[[], dict]):
+        self.stats_sources.append((prefix, help, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            try:
+                samples = metric.render()
+            except Exception as e:
+                print(f"Metrics collection error ({metric.name}): {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(samples)
+
+        for prefix, help, collect in self.stats_sources:
+            gauges: Dict[str, Tuple[tuple, Dict[tuple, float]]] = {}
+            try:
+                _flatten_stats(prefix, collect(), gauges)
+            except Exception as e:
+                print(f"Metrics collection error ({prefix}): {e}")
+                continue
+            for name, (labelnames, values) in gauges.items():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(
+                    f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}"
+                    for labels, value in values.items()
+                )
+        return "\n".join(lines) + "\n"
+
+
+# MetricsRegistry 인스턴스 생성
+metrics = MetricsRegistry()
+
+# socket.io 이벤트 처리 시간과 예외 수
+handler_latency = metrics.histogram(
+    "socketio_handler_seconds", "Socket.IO event handler latency", ("event",)
+)
+handler_errors = metrics.counter(
+    "socketio_handler_errors_total", "Socket.IO event handlers that raised", ("event",)
+)
+# 전송한 이벤트 수와 인코딩된 크기 (텍스트 프레임은 문자 수)
+emit_messages = metrics.counter(
+    "socketio_emit_messages_total", "Socket.IO events sent per recipient", ("event",)
+)
+emit_bytes = metrics.counter(
+    "socketio_emit_bytes_total", "Encoded size of Socket.IO events sent", ("event",)
+)
+# Redis 작업 처리 시간(재시도 포함)과 재시도/최종 실패 수
+redis_latency = metrics.histogram(
+    "redis_operation_seconds",
+    "Redis operation latency including retries",
+    ("operation",),
+)
+redis_retries = metrics.counter(
+    "redis_operation_retries_total", "Redis operation retries", ("operation",)
+)
+redis_failures = metrics.counter(
+    "redis_operation_failures_total",
+    "Redis operations that failed after retries",
+    ("operation",),
+)
+# 연결 요청이 대기열에 들어간 뒤 처리 완료까지의 대기 시간과 시간 초과 수
+admission_wait = metrics.histogram(
+    "connection_admission_wait_seconds", "Time from connect to admission"
+)
+admission_timeouts = metrics.counter(
+    "connection_admission_timeouts_total",
+    "Connections rejected after admission timeout",
+)
+# DB 저장 대기열(outbox)이 가득 차 기록하지 못한 채팅 메시지 수
+chat_outbox_full = metrics.counter(
+    "chat_outbox_full_total", "Chat messages not recorded because the DB outbox is full"
+)
+
+
+# socket.io 이벤트 핸들러의 처리 시간을 기록하는 데코레이터
+# sio_server.event 가 함수 이름으로 이벤트를 등록하므로 @sio_server.event 아래에 사용
+def timed_handler(func):
+    labels = (func.__name__,)
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            handler_errors.inc(labels)
+            raise
+        finally:
+            handler_latency.observe(time.perf_counter() - started, labels)
+
+    return wrapper
+
+
+# 인코딩된 이벤트 전송 기록 (recipients 명에게 같은 패킷을 보낸 경우 한 번에 기록)
+def record_emit(event: str, encoded: Sequence[Union[str, bytes]], recipients: int = 1):
+    labels = (event,)
+    emit_messages.inc(labels, recipients)
+    emit_bytes.inc(
+        labels, sum(len(encoded_packet) for encoded_packet in encoded) * recipients
+    )
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, Column, Index, UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+
+# 채팅 메시지 기록
+# message_id 는 방별 Redis Stream 의 엔트리 id("밀리초-순번")이며,
+# 정렬과 페이지 조회를 위해 두 부분을 id_ms, id_seq 로 나누어 저장합니다.
+class ChatMessage(SQLModel, table=True):
+    __tablename__ = "chat_messages"
+    __table_args__ = (
+        UniqueConstraint("room_id", "message_id", name="uq_chat_messages_room_message"),
+        Index("ix_chat_messages_room_order", "room_id", "id_ms", "id_seq"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    room_id: str
+    message_id: str
+    id_ms: int = Field(sa_column=Column(BigInteger, nullable=False))
+    id_seq: int
+    client_id: str
+    user_name: Optional[str] = None
+    message: str
+    created_at: datetime
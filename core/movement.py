@@ -1,120 +1,871 @@
-from typing import List, Dict
+import asyncio
+import heapq
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from core.config import settings
+from core.interest import InterestManager
+from core.positions import coordinate_limit
+
+SectorKey = Tuple[int, int]
+# 적응형 섹터 키: (분할 단계, x, y)
+LeafKey = Tuple[int, int, int]
+# (observer, target) 쌍 목록: observer 의 시야에 target 이 들어오거나 나감
+ViewEvents = List[Tuple[str, str]]
+
+# 인접 섹터 탐색에 사용하는 3x3 오프셋
+NEIGHBOR_OFFSETS = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+
 
 # SectorManager 클래스: 클라이언트의 위치를 기반으로 섹터를 관리하는 클래스
 # 섹터 크기를 설정하고 클라이언트를 섹터에 추가하거나 인접한 섹터의 클라이언트를 반환합니다.
+# 클라이언트 -> 섹터 역방향 맵을 유지하므로 이동/삭제는 섹터 수와 무관하게 O(1)이고,
+# 섹터 경계를 넘었을 때만 실제 작업을 수행합니다.
 class SectorManager:
     def __init__(self, sector_size: int):
         self.sector_size = sector_size
-        self.sectors: Dict[str, List[str]] = {}
+        self.sectors: Dict[SectorKey, Set[str]] = {}
+        self.client_sectors: Dict[str, SectorKey] = {}
+        # 섹터별 인접 클라이언트 캐시 (섹터 구성원이 바뀔 때만 무효화)
+        self._nearby_cache: Dict[SectorKey, Tuple[str, ...]] = {}
+        # 시야 인원 제한 (0 이면 제한 없음)
+        self.max_neighbors = 0
 
     # 주어진 좌표를 기반으로 섹터 키를 반환
-    def get_sector_key(self, x: int, y: int) -> str:
-        return f"{int(x) // self.sector_size}:{int(y) // self.sector_size}"
+    def get_sector_key(self, x: int, y: int) -> SectorKey:
+        return (int(x) // self.sector_size, int(y) // self.sector_size)
 
     # 클라이언트의 섹터 위치를 업데이트
-    def update_client_sector(self, client_id: str, x: int, y: int):
+    # 섹터 경계를 넘었으면 True, 같은 섹터 안에서의 이동이면 False를 반환
+    def update_client_sector(self, client_id: str, x: int, y: int) -> bool:
         key = self.get_sector_key(x, y)
-        for sector, clients in self.sectors.items():
-            if client_id in clients and sector != key:
-                clients.remove(client_id)
-        self.sectors.setdefault(key, []).append(client_id)
+        old_key = self.client_sectors.get(client_id)
+        if old_key == key:
+            return False
+
+        if old_key is not None:
+            self._discard(client_id, old_key)
+        self.sectors.setdefault(key, set()).add(client_id)
+        self.client_sectors[client_id] = key
+        self._invalidate(key)
+        return True
+
+    # 인접 섹터에 있는 클라이언트를 순회 (새 컬렉션을 만들지 않음)
+    # 순회 도중 섹터가 변경될 수 있으므로 await 를 사이에 두고 사용하지 말 것
+    def iter_nearby_clients(self, x: int, y: int) -> Iterator[str]:
+        sector_x, sector_y = self.get_sector_key(x, y)
+        for offset_x, offset_y in NEIGHBOR_OFFSETS:
+            clients = self.sectors.get((sector_x + offset_x, sector_y + offset_y))
+            if clients:
+                yield from clients
 
     # 인접 섹터에 있는 클라이언트 목록을 반환
-    def get_nearby_clients(self, x: int, y: int) -> List[str]:
-        sector_key = self.get_sector_key(x, y)
-        nearby = set()
-        for offset_x in [-1, 0, 1]:
-            for offset_y in [-1, 0, 1]:
-                nearby_sector = f"{x // self.sector_size + offset_x}:{y // self.sector_size + offset_y}"
-                nearby.update(self.sectors.get(nearby_sector, []))
-        return list(nearby)
-    
+    # 결과는 섹터별로 캐시되며, 불변 튜플이므로 await 를 사이에 두고 순회해도 안전
+    def get_nearby_clients(self, x: int, y: int) -> Tuple[str, ...]:
+        key = self.get_sector_key(x, y)
+        nearby = self._nearby_cache.get(key)
+        if nearby is None:
+            nearby = tuple(self.iter_nearby_clients(x, y))
+            self._nearby_cache[key] = nearby
+        return nearby
+
+    # 클라이언트가 있는 섹터 기준의 인접 클라이언트 목록 (클라이언트 본인 포함)
+    def get_client_nearby_clients(self, client_id: str) -> Tuple[str, ...]:
+        key = self.client_sectors.get(client_id)
+        if key is None:
+            return ()
+        nearby = self._nearby_cache.get(key)
+        if nearby is None:
+            sector_x, sector_y = key
+            nearby = tuple(
+                client
+                for offset_x, offset_y in NEIGHBOR_OFFSETS
+                for client in self.sectors.get(
+                    (sector_x + offset_x, sector_y + offset_y), ()
+                )
+            )
+            self._nearby_cache[key] = nearby
+        return nearby
+
+    # client_id 를 시야에 둘 수 있는 클라이언트 후보 (3x3 시야는 대칭이므로 인접 목록과 같음)
+    def get_observer_candidates(self, client_id: str) -> Tuple[str, ...]:
+        return self.get_client_nearby_clients(client_id)
+
+    # observer 의 시야(인접 3x3 섹터)에 target 이 있는지 확인
+    def is_nearby(self, observer: str, target: str) -> bool:
+        observer_key = self.client_sectors.get(observer)
+        target_key = self.client_sectors.get(target)
+        if observer_key is None or target_key is None:
+            return False
+        return (
+            abs(observer_key[0] - target_key[0]) <= 1
+            and abs(observer_key[1] - target_key[1]) <= 1
+        )
+
+    # 다른 클라이언트의 이동으로 섹터가 바뀐 클라이언트 목록 (고정 격자에서는 항상 비어 있음)
+    def drain_relocated(self) -> List[str]:
+        return []
+
     # 섹터에서 클라이언트 제거
     def remove_client_from_sector(self, client_id: str):
-        for sector_key, clients in self.sectors.items():
-            if client_id in clients:
-                clients.remove(client_id)
-                if not clients:  # 섹터가 비어 있으면 삭제
-                    del self.sectors[sector_key]
+        key = self.client_sectors.pop(client_id, None)
+        if key is not None:
+            self._discard(client_id, key)
+
+    def _discard(self, client_id: str, key: SectorKey):
+        clients = self.sectors.get(key)
+        if clients is None:
+            return
+        clients.discard(client_id)
+        if not clients:  # 섹터가 비어 있으면 삭제
+            del self.sectors[key]
+        self._invalidate(key)
+
+    # 해당 섹터를 3x3 범위에 포함하는 섹터들의 인접 캐시를 무효화
+    def _invalidate(self, key: SectorKey):
+        if not self._nearby_cache:
+            return
+        sector_x, sector_y = key
+        for offset_x, offset_y in NEIGHBOR_OFFSETS:
+            self._nearby_cache.pop((sector_x + offset_x, sector_y + offset_y), None)
+
+
+# AdaptiveSectorManager 클래스: 붐비는 섹터를 쿼드트리 방식으로 쪼개고, 한산해지면 다시 합치는 섹터 관리 클래스
+# 기본 섹터(sector_size) 안의 인원이 split_threshold 를 넘으면 4개의 하위 섹터로 나누고(max_depth 까지),
+# 하위 섹터 인원 합이 절반 이하로 줄면 다시 합칩니다.
+# 시야 범위는 클라이언트가 속한 섹터 크기 기준의 3x3 범위이므로, 붐비는 곳일수록 시야가 좁아지고
+# max_neighbors 가 설정되면 가까운 순서로 최대 max_neighbors 명까지만 시야에 포함합니다.
+class AdaptiveSectorManager:
+    def __init__(
+        self,
+        sector_size: int,
+        split_threshold: int = 32,
+        max_depth: int = 3,
+        max_neighbors: int = 0,
+    ):
+        self.sector_size = sector_size
+        self.split_threshold = split_threshold
+        self.merge_threshold = split_threshold // 2
+        self.max_depth = max_depth
+        self.max_neighbors = max_neighbors
+
+        # 말단 섹터 (level, x, y) -> 클라이언트 집합
+        self.sectors: Dict[LeafKey, Set[str]] = {}
+        # 하위 섹터로 나뉜 섹터 키
+        self.split_sectors: Set[LeafKey] = set()
+        self.client_sectors: Dict[str, LeafKey] = {}
+        self.positions: Dict[str, Tuple[int, int]] = {}
+        self._relocated: List[str] = []
+
+    # 주어진 좌표가 속한 말단 섹터 키를 반환
+    def get_sector_key(self, x: int, y: int) -> LeafKey:
+        x, y = int(x), int(y)
+        level = 0
+        size = self.sector_size
+        key = (0, x // size, y // size)
+        while key in self.split_sectors:
+            level += 1
+            key = (level, (x << level) // size, (y << level) // size)
+        return key
+
+    # 클라이언트의 위치를 업데이트
+    # 말단 섹터가 바뀌었으면 True, 같은 섹터 안에서의 이동이면 False를 반환
+    def update_client_sector(self, client_id: str, x: int, y: int) -> bool:
+        x, y = int(x), int(y)
+        self.positions[client_id] = (x, y)
+        key = self.get_sector_key(x, y)
+        old_key = self.client_sectors.get(client_id)
+        if old_key == key:
+            return False
+
+        if old_key is not None:
+            self._discard(client_id, old_key)
+            # 합쳐지면서 목적지 섹터가 바뀌었을 수 있음
+            key = self.get_sector_key(x, y)
+
+        clients = self.sectors.setdefault(key, set())
+        clients.add(client_id)
+        self.client_sectors[client_id] = key
+        if len(clients) > self.split_threshold and key[0] < self.max_depth:
+            self._split(key)
+        return True
+
+    # 주어진 좌표 기준의 인접 클라이언트 목록 (인원 제한 없음)
+    def get_nearby_clients(self, x: int, y: int) -> Tuple[str, ...]:
+        return tuple(self._collect(self.get_sector_key(x, y)))
+
+    # 클라이언트 기준의 인접 클라이언트 목록 (클라이언트 본인 포함)
+    # max_neighbors 가 설정되어 있으면 가까운 순서로 잘라서 반환
+    def get_client_nearby_clients(self, client_id: str) -> Tuple[str, ...]:
+        key = self.client_sectors.get(client_id)
+        if key is None:
+            return ()
+        nearby = self._collect(key)
+        if self.max_neighbors and len(nearby) > self.max_neighbors + 1:
+            x, y = self.positions[client_id]
+            positions = self.positions
+            nearby = heapq.nsmallest(
+                self.max_neighbors + 1,
+                nearby,
+                key=lambda other: (positions[other][0] - x) ** 2
+                + (positions[other][1] - y) ** 2,
+            )
+        return tuple(nearby)
+
+    # client_id 를 시야에 둘 수 있는 클라이언트 후보
+    # 어떤 섹터의 시야도 기본 섹터 한 칸을 넘지 않으므로, 기본 섹터 기준 3x3 범위면 충분
+    def get_observer_candidates(self, client_id: str) -> Tuple[str, ...]:
+        position = self.positions.get(client_id)
+        if position is None:
+            return ()
+        x, y = position
+        return tuple(self._collect((0, x // self.sector_size, y // self.sector_size)))
+
+    # observer 의 시야(observer 섹터 크기 기준 3x3 범위)에 target 의 섹터가 걸쳐 있는지 확인
+    def is_nearby(self, observer: str, target: str) -> bool:
+        observer_key = self.client_sectors.get(observer)
+        target_key = self.client_sectors.get(target)
+        if observer_key is None or target_key is None:
+            return False
+        return self._intersects(observer_key, target_key)
+
+    # 다른 클라이언트의 이동으로 섹터가 나뉘거나 합쳐져 섹터가 바뀐 클라이언트 목록
+    def drain_relocated(self) -> List[str]:
+        relocated, self._relocated = self._relocated, []
+        return relocated
+
+    # 섹터에서 클라이언트 제거
+    def remove_client_from_sector(self, client_id: str):
+        key = self.client_sectors.pop(client_id, None)
+        self.positions.pop(client_id, None)
+        if key is not None:
+            self._discard(client_id, key)
+
+    def _discard(self, client_id: str, key: LeafKey):
+        clients = self.sectors.get(key)
+        if clients is None:
+            return
+        clients.discard(client_id)
+        if not clients:
+            del self.sectors[key]
+        self._merge(key)
+
+    # 말단 섹터를 4개의 하위 섹터로 나눔
+    def _split(self, key: LeafKey):
+        level, sector_x, sector_y = key
+        clients = self.sectors.pop(key, set())
+        self.split_sectors.add(key)
+
+        size = self.sector_size
+        child_level = level + 1
+        children: Dict[LeafKey, Set[str]] = {}
+        for client_id in clients:
+            x, y = self.positions[client_id]
+            child_key = (
+                child_level,
+                (x << child_level) // size,
+                (y << child_level) // size,
+            )
+            children.setdefault(child_key, set()).add(client_id)
+            self.client_sectors[client_id] = child_key
+            self._relocated.append(client_id)
+        self.sectors.update(children)
+
+        for child_key, child_clients in children.items():
+            if (
+                len(child_clients) > self.split_threshold
+                and child_level < self.max_depth
+            ):
+                self._split(child_key)
+
+    # 형제 섹터의 인원 합이 merge_threshold 이하이면 부모 섹터로 합침 (상위로 반복)
+    def _merge(self, key: LeafKey):
+        level, sector_x, sector_y = key
+        while level > 0:
+            parent = (level - 1, sector_x >> 1, sector_y >> 1)
+            siblings = [
+                (level, (parent[1] << 1) + offset_x, (parent[2] << 1) + offset_y)
+                for offset_x in (0, 1)
+                for offset_y in (0, 1)
+            ]
+            if any(sibling in self.split_sectors for sibling in siblings):
+                return
+            if (
+                sum(len(self.sectors.get(sibling, ())) for sibling in siblings)
+                > self.merge_threshold
+            ):
                 return
 
-# SectorManager 인스턴스 생성
-sector_manager = SectorManager(sector_size=300)
+            merged: Set[str] = set()
+            for sibling in siblings:
+                merged.update(self.sectors.pop(sibling, ()))
+            self.split_sectors.discard(parent)
+            if merged:
+                self.sectors[parent] = merged
+            for client_id in merged:
+                self.client_sectors[client_id] = parent
+                self._relocated.append(client_id)
+            level, sector_x, sector_y = parent
 
-# 클라이언트의 이동을 처리하는 함수
-# 클라이언트의 새 위치를 업데이트
-# 섹터 정보를 기반으로 인접 클라이언트에게 이동 정보를 전송
-async def update_movement(sid, data, emit_callback, client_info_store):
+    # key 섹터 크기 기준 3x3 범위에 걸친 말단 섹터의 클라이언트를 수집
+    def _collect(self, key: LeafKey) -> List[str]:
+        level, sector_x, sector_y = key
+        nearby: List[str] = []
+        for base_x in range((sector_x - 1) >> level, ((sector_x + 1) >> level) + 1):
+            for base_y in range((sector_y - 1) >> level, ((sector_y + 1) >> level) + 1):
+                self._collect_node((0, base_x, base_y), key, nearby)
+        return nearby
+
+    def _collect_node(self, node: LeafKey, key: LeafKey, nearby: List[str]):
+        if node in self.split_sectors:
+            level, node_x, node_y = node
+            for offset_x in (0, 1):
+                for offset_y in (0, 1):
+                    child = (
+                        level + 1,
+                        (node_x << 1) + offset_x,
+                        (node_y << 1) + offset_y,
+                    )
+                    if self._intersects(key, child):
+                        self._collect_node(child, key, nearby)
+            return
+        clients = self.sectors.get(node)
+        if clients:
+            nearby.extend(clients)
+
+    # key 섹터 기준 3x3 범위와 node 섹터가 겹치는지 확인
+    @staticmethod
+    def _intersects(key: LeafKey, node: LeafKey) -> bool:
+        level, sector_x, sector_y = key
+        node_level, node_x, node_y = node
+        if node_level >= level:
+            shift = node_level - level
+            return (
+                abs((node_x >> shift) - sector_x) <= 1
+                and abs((node_y >> shift) - sector_y) <= 1
+            )
+        shift = level - node_level
+        span = (1 << shift) - 1
+        return (
+            (node_x << shift) <= sector_x + 1
+            and (node_x << shift) + span >= sector_x - 1
+            and (node_y << shift) <= sector_y + 1
+            and (node_y << shift) + span >= sector_y - 1
+        )
+
+
+# SectorRegistry 클래스: 방(room)마다 독립된 SectorManager 를 관리하는 클래스
+# 다른 방에 있는 클라이언트는 좌표가 같아도 서로 인접 클라이언트로 취급되지 않습니다.
+# 방이 비면 해당 방의 섹터 인덱스를 해제합니다.
+class SectorRegistry:
+    def __init__(
+        self,
+        sector_size: int,
+        index_factory: Optional[Callable[[], SectorManager]] = None,
+    ):
+        self.sector_size = sector_size
+        self.index_factory = index_factory or (lambda: SectorManager(sector_size))
+        self.rooms: Dict[str, SectorManager] = {}
+        self.client_rooms: Dict[str, str] = {}
+
+    # 방의 섹터 인덱스를 반환 (없으면 None)
+    def get(self, room_id: str) -> Optional[SectorManager]:
+        return self.rooms.get(room_id)
+
+    # 클라이언트가 속한 방의 섹터 인덱스를 반환 (없으면 None)
+    def get_client_index(self, client_id: str) -> Optional[SectorManager]:
+        room_id = self.client_rooms.get(client_id)
+        if room_id is None:
+            return None
+        return self.rooms.get(room_id)
+
+    # 클라이언트를 방에 배치 (다른 방에 있었다면 기존 방에서 제거)
+    # 섹터 경계를 넘었거나 방이 바뀌었으면 True 를 반환
+    def update_client_sector(
+        self, client_id: str, room_id: str, x: int, y: int
+    ) -> bool:
+        if client_id in self.client_rooms and self.client_rooms[client_id] != room_id:
+            self.remove_client(client_id)
+
+        index = self.rooms.get(room_id)
+        if index is None:
+            index = self.rooms[room_id] = self.index_factory()
+        self.client_rooms[client_id] = room_id
+        return index.update_client_sector(client_id, x, y)
+
+    # 클라이언트와 같은 방의 인접 클라이언트 목록을 반환
+    def get_nearby_clients(self, room_id: str, x: int, y: int) -> Tuple[str, ...]:
+        index = self.rooms.get(room_id)
+        if index is None:
+            return ()
+        return index.get_nearby_clients(x, y)
+
+    # 클라이언트를 현재 방의 섹터 인덱스에서 제거하고, 방이 비면 인덱스를 해제
+    def remove_client(self, client_id: str):
+        if client_id not in self.client_rooms:
+            return
+        room_id = self.client_rooms.pop(client_id)
+        index = self.rooms.get(room_id)
+        if index is None:
+            return
+        index.remove_client_from_sector(client_id)
+        if not index.client_sectors:
+            del self.rooms[room_id]
+
+
+# 설정에 따라 방마다 사용할 섹터 인덱스를 생성
+def create_sector_index():
+    if settings.spatial_index == "adaptive":
+        return AdaptiveSectorManager(
+            sector_size=300,
+            split_threshold=settings.sector_split_threshold,
+            max_depth=settings.sector_max_depth,
+            max_neighbors=settings.max_view_neighbors,
+        )
+    return SectorManager(sector_size=300)
+
+
+# 수신 좌표의 절댓값 상한 (섹터 크기 300 기준 PositionStore 에 저장할 수 있는 범위)
+MAX_COORDINATE = coordinate_limit(300)
+# 수신 방향 값 범위 (바이너리 이동 프레임의 int8)
+MIN_DIRECTION, MAX_DIRECTION = -128, 127
+
+# SectorRegistry / InterestManager 인스턴스 생성
+sector_registry = SectorRegistry(sector_size=300, index_factory=create_sector_index)
+interest_manager = InterestManager()
+
+# 벡터화 이동 엔진은 틱 모드 + 고정 격자에서만 사용 (섹터 경계 판정이 격자와 같아야 함)
+position_store = None
+if (
+    settings.movement_engine == "numpy"
+    and settings.movement_tick_rate > 0
+    and settings.spatial_index == "grid"
+):
+    from core.positions import PositionStore
+
+    position_store = PositionStore(cell_size=300)
+
+_NOT_INDEXED = object()
+
+
+# 클라이언트 레코드에 저장된 좌표를 반환 (수신 시점에 이미 정수로 변환됨, 위치 정보가 없으면 None)
+def get_client_position(client_id: str, client_info_store) -> Optional[Tuple[int, int]]:
+    client = client_info_store.get(client_id)
+    if client is None or client.position_x is None or client.position_y is None:
+        return None
+    return client.position_x, client.position_y
+
+
+# 섹터 경계를 넘은 클라이언트의 시야를 다시 계산하고,
+# 주변 클라이언트의 시야에서는 해당 클라이언트 항목만 갱신
+# (observer, target) 쌍으로 입장/퇴장 목록을 반환
+def refresh_interest(
+    client_id: str, index: SectorManager
+) -> Tuple[ViewEvents, ViewEvents]:
+    nearby = index.get_client_nearby_clients(client_id)
+    entered_targets, left_targets = interest_manager.set_view(client_id, nearby)
+    entered = [(client_id, target) for target in entered_targets]
+    left = [(client_id, target) for target in left_targets]
+
+    # 기존에 나를 보던 클라이언트와 나를 볼 수 있는 주변 클라이언트만 확인
+    candidates = set(interest_manager.get_viewers(client_id))
+    candidates.update(index.get_observer_candidates(client_id))
+    candidates.discard(client_id)
+    for observer in candidates:
+        if index.is_nearby(observer, client_id):
+            # 시야 인원 제한에 걸리면 observer 가 다음에 섹터를 옮길 때 다시 계산됨
+            if (
+                index.max_neighbors
+                and len(interest_manager.get_view(observer)) >= index.max_neighbors
+            ):
+                continue
+            if interest_manager.add(observer, client_id):
+                entered.append((observer, client_id))
+        elif interest_manager.discard(observer, client_id):
+            left.append((observer, client_id))
+    return entered, left
+
+
+# 클라이언트 위치를 방의 섹터 인덱스에 반영하고 시야 변경 목록을 반환
+# 섹터 경계를 넘거나 방이 바뀐 경우에만 시야를 다시 계산
+def apply_movement(
+    client_id: str, room_id: str, x: int, y: int
+) -> Tuple[ViewEvents, ViewEvents]:
+    entered: ViewEvents = []
+    left: ViewEvents = []
+
+    old_room_id = sector_registry.client_rooms.get(client_id, _NOT_INDEXED)
+    if old_room_id is not _NOT_INDEXED and old_room_id != room_id:
+        entered_now, left_now = remove_client(client_id)
+        entered.extend(entered_now)
+        left.extend(left_now)
+
+    if position_store is not None and position_store.in_range(x, y):
+        slot = position_store.set(client_id, room_id, x, y)
+        position_store.update_cells(np.array([slot]))
+
+    if sector_registry.update_client_sector(client_id, room_id, x, y):
+        index = sector_registry.get(room_id)
+        # 섹터가 나뉘거나 합쳐져 섹터가 바뀐 다른 클라이언트의 시야도 함께 갱신
+        refresh_clients(index, (client_id, *index.drain_relocated()), entered, left)
+    return entered, left
+
+
+# 주어진 클라이언트들의 시야를 다시 계산해 입장/퇴장 목록에 추가 (인덱스에 없는 클라이언트는 건너뜀)
+def refresh_clients(
+    index: SectorManager, client_ids, entered: ViewEvents, left: ViewEvents
+):
+    for refreshed in dict.fromkeys(client_ids):
+        if refreshed not in index.client_sectors:
+            continue
+        entered_now, left_now = refresh_interest(refreshed, index)
+        entered.extend(entered_now)
+        left.extend(left_now)
+
+
+# 클라이언트를 섹터 인덱스와 모든 시야에서 제거하고 시야 변경 목록을 반환
+# 제거로 섹터가 합쳐지면 섹터가 바뀐 남은 클라이언트의 시야도 다시 계산
+def remove_client(client_id: str) -> Tuple[ViewEvents, ViewEvents]:
+    index = sector_registry.get_client_index(client_id)
+    sector_registry.remove_client(client_id)
+    if position_store is not None:
+        position_store.remove(client_id)
+
+    entered: ViewEvents = []
+    left: ViewEvents = [
+        (observer, client_id) for observer in interest_manager.remove_client(client_id)
+    ]
+    if index is not None:
+        refresh_clients(index, index.drain_relocated(), entered, left)
+    return entered, left
+
+
+# 시야 입장/퇴장 이벤트 전송
+# 입장 시에는 대상의 전체 정보를, 퇴장 시에는 client_id 만 전송
+async def emit_view_events(entered, left, emit_callback, client_info_store):
+    for observer, target in entered:
+        if observer not in client_info_store or target not in client_info_store:
+            continue
+
+        target_data = client_info_store[target]
+        await emit_callback(
+            observer,
+            {
+                "client_id": target,
+                "user_name": target_data.user_name,
+                "position_x": target_data.position_x,
+                "position_y": target_data.position_y,
+                "direction": target_data.direction,
+            },
+            "SC_ENTER_VIEW",
+        )
+
+    for observer, target in left:
+        if observer not in client_info_store:
+            continue
+
+        await emit_callback(observer, {"client_id": target}, "SC_LEAVE_VIEW")
+
+
+# 클라이언트의 시야 목록을 업데이트하는 함수
+# 섹터 경계를 넘었을 때만 시야를 갱신하고, 새로 보이거나 사라진 클라이언트를 알림
+async def handle_view_list_update(sid, data, emit_callback, client_info_store):
     client_id = data.get("client_id")
     if not client_id:
         print("Client ID missing")
         return
 
-    user_name = data.get("user_name")
-
-    # 클라이언트의 새 위치와 방향 정보 가져오기
-    x, y, direction = int(data.get("position_x")), int(data.get("position_y")), data.get("direction")
-    if x is None or y is None:
+    position = get_client_position(client_id, client_info_store)
+    if position is None:
         print("Missing position data")
         return
 
-    # 섹터 정보를 업데이트하고 인접 클라이언트를 가져오기
-    sector_manager.update_client_sector(client_id, x, y)
-    nearby_clients = sector_manager.get_nearby_clients(x, y)
+    room_id = client_info_store[client_id].room_id
+    entered, left = apply_movement(client_id, room_id, *position)
+    if entered or left:
+        await emit_view_events(entered, left, emit_callback, client_info_store)
 
-    # 인접 클라이언트에게 이동 정보 전송
-    for other_client in nearby_clients:
-        if other_client == client_id:
-            continue
 
-        if other_client not in client_info_store:
-            continue
+# 클라이언트 레코드로 이동 패킷 생성
+def build_movement_packet(client_id: str, client) -> dict:
+    return {
+        "client_id": client_id,
+        "position_x": client.position_x,
+        "position_y": client.position_y,
+        "direction": client.direction,
+        "user_name": client.user_name,
+    }
 
-        await emit_callback(other_client, {
-            "client_id": client_id,
-            "position_x": int(x),
-            "position_y": int(y),
-            "direction": int(direction),
-            "user_name": user_name,
-        })
 
-# 클라이언트의 시야 목록을 업데이트하는 함수
-# 새롭게 보이는 클라이언트를 추가하고 보이지 않게 된 클라이언트를 제거
-async def handle_view_list_update(sid, data, emit_callback, client_info_store, client_view_list):
+# 방 입장 스냅샷 (입장한 클라이언트 본인 정보와 방에 있는 다른 클라이언트 목록)
+# 이 노드에 상태가 있는 클라이언트만 포함하며, 방 인원이 max_clients 를 넘으면
+# 섹터 인덱스 기준으로 주변 클라이언트만 포함 (0 이면 제한 없음)
+def build_room_snapshot(
+    client_id: str, room_id: str, members, client_info_store, max_clients: int = 0
+) -> dict:
+    if max_clients and len(members) > max_clients:
+        position = get_client_position(client_id, client_info_store)
+        if position is not None:
+            members = sector_registry.get_nearby_clients(room_id, *position)
+
+    return {
+        "room_id": room_id,
+        "client": build_movement_packet(client_id, client_info_store[client_id]),
+        "clients": [
+            build_movement_packet(member, client_info_store[member])
+            for member in members
+            if member != client_id and member in client_info_store
+        ],
+    }
+
+
+# 이동 패킷과 수신 대상(나를 보고 있는 클라이언트) 목록을 반환
+# 위치 정보가 올바르지 않으면 None 을 반환
+def collect_movement(data, client_info_store) -> Optional[Tuple[dict, Tuple[str, ...]]]:
     client_id = data.get("client_id")
     if not client_id:
         print("Client ID missing")
-        return
-    
-    # 키가 없으면 빈 리스트로 초기화
-    if client_id not in client_view_list:
-        client_view_list[client_id] = []
-
-    # 현재 위치를 기준으로 새로운 시야 목록 계산
-    new_view_list = sector_manager.get_nearby_clients(
-        data.get("position_x"), data.get("position_y")
+        return None
+
+    if get_client_position(client_id, client_info_store) is None:
+        print("Missing position data")
+        return None
+
+    packet = build_movement_packet(client_id, client_info_store[client_id])
+    recipients = tuple(
+        observer
+        for observer in interest_manager.get_viewers(client_id)
+        if observer in client_info_store
     )
+    return packet, recipients
 
-    # 기존 시야 목록 가져오기
-    current_view_list = client_view_list.get(client_id, [])
 
-    # 현재 시야 목록과 비교하여 추가 및 제거할 클라이언트 계산
-    added_clients = set(new_view_list) - set(current_view_list)
+# 클라이언트의 이동을 처리하는 함수
+# 나를 보고 있는 클라이언트에게 이동 정보를 전송
+# handle_view_list_update 로 위치를 먼저 반영한 뒤 호출
+async def update_movement(sid, data, emit_callback, client_info_store):
+    movement = collect_movement(data, client_info_store)
+    if movement is None:
+        return
 
-    # 새롭게 보이는 클라이언트를 클라이언트에게 전송
-    for client in added_clients:
-        if client not in client_info_store:
-            continue
+    # 인접 클라이언트에게 이동 정보 전송
+    packet, recipients = movement
+    for other_client in recipients:
+        await emit_callback(other_client, packet)
+
+
+# MovementCoalescer 클래스: 클라이언트별 이동 패킷을 최신 것 하나로 합치고 처리 빈도를 제한하는 클래스
+# 처리 중이거나 최소 간격이 지나지 않은 동안 들어온 패킷은 대기 슬롯의 값을 덮어쓰고(last-write-wins),
+# 처리 차례가 오면 가장 최신 패킷 하나만 처리합니다.
+class MovementCoalescer:
+    def __init__(self, max_rate: float):
+        self.min_interval = 1 / max_rate if max_rate > 0 else 0.0
+        self.pending: Dict[str, dict] = {}
+        self.active: Set[str] = set()
+        self.last_processed: Dict[str, float] = {}
+
+        # 통계: 수신한 패킷 수, 실제 처리한 패킷 수, 최신 패킷에 덮어써져 버려진 패킷 수
+        self.received = 0
+        self.processed = 0
+        self.coalesced = 0
 
-        client_data = client_info_store[client]
-        await emit_callback(client, {
-            "client_id": client,
-            "user_name": client_data.user_name,
-            "position_x": int(client_data.position_x),
-            "position_y": int(client_data.position_y),
-            "direction": int(client_data.direction),
-        })
+    # 이동 패킷 등록 후, 해당 클라이언트를 처리 중인 작업이 없으면 직접 처리
+    async def submit(self, client_id: str, data: dict, process):
+        self.received += 1
+        if client_id in self.pending:
+            self.coalesced += 1
+        self.pending[client_id] = data
 
-    # 시야 목록 업데이트
-    client_view_list[client_id] = new_view_list
+        # 이미 처리 중인 작업이 최신 패킷을 이어서 처리함
+        if client_id in self.active:
+            return
 
+        self.active.add(client_id)
+        loop = asyncio.get_running_loop()
+        try:
+            while client_id in self.pending:
+                delay = (
+                    self.last_processed.get(client_id, 0.0)
+                    + self.min_interval
+                    - loop.time()
+                )
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    if client_id not in self.pending:
+                        break
+
+                data = self.pending.pop(client_id)
+                self.last_processed[client_id] = loop.time()
+                self.processed += 1
+                await process(data)
+        finally:
+            self.active.discard(client_id)
+
+    # 연결이 끊긴 클라이언트의 대기 패킷과 처리 기록 삭제
+    def discard(self, client_id: str):
+        self.pending.pop(client_id, None)
+        self.last_processed.pop(client_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "received": self.received,
+            "processed": self.processed,
+            "coalesced": self.coalesced,
+        }
+
+
+# MovementCoalescer 인스턴스 생성
+movement_coalescer = MovementCoalescer(max_rate=settings.movement_max_rate)
+
+
+# MovementTicker 클래스: 고정 주기(tick)로 이동 정보를 모아서 전송하는 클래스
+# 틱 동안 클라이언트별 최신 위치만 보관하고, 틱마다 수신자별로 보이는 모든 이동을
+# SC_MOVEMENT_INFO_BATCH 한 번으로 묶어 전송합니다.
+class MovementTicker:
+    def __init__(self, tick_rate: int):
+        self.tick_rate = tick_rate
+        self.pending: Dict[str, dict] = {}
+
+        # 통계: 수신한 패킷 수, 같은 틱 안에서 최신 패킷에 덮어써진 패킷 수
+        self.received = 0
+        self.coalesced = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.tick_rate > 0
+
+    # 다음 틱에 처리할 이동 정보를 등록 (같은 클라이언트의 이전 정보는 덮어씀)
+    def submit(self, client_id: str, data: dict):
+        self.received += 1
+        if client_id in self.pending:
+            self.coalesced += 1
+        self.pending[client_id] = data
+
+    # 처리 대기 중인 클라이언트의 이동 정보를 폐기
+    def discard(self, client_id: str):
+        self.pending.pop(client_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"received": self.received, "coalesced": self.coalesced}
+
+    # 틱 루프 실행
+    async def run(self, emit_callback, emit_batch_callback, client_info_store):
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.tick_rate
+        next_tick = loop.time()
+
+        while True:
+            try:
+                await self.tick(emit_callback, emit_batch_callback, client_info_store)
+            except Exception as e:
+                print(f"Movement tick error: {e}")
+
+            next_tick += interval
+            delay = next_tick - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # 틱 처리가 주기를 넘기면 밀린 틱을 따라잡지 않고 다음 틱부터 다시 시작
+                next_tick = loop.time()
+                await asyncio.sleep(0)
+
+    # 대기 중인 이동 정보를 한 번에 처리하고 수신자별로 묶어서 전송
+    async def tick(self, emit_callback, emit_batch_callback, client_info_store):
+        if not self.pending:
+            return
+
+        pending, self.pending = self.pending, {}
+        batches: Dict[str, List[dict]] = {}
+
+        for client_id, data in pending.items():
+            if client_id not in client_info_store:
+                continue
+
+            await handle_view_list_update(
+                sid=client_info_store[client_id].sid,
+                data=data,
+                emit_callback=emit_callback,
+                client_info_store=client_info_store,
+            )
+
+            movement = collect_movement(data, client_info_store)
+            if movement is None:
+                continue
+
+            packet, recipients = movement
+            for other_client in recipients:
+                batches.setdefault(other_client, []).append(packet)
+
+        for recipient, movements in batches.items():
+            await emit_batch_callback(recipient, movements)
+
+
+# VectorizedMovementTicker 클래스: PositionStore 를 사용해 틱 단위로 이동을 일괄 처리하는 틱 루프
+# 틱 동안 움직인 모든 클라이언트의 위치 기록, 섹터 이동 판정, 인접 클라이언트 계산을
+# 각각 한 번의 벡터 연산으로 수행하고, 섹터를 넘은 클라이언트만 시야 갱신 경로를 거칩니다.
+class VectorizedMovementTicker(MovementTicker):
+    def __init__(self, tick_rate: int, store):
+        super().__init__(tick_rate)
+        self.store = store
+
+    async def tick(self, emit_callback, emit_batch_callback, client_info_store):
+        if not self.pending:
+            return
+
+        pending, self.pending = self.pending, {}
+
+        client_ids = []
+        room_ids = []
+        positions = []
+        packets = []
+        for client_id, data in pending.items():
+            position = get_client_position(client_id, client_info_store)
+            if position is None:
+                continue
+            # 배열에 저장할 수 없는 좌표는 이 클라이언트만 건너뜀 (틱 전체가 실패하지 않도록)
+            if not self.store.in_range(*position):
+                print(f"Position out of range for {client_id}: {position}")
+                continue
+            client = client_info_store[client_id]
+            client_ids.append(client_id)
+            room_ids.append(client.room_id)
+            positions.append(position)
+            packets.append(build_movement_packet(client_id, client))
+
+        if not client_ids:
+            return
+
+        xs, ys = zip(*positions)
+        slots = self.store.set_many(client_ids, room_ids, xs, ys)
+        crossed = self.store.update_cells(slots)
+
+        # 섹터를 넘은 클라이언트만 섹터 인덱스와 시야를 갱신
+        for index in np.flatnonzero(crossed).tolist():
+            await handle_view_list_update(
+                sid=client_info_store[client_ids[index]].sid,
+                data=pending[client_ids[index]],
+                emit_callback=emit_callback,
+                client_info_store=client_info_store,
+            )
+
+        # 움직인 클라이언트 전체의 인접 클라이언트를 한 번에 계산해 수신자별로 묶음
+        owners, neighbours = self.store.neighbour_pairs(slots)
+        store_client_ids = self.store.client_ids
+        batches: Dict[str, List[dict]] = {}
+        for owner, neighbour in zip(owners.tolist(), neighbours.tolist()):
+            recipient = store_client_ids[neighbour]
+            if recipient in client_info_store:
+                batches.setdefault(recipient, []).append(packets[owner])
+
+        for recipient, movements in batches.items():
+            await emit_batch_callback(recipient, movements)
+
+
+# MovementTicker 인스턴스 생성 (tick_rate 가 0 이면 패킷마다 즉시 전송)
+if position_store is not None:
+    movement_ticker = VectorizedMovementTicker(
+        tick_rate=settings.movement_tick_rate, store=position_store
+    )
+else:
+    movement_ticker = MovementTicker(tick_rate=settings.movement_tick_rate)
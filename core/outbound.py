@@ -0,0 +1,250 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Set
+
+from core.config import settings
+
+# 메시지 종류
+# MOVEMENT: 최신 상태로 대체되거나 버려도 되는 메시지 (버리면 나중에 전체 상태를 다시 보냄)
+# RELIABLE: 반드시 전달해야 하는 메시지 (채팅, 시야/퇴장 알림 등)
+MOVEMENT = "movement"
+RELIABLE = "reliable"
+
+# 대기열 항목 필드 인덱스 [event, data, kind, key, alive]
+_EVENT, _DATA, _KIND, _KEY, _ALIVE = range(5)
+
+
+# OutboundQueue 클래스: 연결 하나의 전송 대기열
+class OutboundQueue:
+    __slots__ = (
+        "sid",
+        "entries",
+        "keyed",
+        "size",
+        "reliable",
+        "needs_resync",
+        "wakeup",
+        "task",
+    )
+
+    def __init__(self, sid: str):
+        self.sid = sid
+        self.entries: Deque[list] = deque()
+        # 대체 가능한 이동 메시지: key -> 대기열 항목
+        self.keyed: Dict[Hashable, list] = {}
+        # 살아 있는 항목 수, 그중 RELIABLE 항목 수
+        self.size = 0
+        self.reliable = 0
+        self.needs_resync = False
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+
+# OutboundManager 클래스: 연결별 전송 대기열과 전송 작업을 관리하는 클래스
+# 핸들러는 대기열에 넣기만 하고 기다리지 않으므로 느린 클라이언트가 다른 클라이언트의 전송을 막지 않습니다.
+# 연결마다 전송 작업 하나가 대기열을 비우며, 전송 계층(engine.io) 버퍼가 high_water 를 넘으면
+# 버퍼가 줄어들 때까지 기다립니다. 그동안 쌓이는 메시지는 종류에 따라 처리합니다.
+# - MOVEMENT: key 가 같은 메시지는 최신 값으로 대체하고, 대기열이 max_size 에 닿으면 가장 오래된 것부터 버림
+#   (버린 경우 대기열이 비었을 때 resync 콜백으로 전체 상태를 다시 보냄)
+# - RELIABLE: 버리지 않음
+# 전송 계층이 slow_timeout 초 넘게 막혀 있거나 RELIABLE 메시지가 max_reliable 개를 넘으면 연결을 끊습니다.
+# 대기열은 연결이 수락될 때 open 으로 만들고 연결 종료 정리가 끝나면 close 로 제거하며,
+# 열려 있지 않은 sid 로 보내는 메시지는 버립니다.
+class OutboundManager:
+    def __init__(
+        self,
+        max_size: int,
+        high_water: int,
+        slow_timeout: float,
+        max_reliable: int,
+        poll_interval: float = 0.05,
+    ):
+        self.max_size = max_size
+        self.high_water = high_water
+        self.slow_timeout = slow_timeout
+        self.max_reliable = max_reliable
+        self.poll_interval = poll_interval
+        self.queues: Dict[str, OutboundQueue] = {}
+        # 진행 중인 느린 연결 끊기 작업 (끝나기 전에 가비지 컬렉션되지 않도록 보관)
+        self.disconnect_tasks: Set[asyncio.Task] = set()
+
+        self.send_callback: Optional[Callable[[str, str, object], Awaitable]] = None
+        self.backlog_callback: Optional[Callable[[str], int]] = None
+        self.disconnect_callback: Optional[Callable[[str], Awaitable]] = None
+        self.resync_callback: Optional[Callable[[str], Awaitable]] = None
+
+        # 통계
+        self.sent = 0
+        self.dropped = 0
+        self.superseded = 0
+        self.slow_disconnects = 0
+        self.discarded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    # send: 실제 전송, backlog: 전송 계층 버퍼 길이, disconnect: 연결 끊기, resync: 전체 상태 재전송
+    def configure(self, send, backlog, disconnect, resync):
+        self.send_callback = send
+        self.backlog_callback = backlog
+        self.disconnect_callback = disconnect
+        self.resync_callback = resync
+
+    # 수락된 연결의 전송 대기열과 전송 작업 생성
+    def open(self, sid: str):
+        if not self.enabled or sid in self.queues:
+            return
+        queue = self.queues[sid] = OutboundQueue(sid)
+        queue.task = asyncio.create_task(self._run(queue))
+
+    # 메시지를 sid 의 전송 대기열에 추가 (기다리지 않음)
+    # 열리지 않았거나 이미 닫힌 연결이면 버림
+    def send(
+        self, sid: str, event: str, data, kind: str = RELIABLE, key: Hashable = None
+    ):
+        queue = self.queues.get(sid)
+        if queue is None:
+            self.discarded += 1
+            return
+
+        if kind == MOVEMENT:
+            if key is not None:
+                entry = queue.keyed.get(key)
+                if entry is not None:
+                    entry[_EVENT] = event
+                    entry[_DATA] = data
+                    self.superseded += 1
+                    return
+            if queue.size >= self.max_size and not self._drop_oldest_movement(queue):
+                # 대기열이 RELIABLE 메시지로 가득 찬 경우 이동 메시지는 버림
+                queue.needs_resync = True
+                self.dropped += 1
+                return
+        else:
+            queue.reliable += 1
+            if queue.reliable > self.max_reliable:
+                self._disconnect_slow(
+                    queue, f"{queue.reliable} reliable messages queued"
+                )
+                return
+            # 이후의 이동 메시지가 이 메시지보다 앞선 항목을 대체해 순서가 뒤바뀌지 않도록 함
+            queue.keyed.clear()
+
+        entry = [event, data, kind, key, True]
+        queue.entries.append(entry)
+        queue.size += 1
+        if key is not None:
+            queue.keyed[key] = entry
+        queue.wakeup.set()
+
+    # 연결 종료 시 대기열과 전송 작업 정리
+    def close(self, sid: str):
+        queue = self.queues.pop(sid, None)
+        if (
+            queue is not None
+            and queue.task is not None
+            and queue.task is not asyncio.current_task()
+        ):
+            queue.task.cancel()
+
+    def depth(self, sid: str) -> int:
+        queue = self.queues.get(sid)
+        return queue.size if queue is not None else 0
+
+    def stats(self) -> Dict[str, int]:
+        depths: List[int] = [queue.size for queue in self.queues.values()]
+        return {
+            "queues": len(depths),
+            "depth_total": sum(depths),
+            "depth_max": max(depths, default=0),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "superseded": self.superseded,
+            "slow_disconnects": self.slow_disconnects,
+            "discarded": self.discarded,
+        }
+
+    def _drop_oldest_movement(self, queue: OutboundQueue) -> bool:
+        for entry in queue.entries:
+            if entry[_ALIVE] and entry[_KIND] == MOVEMENT:
+                self._remove(queue, entry)
+                queue.needs_resync = True
+                self.dropped += 1
+                return True
+        return False
+
+    def _remove(self, queue: OutboundQueue, entry: list):
+        entry[_ALIVE] = False
+        queue.size -= 1
+        if entry[_KIND] == RELIABLE:
+            queue.reliable -= 1
+        if entry[_KEY] is not None and queue.keyed.get(entry[_KEY]) is entry:
+            del queue.keyed[entry[_KEY]]
+
+    def _disconnect_slow(self, queue: OutboundQueue, reason: str):
+        if self.queues.get(queue.sid) is not queue:
+            return
+        print(f"Disconnecting slow client {queue.sid}: {reason}")
+        self.slow_disconnects += 1
+        self.close(queue.sid)
+        if self.disconnect_callback is not None:
+            task = asyncio.create_task(self._disconnect(queue.sid))
+            self.disconnect_tasks.add(task)
+            task.add_done_callback(self.disconnect_tasks.discard)
+
+    async def _disconnect(self, sid: str):
+        try:
+            await self.disconnect_callback(sid)
+        except Exception as e:
+            print(f"Outbound disconnect error for {sid}: {e}")
+
+    # 전송 계층 버퍼가 high_water 이하가 될 때까지 대기, slow_timeout 을 넘기면 False
+    async def _wait_for_transport(self, queue: OutboundQueue) -> bool:
+        blocked_since = None
+        while self.backlog_callback(queue.sid) > self.high_water:
+            now = time.monotonic()
+            if blocked_since is None:
+                blocked_since = now
+            elif now - blocked_since > self.slow_timeout:
+                self._disconnect_slow(queue, f"blocked for {now - blocked_since:.1f}s")
+                return False
+            await asyncio.sleep(self.poll_interval)
+        return True
+
+    async def _run(self, queue: OutboundQueue):
+        while True:
+            if not queue.entries:
+                if queue.needs_resync and self.resync_callback is not None:
+                    queue.needs_resync = False
+                    try:
+                        await self.resync_callback(queue.sid)
+                    except Exception as e:
+                        print(f"Outbound resync error for {queue.sid}: {e}")
+                    continue
+                queue.wakeup.clear()
+                await queue.wakeup.wait()
+                continue
+
+            if not await self._wait_for_transport(queue):
+                return
+
+            entry = queue.entries.popleft()
+            if not entry[_ALIVE]:
+                continue
+            self._remove(queue, entry)
+            try:
+                await self.send_callback(queue.sid, entry[_EVENT], entry[_DATA])
+                self.sent += 1
+            except Exception as e:
+                print(f"Outbound send error for {queue.sid}: {e}")
+
+
+# OutboundManager 인스턴스 생성
+outbound = OutboundManager(
+    max_size=settings.outbound_queue_size,
+    high_water=settings.outbound_high_water,
+    slow_timeout=settings.outbound_slow_timeout,
+    max_reliable=settings.outbound_max_reliable,
+)
@@ -0,0 +1,212 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 셀 키 인코딩: (방 코드 << 42) | ((cell_y + BIAS) << 21) | (cell_x + BIAS)
+# cell_x 가 하위 비트에 있으므로 같은 방, 같은 cell_y 의 가로 3칸은 정렬 후 연속 구간이 됩니다.
+_CELL_BITS = 21
+_CELL_BIAS = 1 << (_CELL_BITS - 1)
+_NO_CELL = -1
+_NO_ROOM = -1
+_INT32_MAX = 2**31 - 1
+
+
+# 저장할 수 있는 좌표의 절댓값 상한
+# 좌표는 int32 배열에 저장되고, 셀 번호(좌표 // cell_size)는 부호 포함 21비트 안에 들어가야 함
+def coordinate_limit(cell_size: int) -> int:
+    return min(_INT32_MAX, _CELL_BIAS * cell_size - 1)
+
+
+# PositionStore 클래스: client_id 를 슬롯 번호에 매핑하고 좌표/방을 연속 배열에 저장하는 클래스
+# 틱마다 움직인 클라이언트 전체의 섹터 이동 여부와 인접 클라이언트를 한 번의 벡터 연산으로 계산합니다.
+class PositionStore:
+    def __init__(self, cell_size: int, capacity: int = 1024):
+        self.cell_size = cell_size
+        self.max_coordinate = coordinate_limit(cell_size)
+        self.slots: Dict[str, int] = {}
+        self.client_ids: List[Optional[str]] = [None] * capacity
+        self.free_slots: List[int] = []
+        self.size = 0
+
+        self.position_x = np.zeros(capacity, dtype=np.int32)
+        self.position_y = np.zeros(capacity, dtype=np.int32)
+        self.room = np.full(capacity, _NO_ROOM, dtype=np.int64)
+        self.cell_key = np.full(capacity, _NO_CELL, dtype=np.int64)
+
+        # 방 id <-> 정수 코드, 방별 슬롯 수
+        # 마지막 슬롯이 방을 떠나면 코드를 반납하고 새 방에 다시 발급하므로 코드는 동시에 쓰이는 방 수를 넘지 않음
+        self.room_codes: Dict[str, int] = {}
+        self.room_ids: Dict[int, str] = {}
+        self.room_slots: Dict[int, int] = {}
+        self.free_room_codes: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    # 방 id 를 정수 코드로 변환 (처음 보는 방이면 반납된 코드를 재사용하거나 새 코드 발급)
+    def get_room_code(self, room_id) -> int:
+        code = self.room_codes.get(room_id)
+        if code is None:
+            if self.free_room_codes:
+                code = self.free_room_codes.pop()
+            else:
+                code = len(self.room_codes)
+            self.room_codes[room_id] = code
+            self.room_ids[code] = room_id
+            self.room_slots[code] = 0
+        return code
+
+    # 슬롯의 방을 바꾸고, 이전 방에 남은 슬롯이 없으면 그 방의 코드를 반납
+    def _assign_room(self, slot: int, room_id):
+        code = self.get_room_code(room_id)
+        old_code = int(self.room[slot])
+        if old_code == code:
+            return
+        self.room[slot] = code
+        self.room_slots[code] += 1
+        self._release_room(old_code)
+
+    def _release_room(self, code: int):
+        if code == _NO_ROOM:
+            return
+        self.room_slots[code] -= 1
+        if self.room_slots[code] == 0:
+            del self.room_slots[code]
+            del self.room_codes[self.room_ids.pop(code)]
+            self.free_room_codes.append(code)
+
+    # 클라이언트의 슬롯 번호를 반환 (없으면 새 슬롯 할당)
+    def get_slot(self, client_id: str) -> int:
+        slot = self.slots.get(client_id)
+        if slot is not None:
+            return slot
+
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            if self.size == len(self.client_ids):
+                self._grow()
+            slot = self.size
+            self.size += 1
+        self.slots[client_id] = slot
+        self.client_ids[slot] = client_id
+        self.room[slot] = _NO_ROOM
+        self.cell_key[slot] = _NO_CELL
+        return slot
+
+    # 좌표를 저장할 수 있는지 확인 (범위를 벗어난 좌표는 set/set_many 에 넘기지 말 것)
+    def in_range(self, x: int, y: int) -> bool:
+        limit = self.max_coordinate
+        return -limit <= x <= limit and -limit <= y <= limit
+
+    # 클라이언트 한 명의 위치를 기록
+    def set(self, client_id: str, room_id, x: int, y: int) -> int:
+        slot = self.get_slot(client_id)
+        self.position_x[slot] = x
+        self.position_y[slot] = y
+        self._assign_room(slot, room_id)
+        return slot
+
+    # 여러 클라이언트의 위치를 한 번에 기록하고 슬롯 배열을 반환
+    def set_many(
+        self,
+        client_ids: Sequence[str],
+        room_ids: Sequence,
+        xs: Sequence[int],
+        ys: Sequence[int],
+    ) -> np.ndarray:
+        slots = np.fromiter(
+            (self.get_slot(client_id) for client_id in client_ids),
+            dtype=np.int64,
+            count=len(client_ids),
+        )
+        self.position_x[slots] = xs
+        self.position_y[slots] = ys
+        for slot, room_id in zip(slots.tolist(), room_ids):
+            self._assign_room(slot, room_id)
+        return slots
+
+    # 슬롯 반납
+    def remove(self, client_id: str):
+        slot = self.slots.pop(client_id, None)
+        if slot is None:
+            return
+        self.client_ids[slot] = None
+        self.cell_key[slot] = _NO_CELL
+        self._release_room(int(self.room[slot]))
+        self.room[slot] = _NO_ROOM
+        self.free_slots.append(slot)
+
+    # 주어진 슬롯들의 셀 키를 새로 계산해 저장하고, 방이나 셀이 바뀐 슬롯의 마스크를 반환
+    def update_cells(self, slots: np.ndarray) -> np.ndarray:
+        keys = self._encode(
+            self.room[slots],
+            self.position_x[slots] // self.cell_size,
+            self.position_y[slots] // self.cell_size,
+        )
+        crossed = keys != self.cell_key[slots]
+        self.cell_key[slots] = keys
+        return crossed
+
+    # 주어진 슬롯들의 인접 클라이언트(같은 방, 3x3 셀, 본인 제외)를 한 번에 계산
+    # (slots 내 인덱스, 인접 슬롯) 쌍 배열을 반환
+    def neighbour_pairs(self, slots: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        active = np.flatnonzero(self.cell_key[: self.size] != _NO_CELL)
+        if not len(active) or not len(slots):
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+
+        order = np.argsort(self.cell_key[active], kind="stable")
+        sorted_keys = self.cell_key[active][order]
+        sorted_slots = active[order]
+
+        room = self.room[slots]
+        cell_x = self.position_x[slots] // self.cell_size
+        cell_y = self.position_y[slots] // self.cell_size
+
+        # 행(cell_y - 1, cell_y, cell_y + 1)마다 가로 3칸을 하나의 연속 구간으로 찾음
+        starts = []
+        ends = []
+        for offset_y in (-1, 0, 1):
+            starts.append(
+                np.searchsorted(
+                    sorted_keys,
+                    self._encode(room, cell_x - 1, cell_y + offset_y),
+                    "left",
+                )
+            )
+            ends.append(
+                np.searchsorted(
+                    sorted_keys,
+                    self._encode(room, cell_x + 1, cell_y + offset_y),
+                    "right",
+                )
+            )
+        starts = np.stack(starts, axis=1).ravel()
+        counts = np.stack(ends, axis=1).ravel() - starts
+
+        total = int(counts.sum())
+        owners = np.repeat(np.arange(len(counts)) // 3, counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        neighbours = sorted_slots[np.repeat(starts, counts) + offsets]
+
+        not_self = neighbours != slots[owners]
+        return owners[not_self], neighbours[not_self]
+
+    @staticmethod
+    def _encode(room: np.ndarray, cell_x: np.ndarray, cell_y: np.ndarray) -> np.ndarray:
+        return (
+            (room.astype(np.int64) << (2 * _CELL_BITS))
+            | ((cell_y.astype(np.int64) + _CELL_BIAS) << _CELL_BITS)
+            | (cell_x.astype(np.int64) + _CELL_BIAS)
+        )
+
+    def _grow(self):
+        capacity = len(self.client_ids) * 2
+        self.client_ids.extend([None] * (capacity - len(self.client_ids)))
+        self.position_x = np.resize(self.position_x, capacity)
+        self.position_y = np.resize(self.position_y, capacity)
+        self.room = np.resize(self.room, capacity)
+        cell_key = np.full(capacity, _NO_CELL, dtype=np.int64)
+        cell_key[: len(self.cell_key)] = self.cell_key
+        self.cell_key = cell_key
@@ -0,0 +1,222 @@
+import struct
+import time
+from typing import Dict, Iterable, List, Set, Tuple
+
+from core.config import settings
+
+PROTOCOL_JSON = "json"
+PROTOCOL_BINARY = "binary"
+
+# 이동 프레임 형식 (little endian)
+# 헤더: 레코드 수(uint16)
+# 레코드: short id(uint32), position_x(int32), position_y(int32), direction(int8) = 13 bytes
+_FRAME_HEADER = struct.Struct("<H")
+_MOVEMENT_RECORD = struct.Struct("<Iiib")
+MAX_FRAME_RECORDS = 0xFFFF
+_INT32_MIN, _INT32_MAX = -(2**31), 2**31 - 1
+_INT8_MIN, _INT8_MAX = -128, 127
+
+
+# 이동 레코드 (short id, x, y, direction) 목록을 하나의 프레임으로 인코딩
+def encode_movements(records: List[Tuple[int, int, int, int]]) -> bytes:
+    frame = bytearray(_FRAME_HEADER.size + _MOVEMENT_RECORD.size * len(records))
+    _FRAME_HEADER.pack_into(frame, 0, len(records))
+    offset = _FRAME_HEADER.size
+    for record in records:
+        _MOVEMENT_RECORD.pack_into(frame, offset, *record)
+        offset += _MOVEMENT_RECORD.size
+    return bytes(frame)
+
+
+# 프레임을 이동 레코드 (short id, x, y, direction) 목록으로 디코딩
+# 헤더가 잘렸거나 길이가 레코드 수와 맞지 않으면 ValueError
+def decode_movements(frame: bytes) -> List[Tuple[int, int, int, int]]:
+    if len(frame) < _FRAME_HEADER.size:
+        raise ValueError("Truncated movement frame header")
+    (count,) = _FRAME_HEADER.unpack_from(frame, 0)
+    if len(frame) != _FRAME_HEADER.size + _MOVEMENT_RECORD.size * count:
+        raise ValueError("Invalid movement frame length")
+    return list(_MOVEMENT_RECORD.iter_unpack(memoryview(frame)[_FRAME_HEADER.size :]))
+
+
+# BinaryMovementProtocol 클래스: 바이너리 프로토콜 연결에 보낼 이동 프레임을 만드는 클래스
+# client_id 대신 숫자 short id 를 쓰고, 변하지 않는 정보(client_id, user_name)는
+# 수신자별로 처음 볼 때 한 번만 SC_PEER_INFO 로 보냅니다.
+# short id 는 재사용하지 않으므로 재접속한 클라이언트는 새 id 와 함께 다시 소개됩니다.
+class BinaryMovementProtocol:
+    def __init__(self):
+        self.short_ids: Dict[str, int] = {}
+        self.next_short_id = 1
+        # 수신자 client_id -> 이미 소개한 short id 집합
+        self.known_peers: Dict[str, Set[int]] = {}
+        # short id -> 소개받은 수신자 집합 (연결이 끊긴 클라이언트를 수신자 집합에서 지우는 데 사용)
+        self.introduced: Dict[int, Set[str]] = {}
+
+    def get_short_id(self, client_id: str) -> int:
+        short_id = self.short_ids.get(client_id)
+        if short_id is None:
+            short_id = self.short_ids[client_id] = self.next_short_id
+            self.next_short_id = (self.next_short_id + 1) & 0xFFFFFFFF or 1
+        return short_id
+
+    # 수신자에게 보낼 (처음 보는 클라이언트 소개 목록, 이동 프레임 목록)을 반환
+    def encode_for(
+        self, viewer: str, packets: Iterable[dict]
+    ) -> Tuple[List[dict], List[bytes]]:
+        known = self.known_peers.setdefault(viewer, set())
+        peers = []
+        records = []
+        for packet in packets:
+            position_x = packet["position_x"]
+            position_y = packet["position_y"]
+            direction = packet["direction"]
+            # 프레임 필드 범위를 벗어나는 값은 인코딩할 수 없으므로 건너뜀
+            if not (
+                _INT32_MIN <= position_x <= _INT32_MAX
+                and _INT32_MIN <= position_y <= _INT32_MAX
+                and _INT8_MIN <= direction <= _INT8_MAX
+            ):
+                continue
+
+            short_id = self.get_short_id(packet["client_id"])
+            if short_id not in known:
+                known.add(short_id)
+                self.introduced.setdefault(short_id, set()).add(viewer)
+                peers.append(
+                    {
+                        "id": short_id,
+                        "client_id": packet["client_id"],
+                        "user_name": packet["user_name"],
+                    }
+                )
+            records.append((short_id, position_x, position_y, direction))
+
+        frames = [
+            encode_movements(records[start : start + MAX_FRAME_RECORDS])
+            for start in range(0, len(records), MAX_FRAME_RECORDS)
+        ]
+        return peers, frames
+
+    # 연결이 끊긴 클라이언트의 short id 와 수신자 상태 제거
+    # 다른 수신자들의 소개 목록에서도 이 클라이언트의 short id 를 지움
+    def remove_client(self, client_id: str):
+        short_id = self.short_ids.pop(client_id, None)
+        if short_id is not None:
+            for viewer in self.introduced.pop(short_id, ()):
+                known = self.known_peers.get(viewer)
+                if known is not None:
+                    known.discard(short_id)
+        for known_id in self.known_peers.pop(client_id, ()):
+            viewers = self.introduced.get(known_id)
+            if viewers is not None:
+                viewers.discard(client_id)
+                if not viewers:
+                    del self.introduced[known_id]
+
+
+# BinaryMovementProtocol 인스턴스 생성
+binary_protocol = BinaryMovementProtocol()
+
+
+# DeltaMovementEncoder 클래스: 수신자별로 마지막으로 보낸 이동 상태를 기억해 변화량만 보내는 클래스
+# 좌표는 quantum 단위로 양자화해서 비교하므로 quantum 보다 작은 움직임과 변화 없는 상태는 보내지 않고,
+# 대상별로 마지막 keyframe 후 keyframe_interval 초가 지났으면 변화가 없어도 다음 전송은 전체 좌표(keyframe)로 보냅니다.
+class DeltaMovementEncoder:
+    def __init__(self, quantum: int, keyframe_interval: float):
+        self.quantum = max(quantum, 1)
+        self.keyframe_interval = keyframe_interval
+        # 수신자 -> 대상 -> [양자화 x, 양자화 y, direction, 마지막 keyframe 시각]
+        self.baselines: Dict[str, Dict[str, list]] = {}
+
+        # 통계
+        self.keyframes = 0
+        self.deltas = 0
+        self.suppressed = 0
+
+    def quantize(self, value: int) -> int:
+        return round(value / self.quantum)
+
+    # 수신자에게 보낼 (keyframe 패킷 목록, delta 목록)을 반환
+    # delta 는 [client_id, dx, dy, direction] 이며 dx, dy 는 quantum 배수의 좌표 변화량
+    def encode_for(
+        self, viewer: str, packets: Iterable[dict]
+    ) -> Tuple[List[dict], List[list]]:
+        now = time.monotonic()
+        baselines = self.baselines.setdefault(viewer, {})
+        keyframes = []
+        deltas = []
+        for packet in packets:
+            target = packet["client_id"]
+            quantized_x = self.quantize(packet["position_x"])
+            quantized_y = self.quantize(packet["position_y"])
+            direction = packet["direction"]
+
+            baseline = baselines.get(target)
+            # keyframe 주기가 된 대상은 변화가 없어도 전체 좌표를 보내 어긋난 상태를 바로잡음
+            if baseline is None or now - baseline[3] >= self.keyframe_interval:
+                baselines[target] = [quantized_x, quantized_y, direction, now]
+                keyframes.append(
+                    {
+                        **packet,
+                        "position_x": quantized_x * self.quantum,
+                        "position_y": quantized_y * self.quantum,
+                    }
+                )
+                self.keyframes += 1
+                continue
+
+            if (
+                baseline[0] == quantized_x
+                and baseline[1] == quantized_y
+                and baseline[2] == direction
+            ):
+                self.suppressed += 1
+                continue
+
+            deltas.append(
+                [
+                    target,
+                    (quantized_x - baseline[0]) * self.quantum,
+                    (quantized_y - baseline[1]) * self.quantum,
+                    direction,
+                ]
+            )
+            baseline[0] = quantized_x
+            baseline[1] = quantized_y
+            baseline[2] = direction
+            self.deltas += 1
+        return keyframes, deltas
+
+    # 수신자가 전체 상태를 받은 대상(SC_ENTER_VIEW 등)을 기준 상태로 기록
+    def observe(self, viewer: str, packet: dict):
+        self.baselines.setdefault(viewer, {})[packet["client_id"]] = [
+            self.quantize(packet["position_x"]),
+            self.quantize(packet["position_y"]),
+            packet["direction"],
+            time.monotonic(),
+        ]
+
+    # 수신자 시야에서 사라진 대상의 기준 상태 제거
+    def forget(self, viewer: str, target: str):
+        baselines = self.baselines.get(viewer)
+        if baselines is not None:
+            baselines.pop(target, None)
+
+    # 수신자의 기준 상태를 모두 제거 (다음 전송은 모두 keyframe)
+    def reset(self, viewer: str):
+        self.baselines.pop(viewer, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "viewers": len(self.baselines),
+            "keyframes": self.keyframes,
+            "deltas": self.deltas,
+            "suppressed": self.suppressed,
+        }
+
+
+# DeltaMovementEncoder 인스턴스 생성
+delta_encoder = DeltaMovementEncoder(
+    quantum=settings.movement_quantum,
+    keyframe_interval=settings.movement_keyframe_interval,
+)
@@ -1,8 +1,12 @@
 from redis.asyncio import Redis
-from redis.exceptions import RedisError, ConnectionError
+from redis.exceptions import RedisError, ConnectionError, TimeoutError
 from core.config import settings
+from core.resilience import CircuitBreaker, CircuitOpenError, backoff_delay
+from core.metrics import redis_failures, redis_latency, redis_retries
 import asyncio
+from contextlib import asynccontextmanager
 from functools import wraps
+from typing import List, Tuple
 
 ROOMS_KEY_TEMPLATE = settings.rooms_key_template
 CLIENT_KEY_TEMPLATE = settings.client_key_template
@@ -11,39 +15,211 @@ DISCONNECTED_CLIENT_KEY_TEMPLATE = settings.disconnected_client_key_template
 MEETING_ROOM_KEY_TEMPLATE = settings.meeting_room_key_template
 CLIENT_SID_KEY_TEMPLATE = settings.client_sid_key_template
 
-MAX_RETRIES = 3
-RETRY_DELAY = 1  # seconds
+CLIENT_OWNER_KEY_TEMPLATE = settings.client_owner_key_template
+ROOM_OWNER_KEY_TEMPLATE = settings.room_owner_key_template
+NODE_ADDRESS_KEY_TEMPLATE = settings.node_address_key_template
+MEETING_ROOM_REGISTRY_KEY = settings.meeting_room_registry_key
+SID_REGISTRY_KEY = settings.sid_registry_key
+WHITEBOARD_SNAPSHOT_KEY_TEMPLATE = settings.whiteboard_snapshot_key_template
+WHITEBOARD_STROKES_KEY_TEMPLATE = settings.whiteboard_strokes_key_template
 
+# Redis 회로 차단기 (프로세스 전체에서 공유)
+redis_breaker = CircuitBreaker(
+    failure_threshold=settings.redis_breaker_failure_threshold,
+    reset_timeout=settings.redis_breaker_reset_timeout,
+)
 
-def with_redis_retry(func):
+
+def with_redis_retry(func=None, *, retryable: bool = True):
     """
     Redis 작업 실행 시 연결 오류가 발생하면 재시도하는 데코레이터입니다.
-    최대 3번까지 재시도하며, 실패 시 1초 간격으로 대기합니다.
+    재시도 간격은 지수 백오프와 jitter 로 정하고, 모든 시도는 호출당 redis_call_deadline 안에서 끝납니다.
+    회로 차단기가 열려 있으면 Redis 를 호출하지 않고 CircuitOpenError 를 바로 발생시킵니다.
+    연결/시간 초과 오류만 재시도하며, 응답을 잃었을 때 다시 실행하면 안 되는 작업은
+    @with_redis_retry(retryable=False) 로 지정해 한 번만 시도합니다.
     """
+    if func is None:
+        return lambda f: with_redis_retry(f, retryable=retryable)
+
+    max_attempts = settings.redis_retry_attempts if retryable else 1
+    labels = (func.__name__,)
 
     @wraps(func)
     async def wrapper(*args, **kwargs):
-        retries = 0
-        last_error = None
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + settings.redis_call_deadline
+        attempt = 0
+
+        while True:
+            if not redis_breaker.allow():
+                raise CircuitOpenError(f"Redis circuit is open: {func.__name__}")
 
-        while retries < MAX_RETRIES:
+            attempt += 1
             try:
-                return await func(*args, **kwargs)
-            except (RedisError, ConnectionError) as e:
-                last_error = e
-                retries += 1
-                if retries < MAX_RETRIES:
-                    print(
-                        f"Redis operation failed: {e}. Retrying... (attempt {retries}/{MAX_RETRIES})"
+                try:
+                    result = await asyncio.wait_for(
+                        func(*args, **kwargs), timeout=max(deadline - loop.time(), 0)
                     )
-                    await asyncio.sleep(RETRY_DELAY)
-
-        print(f"Redis operation failed after {MAX_RETRIES} attempts: {last_error}")
-        raise last_error
+                except asyncio.TimeoutError as e:
+                    raise TimeoutError(f"{func.__name__} exceeded deadline") from e
+            except (ConnectionError, TimeoutError) as e:
+                redis_breaker.record_failure()
+                delay = backoff_delay(
+                    attempt,
+                    settings.redis_retry_base_delay,
+                    settings.redis_retry_max_delay,
+                )
+                if attempt >= max_attempts or loop.time() + delay >= deadline:
+                    print(f"Redis operation failed after {attempt} attempts: {e}")
+                    redis_failures.inc(labels)
+                    redis_latency.observe(loop.time() - started, labels)
+                    raise
+                print(
+                    f"Redis operation failed: {e}. Retrying... (attempt {attempt}/{max_attempts})"
+                )
+                redis_retries.inc(labels)
+                await asyncio.sleep(delay)
+            except RedisError:
+                # 명령 자체의 오류 (Redis 는 응답했으므로 재시도하지 않음)
+                redis_breaker.record_success()
+                redis_latency.observe(loop.time() - started, labels)
+                raise
+            else:
+                redis_breaker.record_success()
+                redis_latency.observe(loop.time() - started, labels)
+                return result
 
     return wrapper
 
 
+# RedisBatch 클래스: 하나의 논리 작업에 필요한 Redis 명령을 모아 두었다가 한 번의 왕복으로 실행하는 클래스
+# 명령을 기록해 두고 실행할 때마다 파이프라인을 새로 만들기 때문에, 실패하면 같은 묶음을 그대로 재시도할 수 있습니다.
+# transaction=True 이면 MULTI/EXEC 로 감싸 원자적으로 실행합니다.
+class RedisBatch:
+    def __init__(self, redis_client: Redis, transaction: bool = True):
+        self.redis_client = redis_client
+        self.transaction = transaction
+        self.commands: List[Tuple[str, tuple, dict]] = []
+        self.results: list = []
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    # 명령을 기록하고, 실행 후 결과가 들어갈 results 인덱스를 반환
+    def queue(self, command: str, *args, **kwargs) -> int:
+        self.commands.append((command, args, kwargs))
+        return len(self.commands) - 1
+
+    async def execute(self) -> list:
+        if not self.commands:
+            self.results = []
+            return self.results
+
+        async with self.redis_client.pipeline(transaction=self.transaction) as pipe:
+            for command, args, kwargs in self.commands:
+                getattr(pipe, command)(*args, **kwargs)
+            self.results = await pipe.execute()
+        return self.results
+
+    def add_to_room(self, room_id: str, client_id: str) -> int:
+        return self.queue("sadd", ROOMS_KEY_TEMPLATE.format(room_id=room_id), client_id)
+
+    def remove_from_room(self, room_id: str, client_id: str) -> int:
+        return self.queue("srem", ROOMS_KEY_TEMPLATE.format(room_id=room_id), client_id)
+
+    def add_to_meeting_room(self, room_id: str, title: str, client_id: str) -> int:
+        mapping = {client_id: ""}
+        if title:
+            mapping["title"] = title
+        index = self.queue(
+            "hset", MEETING_ROOM_KEY_TEMPLATE.format(room_id=room_id), mapping=mapping
+        )
+        # 활성 미팅룸 목록에 등록
+        self.queue("sadd", MEETING_ROOM_REGISTRY_KEY, room_id)
+        return index
+
+    def set_sid_mapping(self, client_id: str, sid: str) -> int:
+        index = self.queue("set", SID_KEY_TEMPLATE.format(sid=sid), client_id)
+        self.queue("set", CLIENT_SID_KEY_TEMPLATE.format(client_id=client_id), sid)
+        self.queue("sadd", SID_REGISTRY_KEY, sid)
+        return index
+
+    # 결과는 삭제된 sid 에 매핑되어 있던 client_id (없으면 None)
+    def delete_sid_mapping(self, sid: str) -> int:
+        prefix, _, suffix = CLIENT_SID_KEY_TEMPLATE.partition("{client_id}")
+        return self.queue(
+            "eval",
+            DELETE_SID_MAPPING_SCRIPT,
+            2,
+            SID_KEY_TEMPLATE.format(sid=sid),
+            SID_REGISTRY_KEY,
+            sid,
+            prefix,
+            suffix,
+        )
+
+    # 값이 없는 항목(None)은 Redis 에 저장할 수 없으므로 제외
+    def set_disconnected_client(self, client_id: str, info: dict) -> int:
+        info = {key: value for key, value in info.items() if value is not None}
+        return self.queue(
+            "hset",
+            DISCONNECTED_CLIENT_KEY_TEMPLATE.format(client_id=client_id),
+            mapping=info,
+        )
+
+    def delete_disconnected_client(self, client_id: str) -> int:
+        return self.queue(
+            "delete", DISCONNECTED_CLIENT_KEY_TEMPLATE.format(client_id=client_id)
+        )
+
+    # 결과는 이전 소유 정보 (hgetall 결과, 없으면 빈 dict)
+    def claim_client(self, client_id: str, sid: str, node_id: str) -> int:
+        key = CLIENT_OWNER_KEY_TEMPLATE.format(client_id=client_id)
+        index = self.queue("hgetall", key)
+        self.queue("hset", key, mapping={"node_id": node_id, "sid": sid})
+        return index
+
+    def release_client(self, client_id: str, sid: str) -> int:
+        return self.queue(
+            "eval",
+            RELEASE_CLIENT_SCRIPT,
+            1,
+            CLIENT_OWNER_KEY_TEMPLATE.format(client_id=client_id),
+            sid,
+        )
+
+    # 결과는 방을 맡은 노드 (비어 있었거나 이미 node_id 였으면 node_id, 보관 시간 연장)
+    def claim_room(self, room_id: str, node_id: str, ttl: int) -> int:
+        return self.queue(
+            "eval",
+            CLAIM_ROOM_SCRIPT,
+            1,
+            ROOM_OWNER_KEY_TEMPLATE.format(room_id=room_id),
+            node_id,
+            ttl,
+        )
+
+    def publish(self, channel: str, message: str) -> int:
+        return self.queue("publish", channel, message)
+
+
+@with_redis_retry
+async def execute_batch(batch: RedisBatch) -> list:
+    return await batch.execute()
+
+
+# 블록 안에서 기록한 명령을 블록이 끝날 때 한 번의 왕복으로 실행 (예외가 나면 실행하지 않음)
+# async with redis_batch(redis_client) as batch:
+#     batch.remove_from_room(room_id, client_id)
+#     batch.set_disconnected_client(client_id, info)
+@asynccontextmanager
+async def redis_batch(redis_client: Redis, transaction: bool = True):
+    batch = RedisBatch(redis_client, transaction=transaction)
+    yield batch
+    await execute_batch(batch)
+
+
 @with_redis_retry
 async def add_to_room(room_id: str, client_id: str, redis_client: Redis):
     await redis_client.sadd(ROOMS_KEY_TEMPLATE.format(room_id=room_id), client_id)
@@ -63,13 +239,9 @@ async def get_room_clients(room_id: str, redis_client: Redis):
 async def add_to_meeting_room(
     room_id: str, title: str, client_id: str, redis_client: Redis
 ):
-    if title:
-        await redis_client.hset(
-            MEETING_ROOM_KEY_TEMPLATE.format(room_id=room_id), "title", title
-        )
-    await redis_client.hset(
-        MEETING_ROOM_KEY_TEMPLATE.format(room_id=room_id), client_id, ""
-    )
+    batch = RedisBatch(redis_client, transaction=False)
+    batch.add_to_meeting_room(room_id, title, client_id)
+    await batch.execute()
 
 
 @with_redis_retry
@@ -94,27 +266,73 @@ async def get_meeting_room_title(room_id: str, redis_client: Redis):
 
 @with_redis_retry
 async def delete_meeting_room(room_id: str, redis_client: Redis):
-    await redis_client.delete(MEETING_ROOM_KEY_TEMPLATE.format(room_id=room_id))
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.delete(
+            MEETING_ROOM_KEY_TEMPLATE.format(room_id=room_id),
+            WHITEBOARD_SNAPSHOT_KEY_TEMPLATE.format(room_id=room_id),
+            WHITEBOARD_STROKES_KEY_TEMPLATE.format(room_id=room_id),
+        )
+        pipe.srem(MEETING_ROOM_REGISTRY_KEY, room_id)
+        await pipe.execute()
 
 
-@with_redis_retry
-async def get_all_meeting_rooms(redis_client: Redis):
-    room_keys = await redis_client.keys("meeting_room:*")
+# 미팅룸 id 목록의 정보를 한 번의 왕복으로 조회
+# 해시가 사라진 미팅룸은 결과에서 빼고 목록에서도 정리
+async def _fetch_meeting_rooms(room_ids, redis_client: Redis):
+    if not room_ids:
+        return []
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for room_id in room_ids:
+            pipe.hgetall(MEETING_ROOM_KEY_TEMPLATE.format(room_id=room_id))
+        results = await pipe.execute()
+
     rooms = []
-    for rk in room_keys:
-        room_id = rk.split(":")[-1]
-        title = await get_meeting_room_title(room_id, redis_client)
-        clients = await get_meeting_room_clients(room_id, redis_client)
-        rooms.append({"room_id": room_id, "title": title, "clients": clients})
+    stale_room_ids = []
+    for room_id, data in zip(room_ids, results):
+        if not data:
+            stale_room_ids.append(room_id)
+            continue
+        rooms.append(
+            {
+                "room_id": room_id,
+                "title": data.get("title"),
+                "clients": [k for k in data.keys() if k != "title"],
+            }
+        )
+
+    if stale_room_ids:
+        await redis_client.srem(MEETING_ROOM_REGISTRY_KEY, *stale_room_ids)
     return rooms
 
 
+# 활성 미팅룸 목록(set)을 기준으로 모든 미팅룸 조회 (KEYS 스캔 없음)
+@with_redis_retry
+async def get_all_meeting_rooms(redis_client: Redis):
+    room_ids = list(await redis_client.smembers(MEETING_ROOM_REGISTRY_KEY))
+    return await _fetch_meeting_rooms(room_ids, redis_client)
+
+
+# 미팅룸이 매우 많을 때 커서 기반으로 나누어 조회
+# (다음 커서, 미팅룸 목록)을 반환하며 다음 커서가 0 이면 마지막 페이지
+@with_redis_retry
+async def scan_meeting_rooms(redis_client: Redis, cursor: int = 0, count: int = 100):
+    cursor, room_ids = await redis_client.sscan(
+        MEETING_ROOM_REGISTRY_KEY, cursor=cursor, count=count
+    )
+    return cursor, await _fetch_meeting_rooms(list(room_ids), redis_client)
+
+
 @with_redis_retry
 async def set_client_info(client_id: str, info: dict, redis_client):
     # 모든 값을 문자열로 변환
-    info = {key: str(value) if not isinstance(value, (bytes, str, int, float)) else value for key, value in info.items()}
-    await redis_client.hset(CLIENT_KEY_TEMPLATE.format(client_id=client_id), mapping=info)
-
+    info = {
+        key: str(value) if not isinstance(value, (bytes, str, int, float)) else value
+        for key, value in info.items()
+    }
+    await redis_client.hset(
+        CLIENT_KEY_TEMPLATE.format(client_id=client_id), mapping=info
+    )
 
 
 @with_redis_retry
@@ -129,8 +347,9 @@ async def delete_client_info(client_id: str, redis_client: Redis):
 
 @with_redis_retry
 async def set_sid_mapping(client_id: str, sid: str, redis_client: Redis):
-    await redis_client.set(SID_KEY_TEMPLATE.format(sid=sid), client_id)
-    await redis_client.set(CLIENT_SID_KEY_TEMPLATE.format(client_id=client_id), sid)
+    batch = RedisBatch(redis_client)
+    batch.set_sid_mapping(client_id, sid)
+    await batch.execute()
 
 
 @with_redis_retry
@@ -143,19 +362,94 @@ async def get_sid_by_client_id(client_id: str, redis_client: Redis):
     return await redis_client.get(CLIENT_SID_KEY_TEMPLATE.format(client_id=client_id))
 
 
-# 저장된 sid들을 반환하는 함수
+# 저장된 sid들을 반환하는 함수 (KEYS 스캔 대신 sid 목록 set 사용)
 @with_redis_retry
 async def get_all_sids(redis_client: Redis):
-    sids = await redis_client.keys("sid:*")
-    return [sid.split(":")[-1] for sid in sids]
+    return list(await redis_client.smembers(SID_REGISTRY_KEY))
+
+
+# sid 매핑과 역방향(client_id -> sid) 매핑을 서버 안에서 한 번에 삭제
+# KEYS: sid 키, sid 목록 / ARGV: sid, client_sid 키 접두사, 접미사
+DELETE_SID_MAPPING_SCRIPT = """
+local client_id = redis.call('GET', KEYS[1])
+redis.call('DEL', KEYS[1])
+redis.call('SREM', KEYS[2], ARGV[1])
+if client_id then
+    redis.call('DEL', ARGV[2] .. client_id .. ARGV[3])
+end
+return client_id
+"""
 
 
 @with_redis_retry
 async def delete_sid_mapping(sid: str, redis_client: Redis):
-    client_id = await redis_client.get(SID_KEY_TEMPLATE.format(sid=sid))
-    await redis_client.delete(SID_KEY_TEMPLATE.format(sid=sid))
-    if client_id:
-        await redis_client.delete(CLIENT_SID_KEY_TEMPLATE.format(client_id=client_id))
+    batch = RedisBatch(redis_client, transaction=False)
+    batch.delete_sid_mapping(sid)
+    (client_id,) = await batch.execute()
+    return client_id
+
+
+# 클라이언트 소유 노드를 기록하고, 이전 소유 정보({"node_id", "sid"})를 반환 (없으면 None)
+@with_redis_retry
+async def claim_client(client_id: str, sid: str, node_id: str, redis_client: Redis):
+    batch = RedisBatch(redis_client)
+    index = batch.claim_client(client_id, sid, node_id)
+    results = await batch.execute()
+    return results[index] or None
+
+
+# 클라이언트 소유 정보가 아직 해당 sid 를 가리킬 때만 삭제 (다른 노드로 재접속한 경우 유지)
+RELEASE_CLIENT_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'sid') == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@with_redis_retry
+async def release_client(client_id: str, sid: str, redis_client: Redis):
+    batch = RedisBatch(redis_client, transaction=False)
+    batch.release_client(client_id, sid)
+    await batch.execute()
+
+
+# 방을 맡은 노드가 없거나 node_id 이면 node_id 로 기록(보관 시간 연장)하고, 방을 맡은 노드를 반환
+CLAIM_ROOM_SCRIPT = """
+local owner = redis.call('GET', KEYS[1])
+if not owner or owner == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    return ARGV[1]
+end
+return owner
+"""
+
+
+# 방 여러 개를 한 번의 왕복으로 맡고 {room_id: 방을 맡은 노드} 를 반환
+@with_redis_retry
+async def claim_rooms(room_ids: List[str], node_id: str, ttl: int, redis_client: Redis):
+    batch = RedisBatch(redis_client, transaction=False)
+    for room_id in room_ids:
+        batch.claim_room(room_id, node_id, ttl)
+    return dict(zip(room_ids, await batch.execute()))
+
+
+async def claim_room(room_id: str, node_id: str, ttl: int, redis_client: Redis) -> str:
+    owners = await claim_rooms([room_id], node_id, ttl, redis_client)
+    return owners[room_id]
+
+
+# 노드 주소 기록 (ttl 초 동안 다시 기록하지 않으면 사라짐)
+@with_redis_retry
+async def set_node_address(node_id: str, address: str, ttl: int, redis_client: Redis):
+    await redis_client.set(
+        NODE_ADDRESS_KEY_TEMPLATE.format(node_id=node_id), address, ex=ttl
+    )
+
+
+@with_redis_retry
+async def get_node_address(node_id: str, redis_client: Redis):
+    return await redis_client.get(NODE_ADDRESS_KEY_TEMPLATE.format(node_id=node_id))
 
 
 @with_redis_retry
@@ -178,6 +472,29 @@ async def get_disconnected_client(client_id: str, redis_client: Redis):
     )
 
 
+# 여러 클라이언트의 재접속 정보를 한 번의 왕복으로 조회하고 삭제
+# 재접속 정보가 있는 클라이언트만 {client_id: info} 형태로 반환
+@with_redis_retry(retryable=False)
+async def pop_disconnected_clients(client_ids: list, redis_client: Redis):
+    if not client_ids:
+        return {}
+
+    async with redis_client.pipeline(transaction=True) as pipe:
+        for client_id in client_ids:
+            pipe.hgetall(DISCONNECTED_CLIENT_KEY_TEMPLATE.format(client_id=client_id))
+        pipe.delete(
+            *[
+                DISCONNECTED_CLIENT_KEY_TEMPLATE.format(client_id=client_id)
+                for client_id in client_ids
+            ]
+        )
+        results = await pipe.execute()
+
+    return {
+        client_id: info for client_id, info in zip(client_ids, results[:-1]) if info
+    }
+
+
 @with_redis_retry
 async def delete_disconnected_client(client_id: str, redis_client: Redis):
     await redis_client.delete(
@@ -186,19 +503,17 @@ async def delete_disconnected_client(client_id: str, redis_client: Redis):
 
 
 # redis 큐 관련 함수
-@with_redis_retry
+@with_redis_retry(retryable=False)
 async def enqueue_connection_request(
     redis_client: Redis,
     sid: str,
     client_id: str,
     user_name: str,
 ):
-    await redis_client.rpush(
-        "connection_requests", f"{sid}|{client_id}|{user_name}"
-    )
+    await redis_client.rpush("connection_requests", f"{sid}|{client_id}|{user_name}")
 
 
-@with_redis_retry
+@with_redis_retry(retryable=False)
 async def dequeue_connection_request(redis_client: Redis):
     request = await redis_client.lpop("connection_requests")
     if request:
@@ -216,12 +531,31 @@ async def dequeue_connection_request(redis_client: Redis):
 async def add_duplicate_connection(sid: str, redis_client: Redis):
     await redis_client.sadd("duplicate_connections", sid)
 
+
 # 중복 연결 아이디 삭제 함수
 @with_redis_retry
 async def remove_duplicate_connection(sid: str, redis_client: Redis):
     await redis_client.srem("duplicate_connections", sid)
 
+
 # 중복 연결 아이디 조회 함수
 @with_redis_retry
 async def get_duplicate_connections(sid: str, redis_client: Redis):
-    return await redis_client.sismember("duplicate_connections", sid)
\ No newline at end of file
+    return await redis_client.sismember("duplicate_connections", sid)
+
+
+# 목록(set) 도입 이전에 만들어진 미팅룸/sid 키를 목록에 등록
+# KEYS 대신 SCAN 으로 나누어 순회하므로 Redis 를 오래 막지 않음
+# 키 수에 비례해 오래 걸리므로 호출당 제한 시간이 있는 with_redis_retry 는 적용하지 않음
+async def rebuild_registries(redis_client: Redis):
+    meeting_room_pattern = MEETING_ROOM_KEY_TEMPLATE.format(room_id="*")
+    sid_pattern = SID_KEY_TEMPLATE.format(sid="*")
+    meeting_room_prefix = meeting_room_pattern[:-1]
+    sid_prefix = sid_pattern[:-1]
+
+    async for key in redis_client.scan_iter(match=meeting_room_pattern, count=500):
+        await redis_client.sadd(
+            MEETING_ROOM_REGISTRY_KEY, key[len(meeting_room_prefix) :]
+        )
+    async for key in redis_client.scan_iter(match=sid_pattern, count=500):
+        await redis_client.sadd(SID_REGISTRY_KEY, key[len(sid_prefix) :])
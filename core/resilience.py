@@ -0,0 +1,82 @@
+import random
+import time
+
+from redis.exceptions import ConnectionError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+# 회로가 열려 있어 Redis 호출을 시도하지 않았을 때 발생하는 예외
+# 연결 오류로 취급되도록 redis ConnectionError 를 상속
+class CircuitOpenError(ConnectionError):
+    pass
+
+
+# CircuitBreaker 클래스: 연속 실패가 failure_threshold 에 도달하면 회로를 열어 호출을 즉시 실패시키는 클래스
+# reset_timeout 이 지나면 한 번의 시험 호출(half_open)을 허용하고, 성공하면 다시 닫습니다.
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.probe_started = 0.0
+
+        # 통계
+        self.opened = 0
+        self.rejected = 0
+
+    # 호출 허용 여부 (열린 상태에서 reset_timeout 이 지났으면 시험 호출 하나만 허용)
+    # 시험 호출이 결과 없이 취소된 경우를 대비해 reset_timeout 이 지나면 다음 시험 호출을 허용
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self.probing = False
+        if self.probing and now - self.probe_started < self.reset_timeout:
+            self.rejected += 1
+            return False
+        self.probing = True
+        self.probe_started = now
+        return True
+
+    def record_success(self):
+        if self.state != CLOSED:
+            print("Redis circuit closed")
+        self.state = CLOSED
+        self.failures = 0
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                print(f"Redis circuit opened after {self.failures} failures")
+                self.opened += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+# 재시도 대기 시간 (지수 백오프 + full jitter)
+# attempt 는 1부터 시작하며, [0, min(max_delay, base_delay * 2^(attempt-1))] 구간에서 무작위로 선택
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    return random.uniform(0, min(max_delay, base_delay * (2 ** (attempt - 1))))
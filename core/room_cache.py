@@ -0,0 +1,216 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError, TimeoutError
+
+from core import redis as redis_store
+from core.redis import RedisBatch, redis_batch
+from core.config import settings
+from core.databases import get_redis
+
+ROOM_INVALIDATION_CHANNEL = "room_membership_invalidation"
+
+
+# RoomMembershipCache 클래스: 방 구성원 목록을 프로세스 메모리에 캐시하는 LRU 캐시
+# 구성원 목록은 불변 frozenset 으로 보관하므로 읽는 쪽은 복사 없이 await 를 사이에 두고 순회할 수 있고,
+# 쓰기는 새 frozenset 으로 교체합니다(copy-on-write).
+# 무효화된 목록은 stale 에 남겨 두었다가 Redis 장애 시 대체 값으로 사용합니다.
+class RoomMembershipCache:
+    def __init__(self, max_rooms: int):
+        self.max_rooms = max_rooms
+        self.node_id = uuid.uuid4().hex
+        self.rooms: "OrderedDict[str, FrozenSet[str]]" = OrderedDict()
+        self.stale: "OrderedDict[str, FrozenSet[str]]" = OrderedDict()
+        # 방별 쓰기 세대: Redis 조회 도중 쓰기가 있었으면 조회 결과를 캐시하지 않음
+        # 캐시에 있거나 조회 중인 방만 기록하므로 캐시 크기를 넘어 늘어나지 않음
+        self.generations: Dict[str, int] = {}
+        # 방별 진행 중인 Redis 조회 수
+        self.loading: Dict[str, int] = {}
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_hits = 0
+
+    def get(self, room_id: str) -> Optional[FrozenSet[str]]:
+        members = self.rooms.get(room_id)
+        if members is None:
+            self.misses += 1
+            return None
+        self.rooms.move_to_end(room_id)
+        self.hits += 1
+        return members
+
+    def generation(self, room_id: str) -> int:
+        return self.generations.get(room_id, 0)
+
+    # Redis 조회 시작 (조회가 끝나면 put 후 end_load 호출), 현재 세대를 반환
+    def begin_load(self, room_id: str) -> int:
+        self.loading[room_id] = self.loading.get(room_id, 0) + 1
+        return self.generation(room_id)
+
+    def end_load(self, room_id: str):
+        remaining = self.loading.pop(room_id, 1) - 1
+        if remaining > 0:
+            self.loading[room_id] = remaining
+        else:
+            self._forget(room_id)
+
+    # Redis 에서 읽어 온 구성원 목록 저장 (조회 시작 이후 쓰기가 있었으면 무시)
+    def put(self, room_id: str, members, generation: int):
+        if self.generation(room_id) != generation:
+            return
+        self.rooms[room_id] = frozenset(members)
+        self.rooms.move_to_end(room_id)
+        self.stale.pop(room_id, None)
+        while len(self.rooms) > self.max_rooms:
+            evicted, _ = self.rooms.popitem(last=False)
+            self._forget(evicted)
+            self.evictions += 1
+
+    def add(self, room_id: str, client_id: str):
+        self._bump(room_id)
+        members = self.rooms.get(room_id)
+        if members is not None and client_id not in members:
+            self.rooms[room_id] = members | {client_id}
+        members = self.stale.get(room_id)
+        if members is not None and client_id not in members:
+            self.stale[room_id] = members | {client_id}
+
+    def discard(self, room_id: str, client_id: str):
+        self._bump(room_id)
+        members = self.rooms.get(room_id)
+        if members is not None and client_id in members:
+            self.rooms[room_id] = members - {client_id}
+        members = self.stale.get(room_id)
+        if members is not None and client_id in members:
+            self.stale[room_id] = members - {client_id}
+
+    def invalidate(self, room_id: str):
+        self._bump(room_id)
+        members = self.rooms.pop(room_id, None)
+        self._forget(room_id)
+        if members is not None:
+            self.invalidations += 1
+            self.stale[room_id] = members
+            self.stale.move_to_end(room_id)
+            while len(self.stale) > self.max_rooms:
+                self.stale.popitem(last=False)
+
+    # Redis 를 조회할 수 없을 때 사용할 마지막으로 알려진 구성원 목록 (없으면 None)
+    def get_stale(self, room_id: str) -> Optional[FrozenSet[str]]:
+        members = self.rooms.get(room_id)
+        if members is None:
+            members = self.stale.get(room_id)
+        if members is not None:
+            self.stale_hits += 1
+        return members
+
+    def clear(self):
+        for room_id in list(self.rooms):
+            self.invalidate(room_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self.rooms),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "stale": len(self.stale),
+            "stale_hits": self.stale_hits,
+            "generations": len(self.generations),
+        }
+
+    # 캐시에도 없고 조회 중도 아닌 방은 세대를 기록할 필요가 없음
+    def _bump(self, room_id: str):
+        if room_id in self.rooms or room_id in self.loading:
+            self.generations[room_id] = self.generations.get(room_id, 0) + 1
+
+    def _forget(self, room_id: str):
+        if room_id not in self.rooms and room_id not in self.loading:
+            self.generations.pop(room_id, None)
+
+
+# RoomMembershipCache 인스턴스 생성
+room_cache = RoomMembershipCache(max_rooms=settings.room_cache_max_rooms)
+
+
+# 다른 노드에 방 구성원 변경을 알리는 명령을 batch 에 추가
+def queue_room_invalidation(batch: RedisBatch, room_id: str):
+    if settings.room_cache_pubsub_enabled:
+        batch.publish(ROOM_INVALIDATION_CHANNEL, f"{room_cache.node_id}|{room_id}")
+
+
+# 방 구성원 추가 명령을 batch 에 추가 (batch 실행 후 room_cache.add 로 캐시 반영)
+def queue_add_to_room(batch: RedisBatch, room_id: str, client_id: str):
+    batch.add_to_room(room_id, client_id)
+    queue_room_invalidation(batch, room_id)
+
+
+# 방 구성원 제거 명령을 batch 에 추가 (batch 실행 후 room_cache.discard 로 캐시 반영)
+def queue_remove_from_room(batch: RedisBatch, room_id: str, client_id: str):
+    batch.remove_from_room(room_id, client_id)
+    queue_room_invalidation(batch, room_id)
+
+
+# 방에 클라이언트 추가 (Redis 에 먼저 쓰고 캐시에 반영)
+async def add_to_room(room_id: str, client_id: str, redis_client: Redis):
+    async with redis_batch(redis_client, transaction=False) as batch:
+        queue_add_to_room(batch, room_id, client_id)
+    room_cache.add(room_id, client_id)
+
+
+# 방에서 클라이언트 제거 (Redis 에 먼저 쓰고 캐시에 반영)
+async def remove_from_room(room_id: str, client_id: str, redis_client: Redis):
+    async with redis_batch(redis_client, transaction=False) as batch:
+        queue_remove_from_room(batch, room_id, client_id)
+    room_cache.discard(room_id, client_id)
+
+
+# 방 구성원 목록 조회 (캐시에 없을 때만 Redis 조회)
+# Redis 장애 시 무효화 전에 알고 있던 목록이 있으면 그 목록을 반환
+async def get_room_clients(room_id: str, redis_client: Redis) -> FrozenSet[str]:
+    members = room_cache.get(room_id)
+    if members is not None:
+        return members
+
+    generation = room_cache.begin_load(room_id)
+    try:
+        members = frozenset(await redis_store.get_room_clients(room_id, redis_client))
+        room_cache.put(room_id, members, generation)
+    except (ConnectionError, TimeoutError) as e:
+        members = room_cache.get_stale(room_id)
+        if members is None:
+            raise
+        print(f"Using stale membership for room {room_id}: {e}")
+    finally:
+        room_cache.end_load(room_id)
+    return members
+
+
+# 다른 노드의 방 구성원 변경 알림을 받아 캐시 무효화
+# 구독이 끊긴 동안 놓친 알림이 있을 수 있으므로 (재)구독할 때마다 캐시를 비움
+async def listen_room_invalidations():
+    while True:
+        try:
+            async for redis_client in get_redis():
+                pubsub = redis_client.pubsub()
+                await pubsub.subscribe(ROOM_INVALIDATION_CHANNEL)
+                room_cache.clear()
+
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    node_id, _, room_id = message["data"].partition("|")
+                    if node_id != room_cache.node_id:
+                        room_cache.invalidate(room_id)
+        except Exception as e:
+            print(f"Room invalidation listener error: {e}")
+            room_cache.clear()
+            await asyncio.sleep(1)
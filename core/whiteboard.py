@@ -0,0 +1,149 @@
+import json
+from typing import Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.config import settings
+from core.redis import (
+    WHITEBOARD_SNAPSHOT_KEY_TEMPLATE,
+    WHITEBOARD_STROKES_KEY_TEMPLATE,
+    with_redis_retry,
+)
+
+# 미팅룸 그림판은 Redis 에 두 개의 키로 저장합니다.
+# - 스냅샷(hash): picture(마지막 전체 그림, JSON), strokes(압축된 획 목록, JSON 배열), seq(마지막 획 번호),
+#   size(전체 그림 이후 기록된 획 JSON 크기 합계)
+# - 획 로그(list): 마지막 압축 이후 추가된 획(JSON)
+# 로그의 i 번째(0부터) 획 번호는 seq - LLEN + i + 1 입니다.
+# 획은 클라이언트가 그리는 형식 그대로라 서버에서 그림으로 합칠 수 없으므로,
+# 획 크기 합계가 whiteboard_max_stroke_bytes 를 넘으면 새 획을 거절하고 클라이언트에게 전체 그림을 받아 교체합니다.
+# 따라서 압축(문자열 연결)과 입장 시 스냅샷 전송 비용도 이 크기를 넘지 않습니다.
+
+# 획 추가: 획 번호를 발급하고 로그 끝에 추가, {획 번호, 로그 길이} 반환
+# 획 크기 합계가 상한을 넘으면 기록하지 않고 {-1, 현재 크기 합계} 반환
+# KEYS: 스냅샷, 획 로그 / ARGV: 획 JSON, TTL(초), 획 크기 상한(bytes)
+APPEND_STROKE_SCRIPT = """
+local size = tonumber(redis.call('HGET', KEYS[1], 'size') or '0')
+if size + #ARGV[1] > tonumber(ARGV[3]) then
+    return {-1, size}
+end
+local seq = redis.call('HINCRBY', KEYS[1], 'seq', 1)
+redis.call('HINCRBY', KEYS[1], 'size', #ARGV[1])
+local length = redis.call('RPUSH', KEYS[2], ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return {seq, length}
+"""
+
+# 압축: 로그의 획을 스냅샷의 strokes 배열 뒤에 붙이고 로그에서 제거, 옮긴 획 수 반환
+# 획은 이미 JSON 문자열이므로 문자열 연결만으로 배열을 만듦
+# KEYS: 스냅샷, 획 로그
+COMPACT_STROKES_SCRIPT = """
+local entries = redis.call('LRANGE', KEYS[2], 0, -1)
+if #entries == 0 then
+    return 0
+end
+local joined = table.concat(entries, ',')
+local strokes = redis.call('HGET', KEYS[1], 'strokes')
+if not strokes or strokes == '[]' then
+    strokes = '[' .. joined .. ']'
+else
+    strokes = string.sub(strokes, 1, -2) .. ',' .. joined .. ']'
+end
+redis.call('HSET', KEYS[1], 'strokes', strokes)
+redis.call('LTRIM', KEYS[2], #entries, -1)
+return #entries
+"""
+
+# 초기화: 전체 그림으로 스냅샷을 교체하고 로그를 비움, 새 획 번호 반환
+# KEYS: 스냅샷, 획 로그 / ARGV: 그림 JSON, TTL(초)
+RESET_WHITEBOARD_SCRIPT = """
+local seq = redis.call('HINCRBY', KEYS[1], 'seq', 1)
+redis.call('HSET', KEYS[1], 'picture', ARGV[1], 'strokes', '[]', 'size', 0)
+redis.call('DEL', KEYS[2])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return seq
+"""
+
+
+def _whiteboard_keys(room_id: str):
+    return (
+        WHITEBOARD_SNAPSHOT_KEY_TEMPLATE.format(room_id=room_id),
+        WHITEBOARD_STROKES_KEY_TEMPLATE.format(room_id=room_id),
+    )
+
+
+# 획이 그림 전체를 지우는 획인지 확인
+def is_clear_stroke(stroke) -> bool:
+    return isinstance(stroke, dict) and stroke.get("type") == "clear"
+
+
+# 획을 로그에 추가하고 획 번호를 반환 (그림판이 가득 차 거절되면 None)
+# 로그가 whiteboard_compact_threshold 이상 쌓이면 스냅샷으로 압축
+# 중복 실행되면 같은 획이 두 번 기록되므로 재시도하지 않음
+@with_redis_retry(retryable=False)
+async def append_stroke(
+    room_id: str, client_id: str, stroke, redis_client: Redis
+) -> Optional[int]:
+    snapshot_key, strokes_key = _whiteboard_keys(room_id)
+    seq, length = await redis_client.eval(
+        APPEND_STROKE_SCRIPT,
+        2,
+        snapshot_key,
+        strokes_key,
+        json.dumps({"client_id": client_id, "stroke": stroke}, separators=(",", ":")),
+        settings.whiteboard_ttl,
+        settings.whiteboard_max_stroke_bytes,
+    )
+    if seq < 0:
+        print(f"Whiteboard for room {room_id} is full ({length} bytes of strokes)")
+        return None
+    if length >= settings.whiteboard_compact_threshold:
+        # 압축에 실패해도 획은 이미 기록되었으므로 다음 획에서 다시 시도
+        try:
+            await redis_client.eval(
+                COMPACT_STROKES_SCRIPT, 2, snapshot_key, strokes_key
+            )
+        except RedisError as e:
+            print(f"Whiteboard compaction failed for room {room_id}: {e}")
+    return seq
+
+
+# 그림판을 전체 그림(picture)으로 초기화하고 획 번호를 반환 (picture 가 None 이면 빈 그림판)
+@with_redis_retry
+async def reset_whiteboard(room_id: str, picture, redis_client: Redis) -> int:
+    snapshot_key, strokes_key = _whiteboard_keys(room_id)
+    return await redis_client.eval(
+        RESET_WHITEBOARD_SCRIPT,
+        2,
+        snapshot_key,
+        strokes_key,
+        json.dumps(picture, separators=(",", ":")),
+        settings.whiteboard_ttl,
+    )
+
+
+# 입장한 클라이언트에게 보낼 그림판 스냅샷 (저장된 그림판이 없으면 None)
+# {"room_id", "seq", "picture", "strokes": [{"client_id", "stroke"}, ...]}
+# 이후 받는 SC_PICTURE_STROKE 중 seq 가 스냅샷의 seq 이하인 획은 이미 반영된 획
+@with_redis_retry
+async def get_whiteboard_snapshot(room_id: str, redis_client: Redis) -> Optional[dict]:
+    snapshot_key, strokes_key = _whiteboard_keys(room_id)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hgetall(snapshot_key)
+        pipe.lrange(strokes_key, 0, -1)
+        snapshot, entries = await pipe.execute()
+
+    if not snapshot:
+        return None
+
+    strokes = json.loads(snapshot.get("strokes") or "[]")
+    strokes.extend(json.loads(entry) for entry in entries)
+    picture = snapshot.get("picture")
+    return {
+        "room_id": room_id,
+        "seq": int(snapshot.get("seq", 0)),
+        "picture": json.loads(picture) if picture is not None else None,
+        "strokes": strokes,
+    }
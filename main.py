@@ -1,8 +1,25 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
 
-from sockets.sockets import sio_app, process_connection_requests
+from core.config import settings
+from core.databases import get_redis, redis_pool
+from core.health import redis_health
+from core.chat import chat_history_writer
+from core.metrics import metrics
+from core.broadcast import broadcaster
+from core.movement import movement_coalescer, movement_ticker
+from core.outbound import outbound
+from core.protocol import delta_encoder
+from core.redis import rebuild_registries, redis_breaker
+from core.room_cache import listen_room_invalidations, room_cache
+from sockets.sockets import (
+    sio_app,
+    process_connection_requests,
+    process_movement_ticks,
+    process_room_ownership,
+)
 
 app = FastAPI()
 app.mount("/sio", app=sio_app)
@@ -15,15 +32,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 각 구성 요소의 stats() 를 /metrics 에 등록
+metrics.gauge(
+    "redis_ready", "Redis health check result", lambda: int(redis_health.ready)
+)
+metrics.register_stats("redis_pool", "Redis connection pool", redis_pool.stats)
+metrics.register_stats("redis_circuit", "Redis circuit breaker", redis_breaker.stats)
+metrics.register_stats("room_cache", "Room membership cache", room_cache.stats)
+metrics.register_stats(
+    "movement_coalescer", "Movement coalescer", movement_coalescer.stats
+)
+metrics.register_stats("movement_ticker", "Movement ticker", movement_ticker.stats)
+metrics.register_stats("movement_delta", "Movement delta encoder", delta_encoder.stats)
+metrics.register_stats("outbound", "Per-connection outbound queues", outbound.stats)
+metrics.register_stats(
+    "broadcast_cache", "Encode-once broadcast cache", broadcaster.stats
+)
+metrics.register_stats("chat_writer", "Chat history writer", chat_history_writer.stats)
+
+
+# 목록(set) 도입 이전에 만들어진 미팅룸/sid 키를 목록에 등록
+async def rebuild_redis_registries():
+    try:
+        async for redis_client in get_redis():
+            await rebuild_registries(redis_client)
+    except Exception as e:
+        print(f"Registry rebuild error: {e}")
+
+
 @app.on_event("startup")
 async def startup_event():
+    asyncio.create_task(redis_health.run())
+    asyncio.create_task(rebuild_redis_registries())
     asyncio.create_task(process_connection_requests())
+    if settings.movement_tick_rate > 0:
+        asyncio.create_task(process_movement_ticks())
+    if settings.cluster_mode:
+        asyncio.create_task(process_room_ownership())
+    if settings.room_cache_pubsub_enabled:
+        asyncio.create_task(listen_room_invalidations())
+    if settings.chat_history_enabled:
+        asyncio.create_task(chat_history_writer.run())
+
 
 @app.get("/health")
 async def health():
     return {"message": "OK"}
 
 
+# Redis 준비 상태 (백그라운드 상태 확인 결과, 준비 안 됨이면 503)
+@app.get("/ready")
+async def ready():
+    status = redis_health.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+# Prometheus 텍스트 형식 지표
+@app.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 async def home():
     return {"status": 200, "message": "my server is running"}
@@ -1,24 +1,83 @@
 import socketio
+from socketio import packet as sio_packet
+from typing import Optional
 from urllib.parse import parse_qs
 import asyncio
+import time
+from redis.exceptions import RedisError
 from core.databases import get_redis
 
 from core.redis import (
+    pop_disconnected_clients,
+    claim_client,
+    claim_room,
+    claim_rooms,
+    get_node_address,
+    release_client,
+    set_node_address,
+    redis_batch,
+)
+from core.room_cache import (
+    room_cache,
     add_to_room,
     remove_from_room,
+    queue_remove_from_room,
     get_room_clients,
-    set_disconnected_client,
-    get_disconnected_client,
-    delete_disconnected_client,
-    enqueue_connection_request,
-    dequeue_connection_request,
+)
+from core.cluster import NODE_ID, create_client_manager
+from core.config import settings
+from core.chat import append_chat_message, get_chat_history
+from core.whiteboard import (
+    append_stroke,
+    get_whiteboard_snapshot,
+    is_clear_stroke,
+    reset_whiteboard,
+)
+from core.protocol import PROTOCOL_BINARY, PROTOCOL_JSON, binary_protocol, delta_encoder
+from core.outbound import MOVEMENT, RELIABLE, outbound
+from core.broadcast import broadcaster
+from core.metrics import (
+    admission_timeouts,
+    admission_wait,
+    metrics,
+    record_emit,
+    timed_handler,
 )
 
-from core.movement import update_movement, handle_view_list_update, sector_manager
+from core.movement import (
+    update_movement,
+    handle_view_list_update,
+    apply_movement,
+    remove_client,
+    emit_view_events,
+    movement_coalescer,
+    movement_ticker,
+    build_movement_packet,
+    build_room_snapshot,
+    interest_manager,
+    sector_registry,
+    MAX_COORDINATE,
+    MIN_DIRECTION,
+    MAX_DIRECTION,
+)
 
 
-sio_server = socketio.AsyncServer(
+# InstrumentedAsyncServer 클래스: 개별 전송(emit)의 이벤트별 횟수와 크기를 기록하는 socket.io 서버
+# broadcaster 를 거치지 않는 전송은 모두 _send_packet 을 지나므로 여기서 기록합니다.
+class InstrumentedAsyncServer(socketio.AsyncServer):
+    async def _send_packet(self, eio_sid, pkt):
+        encoded_packet = pkt.encode()
+        if not isinstance(encoded_packet, list):
+            encoded_packet = [encoded_packet]
+        if pkt.packet_type in (sio_packet.EVENT, sio_packet.BINARY_EVENT):
+            record_emit(pkt.data[0], encoded_packet)
+        for ep in encoded_packet:
+            await self.eio.send(eio_sid, ep)
+
+
+sio_server = InstrumentedAsyncServer(
     async_mode="asgi",
+    client_manager=create_client_manager(),
     cors_allowed_origins=[],
     cors_credentials=True,
     ping_timeout=20,  # 클라이언트 응답 대기
@@ -26,127 +85,316 @@ sio_server = socketio.AsyncServer(
 )
 
 sio_app = socketio.ASGIApp(socketio_server=sio_server, socketio_path="/sio/sockets")
+broadcaster.configure(sio_server)
+
 
+# 클라이언트 상태 레코드
+# 연결 수만큼 생성되므로 __slots__ 로 인스턴스별 __dict__ 를 없애고,
+# 좌표와 방향은 수신 시점에 한 번만 정수로 변환해 저장합니다.
 class client_info:
+    __slots__ = (
+        "client_id",
+        "user_name",
+        "position_x",
+        "position_y",
+        "direction",
+        "room_type",
+        "room_id",
+        "sid",
+        "protocol",
+        "delta",
+    )
+
     def __init__(self, sid):
         self.client_id = None
         self.user_name = None
-        self.position_x = None
-        self.position_y = None
-        self.direction = None
+        self.position_x: Optional[int] = None
+        self.position_y: Optional[int] = None
+        self.direction: Optional[int] = None
         self.room_type = None
         self.room_id = None
         self.sid = sid
-
-
-# 이벤트 객체를 저장할 전역 딕셔너리
+        # 이동 정보 전송 형식 (PROTOCOL_JSON 또는 PROTOCOL_BINARY)
+        self.protocol = PROTOCOL_JSON
+        # 이동 정보를 수신자별 변화량(SC_MOVEMENT_DELTA)으로 받을지 여부 (JSON 연결만 해당)
+        self.delta = False
+
+    # 좌표와 방향을 정수로 변환해 저장
+    # 변환할 수 없거나(NaN, Infinity 포함) 허용 범위를 벗어난 값이면 저장하지 않고 False 반환
+    def set_position(self, position_x, position_y, direction) -> bool:
+        try:
+            position_x = int(float(position_x))
+            position_y = int(float(position_y))
+            direction = int(float(direction))
+        except (TypeError, ValueError, OverflowError):
+            return False
+        if (
+            abs(position_x) > MAX_COORDINATE
+            or abs(position_y) > MAX_COORDINATE
+            or not MIN_DIRECTION <= direction <= MAX_DIRECTION
+        ):
+            return False
+
+        self.position_x = position_x
+        self.position_y = position_y
+        self.direction = direction
+        return True
+
+
+# 방 id 에 대응하는 socket.io room 이름 (sid 별 기본 room 과 겹치지 않도록 접두사 사용)
+def sio_room(room_id):
+    return f"room:{room_id}"
+
+
+# 연결 요청 처리 결과(Future 객체)를 저장할 전역 딕셔너리
 asyncio_event_store = {}
 
 # 클라이언트 정보를 저장할 전역 딕셔너리
 client_info_store = {}
 
-# 클라이언트의 view list
-client_view_list = {}
+# sid -> client_id 역방향 인덱스 (client_info_store[client_id].sid 와 항상 같이 갱신)
+sid_to_client_id = {}
+
+
+# 클라이언트에 sid 연결 (이전 sid 의 역방향 매핑은 제거)
+def bind_sid(client_id, sid):
+    old_sid = client_info_store[client_id].sid
+    if old_sid != sid and sid_to_client_id.get(old_sid) == client_id:
+        del sid_to_client_id[old_sid]
+    client_info_store[client_id].sid = sid
+    sid_to_client_id[sid] = client_id
+
+
+# 클라이언트 정보와 역방향 매핑을 함께 제거
+def pop_client(client_id):
+    client = client_info_store.pop(client_id, None)
+    if client is not None and sid_to_client_id.get(client.sid) == client_id:
+        del sid_to_client_id[client.sid]
+    return client
+
 
 # sid로 클라이언트 아이디 찾기
 def find_key_by_sid(sid_to_find):
-    for key, value in client_info_store.items():
-        if value.sid == sid_to_find:
-            return key
-    return None
+    return sid_to_client_id.get(sid_to_find)
+
 
 # 클라이언트의 정보가 있는지 확인
 def client_in_client_data_store(key):
     return key in client_info_store
 
-# redis 큐에서서 연결 요청 처리
-async def process_connection_requests():
+
+# 연결 요청 대기열
+# 요청을 받은 프로세스가 client_info_store 를 가지고 있으므로 프로세스 내부 큐로 바로 전달
+connection_queue: asyncio.Queue = asyncio.Queue()
+
+
+# 연결 요청 처리 결과 전달 (대기 중인 connect 가 없으면 무시)
+def resolve_admission(sid, admitted):
+    future = asyncio_event_store.pop(sid, None)
+    if future is not None and not future.done():
+        future.set_result(admitted)
+
+
+# 연결 요청 묶음 처리
+# 재접속 정보는 요청 묶음 전체를 한 번의 Redis 왕복으로 조회/삭제
+async def admit_connections(requests, redis_client):
+    # 대기 시간이 초과된 요청은 건너뛰고, 더 새로운 연결로 대체된 요청은 바로 거절
+    pending_requests = []
+    for request in requests:
+        client = client_info_store.get(request["client_id"])
+        if client is None or client.sid != request["sid"]:
+            resolve_admission(request["sid"], False)
+        elif request["sid"] in asyncio_event_store:
+            pending_requests.append(request)
+    requests = pending_requests
+    if not requests:
+        return
+
+    disconnected_clients = await pop_disconnected_clients(
+        [request["client_id"] for request in requests], redis_client
+    )
+
+    for request in requests:
+        sid = request["sid"]
+        client_id = request["client_id"]
+        user_name = request["user_name"]
+
+        # 클라이언트 아이디가 재접속 리스트에 있는지 확인
+        client_data = disconnected_clients.get(client_id)
+        if client_data:
+            # 재접속 처리
+            client_data = {
+                "user_name": user_name,
+                "position_x": client_data.get("position_x"),
+                "position_y": client_data.get("position_y"),
+                "direction": client_data.get("direction"),
+            }
+            print(f"Reconnection client: {client_id}")
+
+        else:
+            client_data = {
+                "user_name": user_name,
+                "position_x": 350,
+                "position_y": 170,
+                "direction": 1,
+            }
+            print(f"New connection: sid:{sid}, client_id:{client_id}")
+
+        client_info_store[client_id].user_name = user_name
+        if not client_info_store[client_id].set_position(
+            client_data.get("position_x"),
+            client_data.get("position_y"),
+            client_data.get("direction"),
+        ):
+            # 저장된 위치가 손상된 경우 기본 위치에서 시작
+            client_info_store[client_id].set_position(350, 170, 1)
+        print(f"process_connection_requests {user_name}")
+
+        # 연결 요청 완료 알림
+        resolve_admission(sid, True)
+        print(f"Admission for SID {sid} resolved.")
+
+
+# 연결 요청 처리 워커
+# 요청이 들어오면 바로 깨어나고, 밀려 있는 요청은 admission_batch_size 만큼 묶어서 처리
+async def admission_worker():
     async for redis_client in get_redis():
         while True:
-            request = await dequeue_connection_request(redis_client)
-            if request:
-                sid = request["sid"]
-                client_id = request["client_id"]
-                user_name = request["user_name"]
-
-                # 클라이언트 아이디가 재접속 리스트에 있는지 확인
-                client_data = await get_disconnected_client(client_id, redis_client)
-                if client_data:
-                    # 재접속 처리
-                    client_data = {
-                        "user_name": user_name,
-                        "position_x": client_data.get("position_x"),
-                        "position_y": client_data.get("position_y"),
-                        "direction": client_data.get("direction"),
-                    }
-                    await delete_disconnected_client(client_id, redis_client)
-                    print(f"Reconnection client: {client_id}")
-
-                else:
-                    client_data = {
-                        "user_name": user_name,
-                        "position_x": 350,
-                        "position_y": 170,
-                        "direction": 1,
-                    }
-                    print(f"New connection: sid:{sid}, client_id:{client_id}")
-                
-                client_info_store[client_id].user_name = user_name
-                client_info_store[client_id].position_x = client_data.get("position_x")
-                client_info_store[client_id].position_y = client_data.get("position_y")
-                client_info_store[client_id].direction = client_data.get("direction")
-                print(f"process_connection_requests {user_name}")
-
-                # 이벤트 객체 완료 알림
-                event = asyncio_event_store.pop(sid, None)
-                if event:
-                    event.set()
-                    print(f"Event for SID {sid} set.")
-
-            await asyncio.sleep(0.1)
+            requests = [await connection_queue.get()]
+            while (
+                len(requests) < settings.admission_batch_size
+                and not connection_queue.empty()
+            ):
+                requests.append(connection_queue.get_nowait())
+
+            try:
+                await admit_connections(requests, redis_client)
+            except Exception as e:
+                # 처리하지 못한 connect 는 제한 시간까지 기다리지 않고 바로 거절
+                print(f"Connection admission error: {e}")
+                for request in requests:
+                    resolve_admission(request["sid"], False)
+
+
+# 연결 요청 처리 워커 실행
+async def process_connection_requests():
+    await asyncio.gather(
+        *(admission_worker() for _ in range(settings.admission_workers))
+    )
+
+
+# 입장이 거절된 새 연결의 소유 정보 해제 (Redis 장애 중이면 기록이 남을 수 있음)
+async def release_rejected_client(client_id, sid):
+    try:
+        async for redis_client in get_redis():
+            await release_client(client_id, sid, redis_client)
+    except RedisError as e:
+        print(f"Redis unavailable while releasing {client_id}: {e}")
 
 
 # 클라이언트 연결 이벤트 처리
 @sio_server.event
+@timed_handler
 async def connect(sid, environ):
     query_string = environ.get("QUERY_STRING", "")
     query_params = parse_qs(query_string)
     client_id = query_params.get("client_id", [None])[0]
     user_name = query_params.get("user_name", [None])[0]
+    # 이동 정보 전송 형식 협상 (기존 클라이언트는 JSON)
+    protocol = query_params.get("protocol", [PROTOCOL_JSON])[0]
+    if protocol != PROTOCOL_BINARY:
+        protocol = PROTOCOL_JSON
+    delta = query_params.get("movement", [None])[0] == "delta"
 
     if not client_id:
         return False
-    
+
     # 해당 client_id가 매핑된 sid가 있는지 확인
-    async for redis_client in get_redis():
-        if client_id in client_info_store:
-            # 중복 연결 아이디면 기존 연결 끊기
-            old_sid = client_info_store[client_id].sid
-            if old_sid:
-                await sio_server.emit(
-                    "SC_DUPLICATE_CONNECTION",
-                    {"message": "Duplicate connection detected."},
-                    to=old_sid,
-                )
-            client_info_store[client_id].sid = sid
+    took_over = client_id in client_info_store
+    if took_over:
+        # 중복 연결 아이디면 기존 연결 끊기
+        old_sid = client_info_store[client_id].sid
+        if old_sid:
+            await sio_server.emit(
+                "SC_DUPLICATE_CONNECTION",
+                {"message": "Duplicate connection detected."},
+                to=old_sid,
+            )
+        bind_sid(client_id, sid)
+        # 기존 연결이 들어가 있던 socket.io room 에 새 연결도 등록
+        room_id = client_info_store[client_id].room_id
+        if room_id:
+            sio_server.enter_room(sid, sio_room(room_id))
+        await sio_server.disconnect(old_sid)
+    else:
+        client_info_store[client_id] = client_info(sid)
+        bind_sid(client_id, sid)
+    client_info_store[client_id].protocol = protocol
+    client_info_store[client_id].delta = delta
+    # 새 연결에는 다른 클라이언트 소개(SC_PEER_INFO)와 전체 좌표부터 다시 보냄
+    binary_protocol.remove_client(client_id)
+    delta_encoder.reset(client_id)
+
+    # 다중 노드 모드: 소유 노드를 기록하고, 다른 노드에 남아 있는 기존 연결을 끊음
+    # (emit/disconnect 는 Redis 매니저를 통해 기존 연결이 있는 노드에서 처리됨)
+    if settings.cluster_mode:
+        async for redis_client in get_redis():
+            previous_owner = await claim_client(client_id, sid, NODE_ID, redis_client)
+        if (
+            previous_owner
+            and previous_owner.get("node_id") != NODE_ID
+            and previous_owner.get("sid") != sid
+        ):
+            old_sid = previous_owner["sid"]
+            await sio_server.emit(
+                "SC_DUPLICATE_CONNECTION",
+                {"message": "Duplicate connection detected."},
+                to=old_sid,
+            )
             await sio_server.disconnect(old_sid)
-        else:
-            client_info_store[client_id] = client_info(sid)
-            
-        event = asyncio.Event()
-        await enqueue_connection_request(redis_client, sid, client_id, user_name)
+            print(
+                f"Duplicate connection on node {previous_owner.get('node_id')}: {client_id}"
+            )
 
-        # 이벤트 객체를 전역 딕셔너리에 저장
-        asyncio_event_store[sid] = event
-        print(f"enqueued: sid:{sid}, client_id:{client_id}")
+    # 처리 결과를 받을 Future 객체를 전역 딕셔너리에 저장한 뒤 연결 요청 등록
+    future = asyncio.get_running_loop().create_future()
+    asyncio_event_store[sid] = future
+    enqueued_at = time.perf_counter()
+    connection_queue.put_nowait(
+        {"sid": sid, "client_id": client_id, "user_name": user_name}
+    )
+    print(f"enqueued: sid:{sid}, client_id:{client_id}")
+
+    # 연결 요청 완료 대기 (처리 실패 또는 제한 시간 초과 시 연결 거절)
+    try:
+        admitted = await asyncio.wait_for(
+            future, timeout=settings.connection_admission_timeout
+        )
+    except asyncio.TimeoutError:
+        admission_timeouts.inc()
+        asyncio_event_store.pop(sid, None)
+        admitted = False
+        print(f"Connection admission timed out: sid:{sid}, client_id:{client_id}")
+
+    if not admitted:
+        # 기존 연결의 방/섹터/시야 상태를 넘겨받은 연결이면 연결 해제와 같은 정리를 하고,
+        # 새로 만든 클라이언트 정보는 제거 (더 새로운 연결이 넘겨받은 경우에는 그대로 둠)
+        if took_over:
+            await disconnect_client(sid)
+        elif find_key_by_sid(sid) == client_id:
+            pop_client(client_id)
+            if settings.cluster_mode:
+                await release_rejected_client(client_id, sid)
+        print(f"Connection rejected: sid:{sid}, client_id:{client_id}")
+        return False
+
+    admission_wait.observe(time.perf_counter() - enqueued_at)
+    outbound.open(sid)
+    print(f"Connection completed: sid:{sid}, client_id:{client_id}")
 
-        # 연결 요청 완료 대기
-        while asyncio_event_store.get(sid):
-            await event.wait()
-            print(f"Event for SID {sid} completed.")
-        print(f"Connection completed: sid:{sid}, client_id:{client_id}")
 
 @sio_server.event
+@timed_handler
 async def CS_JOIN_ROOM(sid, data):
     client_id = data.get("client_id")
     room_type = data.get("room_type")
@@ -157,30 +405,55 @@ async def CS_JOIN_ROOM(sid, data):
         return
 
     async for redis_client in get_redis():
+        # 다중 노드 모드: 다른 노드가 맡은 방이면 입장시키지 않고 그 노드의 주소를 알려 줌
+        # (클라이언트는 address 로 다시 연결한 뒤 입장)
+        # 방을 맡은 노드의 주소가 없으면 클라이언트가 옮겨 갈 수 없으므로 이 노드에서 입장 처리
+        if settings.cluster_mode:
+            owner = await claim_room(
+                room_id, NODE_ID, settings.room_owner_ttl, redis_client
+            )
+            if owner != NODE_ID:
+                address = await get_node_address(owner, redis_client)
+                if address:
+                    await sio_server.emit(
+                        "SC_ROOM_REDIRECT",
+                        {"room_id": room_id, "node_id": owner, "address": address},
+                        to=sid,
+                    )
+                    print(f"Room {room_id} is owned by node {owner}: {client_id}")
+                    return
+                print(
+                    f"Room {room_id} is owned by node {owner} without an address: {client_id}"
+                )
+
+        # 이전 방의 socket.io room 에서 나오기
+        previous_room_id = client_info_store[client_id].room_id
+        if previous_room_id is not None and previous_room_id != room_id:
+            sio_server.leave_room(sid, sio_room(previous_room_id))
+
         # 클라이언트 정보 업데이트 room_type, room_id
         client_info_store[client_id].room_type = room_type
         client_info_store[client_id].room_id = room_id
 
+        # 섹터 인덱스를 새 방으로 이동하고 시야 변경 알림
+        position_x = client_info_store[client_id].position_x
+        position_y = client_info_store[client_id].position_y
+        if position_x is not None and position_y is not None:
+            entered, left = apply_movement(client_id, room_id, position_x, position_y)
+            await emit_view_events(entered, left, emit_to_client, client_info_store)
 
-
-        # room_type이 meeting 이면 해당방의 첫번째 유저에게 SC_GET_PICTURE 를 보냄
-        if room_type == "meeting":
-            for client in await get_room_clients(room_id, redis_client):
-                client_sid = client_info_store[client].sid
-                await sio_server.emit(
-                    "SC_GET_PICTURE",
-                    {"client_id": client_id},
-                    to=client_sid,
-                )
-
-                
-        # 방에 클라이언트 추가
+        # 방에 클라이언트 추가 (Redis 구성원 목록과 socket.io room 모두)
         await add_to_room(room_id, client_id, redis_client)
+        sio_server.enter_room(sid, sio_room(room_id))
 
-
+        # room_type이 meeting 이면 저장된 그림판을 전송
+        # (room 에 먼저 들어갔으므로 그 사이 그려진 획은 SC_PICTURE_STROKE 로 받고 seq 로 중복 제거)
+        if room_type == "meeting":
+            await send_whiteboard(sid, client_id, room_id, redis_client)
 
 
 @sio_server.event
+@timed_handler
 async def CS_USER_POSITION(sid, data):
     client_id = data.get("client_id")
     room_id = data.get("room_id")
@@ -190,51 +463,32 @@ async def CS_USER_POSITION(sid, data):
         return
 
     async for redis_client in get_redis():
-        await sio_server.emit(
-            "SC_USER_POSITION_INFO",
-            {
-                "client_id": client_id,
-                "user_name": client_info_store[client_id].user_name,
-                "position_x": int(float(client_info_store[client_id].position_x)),
-                "position_y": int(float(client_info_store[client_id].position_y)),
-                "direction": int(float(client_info_store[client_id].direction)),
-            },
-            to=sid,
-        )
-    
-        for client in await get_room_clients(room_id, redis_client):
-            if client_id != client:
-                # 기존 클라이언트에게 새로운 클라이언트 정보 전송
-                client_sid = client_info_store[client].sid
-                
-                await sio_server.emit(
-                    "SC_USER_POSITION_INFO",
-                    {
-                        "client_id": client_id,
-                        "user_name": client_info_store[client_id].user_name,
-                        "position_x": int(float(client_info_store[client_id].position_x)),
-                        "position_y": int(float(client_info_store[client_id].position_y)),
-                        "direction": int(float(client_info_store[client_id].direction)),
-                    },
-                    to=client_sid,
-                )
+        members = await get_room_clients(room_id, redis_client)
+
+    # 새로운 클라이언트에게 본인과 기존 클라이언트 정보를 스냅샷 하나로 전송
+    await sio_server.emit(
+        "SC_ROOM_SNAPSHOT",
+        build_room_snapshot(
+            client_id,
+            room_id,
+            members,
+            client_info_store,
+            settings.room_snapshot_max_clients,
+        ),
+        to=sid,
+    )
 
-           
-            # 새로운 클라이언트에게 기존 클라이언트 정보 전송
-                await sio_server.emit(
-                    "SC_USER_POSITION_INFO",
-                    {
-                        "client_id": client,
-                        "user_name": client_info_store[client].user_name,
-                        "position_x": int(float(client_info_store[client].position_x)),
-                        "position_y": int(float(client_info_store[client].position_y)),
-                        "direction": int(float(client_info_store[client].direction)),
-                    },
-                    to=sid,
-                )
+    # 기존 클라이언트에게 새로운 클라이언트 정보를 방 단위로 한 번에 전송
+    await emit_to_room(
+        "SC_USER_POSITION_INFO",
+        build_movement_packet(client_id, client_info_store[client_id]),
+        room_id,
+        skip_sid=sid,
+    )
 
 
 @sio_server.event
+@timed_handler
 async def CS_LEAVE_ROOM(sid, data):
     client_id = data.get("client_id")
     room_id = data.get("room_id")
@@ -246,21 +500,30 @@ async def CS_LEAVE_ROOM(sid, data):
     async for redis_client in get_redis():
         # 방에서 클라이언트 제거
         await remove_from_room(room_id, client_id, redis_client)
-
-        # 방에 있는 모든 클라이언트에게 퇴장 정보 전송(본인 포함)
-        for client in await get_room_clients(room_id, redis_client):
-            client_sid = client_info_store[client].sid
-            await sio_server.emit(
-                "SC_LEAVE_ROOM",
-                {"client_id": client_id},
-                to=client_sid,
-            )
+        sio_server.leave_room(sid, sio_room(room_id))
+
+        # 섹터 인덱스와 시야에서 제거 (방이 비면 인덱스 해제)
+        entered, left = remove_client(client_id)
+        await emit_view_events(entered, left, emit_to_client, client_info_store)
+        if (
+            client_id in client_info_store
+            and client_info_store[client_id].room_id == room_id
+        ):
+            client_info_store[client_id].room_type = None
+            client_info_store[client_id].room_id = None
+
+        # 방에 남아 있는 모든 클라이언트에게 퇴장 정보 전송
+        await emit_to_room(
+            "SC_LEAVE_ROOM",
+            {"client_id": client_id},
+            room_id,
+        )
 
         print(f"{client_id} left room {room_id}")
 
 
-
 @sio_server.event
+@timed_handler
 async def CS_CHAT(sid, data):
     client_id = data.get("client_id")
 
@@ -268,40 +531,161 @@ async def CS_CHAT(sid, data):
         print("Error: Missing required data4")
         return
 
+    # 클라이언트 정보 가져오기
+    user_name = client_info_store[client_id].user_name
+    room_id = client_info_store[client_id].room_id
+
+    message = data.get("message")
+
+    if not message:
+        print("Error: Missing message data")
+        return
+
+    # 방에 들어가지 않은 클라이언트의 채팅은 보낼 곳이 없으므로 무시
+    if room_id is None:
+        print(f"Error: {client_id} is not in a room")
+        return
+
+    packet = {
+        "user_name": user_name,
+        "message": message,
+    }
+
+    # 채팅 기록 저장 (Redis 한 번의 왕복, DB 저장은 백그라운드 워커가 묶어서 처리)
+    # 기록에 실패하거나 DB 저장 대기열이 가득 차도 실시간 전송은 계속 진행 (message_id 없이 전송)
+    if settings.chat_history_enabled:
+        try:
+            async for redis_client in get_redis():
+                message_id = await append_chat_message(
+                    room_id, client_id, user_name, str(message), redis_client
+                )
+            if message_id is not None:
+                packet["message_id"] = message_id
+        except RedisError as e:
+            print(f"Chat history append failed: {e}")
+
+    # 방에 있는 모든 클라이언트에게 메시지 전송 (본인 포함)
+    await emit_to_room(
+        "SC_CHAT",
+        packet,
+        room_id,
+    )
+
+    print(f"{user_name} sent message : {message}")
+
+
+# 채팅 기록 조회 (재접속한 클라이언트용)
+# before 에 이전 응답의 next_before 를 넣어 더 오래된 메시지를 이어서 조회
+@sio_server.event
+@timed_handler
+async def CS_CHAT_HISTORY(sid, data):
+    if not isinstance(data, dict):
+        print("Error: Invalid data format")
+        return
+
+    client_id = data.get("client_id")
+    room_id = data.get("room_id")
+
+    if not client_id or not room_id:
+        print("Error: Missing required data7")
+        return
+
+    try:
+        limit = int(data.get("limit") or settings.chat_history_page_size)
+    except (TypeError, ValueError):
+        limit = settings.chat_history_page_size
+
     async for redis_client in get_redis():
-        # 클라이언트 정보 가져오기
-        user_name = client_info_store[client_id].user_name
-        room_id = client_info_store[client_id].room_id
+        history = await get_chat_history(
+            room_id, data.get("before"), limit, redis_client
+        )
 
-        message = data.get("message")
+    await sio_server.emit("SC_CHAT_HISTORY", history, to=sid)
 
-        if not message:
-            print("Error: Missing message data")
-            return
 
-        # 방에 있는 모든 클라이언트에게 메시지 전송
-        for client in await get_room_clients(room_id, redis_client):
-            client_sid = client_info_store[client].sid
+# 미팅룸에 입장한 클라이언트에게 그림판 전송
+# 저장된 그림판이 있으면 SC_PICTURE_SNAPSHOT 하나로 보내고,
+# 없으면 방에 있던 클라이언트 한 명에게만 SC_GET_PICTURE 를 보내 전체 그림을 받아 저장
+async def send_whiteboard(sid, client_id, room_id, redis_client):
+    snapshot = await get_whiteboard_snapshot(room_id, redis_client)
+    if snapshot is not None:
+        await sio_server.emit("SC_PICTURE_SNAPSHOT", snapshot, to=sid)
+        return
+
+    for member in await get_room_clients(room_id, redis_client):
+        if (
+            member != client_id
+            and member in client_info_store
+            and client_info_store[member].sid
+        ):
             await sio_server.emit(
-                "SC_CHAT",
-                {
-                    "user_name": user_name,
-                    "message": message,
-                },
-                to=client_sid,
+                "SC_GET_PICTURE",
+                {"client_id": client_id},
+                to=client_info_store[member].sid,
             )
+            return
+
+    # 이 노드에 다른 클라이언트가 없으면 (다른 노드 포함) 방 전체에 요청
+    await emit_to_room(
+        "SC_GET_PICTURE",
+        {"client_id": client_id},
+        room_id,
+        skip_sid=sid,
+    )
+
+
+# 미팅룸 그림판 획 이벤트
+# 획을 그림판 로그에 기록하고 방에 있는 다른 클라이언트에게 획만 전송
+# 보낸 클라이언트에게는 ack 로 획 번호(seq)를 돌려줌
+# 그림판이 가득 차 획이 거절되면 ack 의 seq 는 None 이고, 보낸 클라이언트에게 SC_GET_PICTURE 로
+# 전체 그림을 요청 (CS_PICTURE_INFO 로 받은 그림이 쌓인 획을 대신함)
+@sio_server.event
+@timed_handler
+async def CS_PICTURE_STROKE(sid, data):
+    if not isinstance(data, dict):
+        print("Error: Invalid data format")
+        return
 
-            print(f"sent to {client}")
+    client_id = data.get("client_id")
+    room_id = data.get("room_id")
+    stroke = data.get("stroke")
+
+    if not client_id or not room_id or stroke is None:
+        print("Error: Missing required data6")
+        return
+
+    async for redis_client in get_redis():
+        if is_clear_stroke(stroke):
+            seq = await reset_whiteboard(room_id, None, redis_client)
+        else:
+            seq = await append_stroke(room_id, client_id, stroke, redis_client)
+
+    if seq is None:
+        await sio_server.emit("SC_GET_PICTURE", {"client_id": client_id}, to=sid)
+        return {"seq": None}
+
+    await emit_to_room(
+        "SC_PICTURE_STROKE",
+        {
+            "client_id": client_id,
+            "seq": seq,
+            "stroke": stroke,
+        },
+        room_id,
+        skip_sid=sid,
+    )
+    return {"seq": seq}
 
-        print(f"{user_name} sent message : {message}")
 
 # 미팅룸 그림판 정보 관련 이벤트
+# 전체 그림은 그림판 스냅샷을 교체하고 방에 있는 다른 클라이언트에게 전달
 @sio_server.event
+@timed_handler
 async def CS_PICTURE_INFO(sid, data):
     if not isinstance(data, dict):
         print("Error: Invalid data format")
         return
-    
+
     client_id = data.get("client_id")
     room_id = data.get("room_id")
 
@@ -310,23 +694,23 @@ async def CS_PICTURE_INFO(sid, data):
         return
 
     async for redis_client in get_redis():
-        # 방에 있는 모든 클라이언트에게 SC_PICTURE_INFO 전송
-        for client in await get_room_clients(room_id, redis_client):
-            if client == client_id:
-                continue
-
-            client_sid = client_info_store[client].sid
-            await sio_server.emit(
-                "SC_PICTURE_INFO",
-                {
-                    "client_id": client_id,
-                    "picture": data.get("picture"),
-                },
-                to=client_sid,
-            )
+        seq = await reset_whiteboard(room_id, data.get("picture"), redis_client)
+
+    # 방에 있는 다른 클라이언트에게 SC_PICTURE_INFO 전송
+    await emit_to_room(
+        "SC_PICTURE_INFO",
+        {
+            "client_id": client_id,
+            "picture": data.get("picture"),
+            "seq": seq,
+        },
+        room_id,
+        skip_sid=sid,
+    )
 
 
 @sio_server.event
+@timed_handler
 async def CS_MOVEMENT_INFO(sid, data):
     if not isinstance(data, dict):
         print("Error: Invalid data format")
@@ -341,35 +725,280 @@ async def CS_MOVEMENT_INFO(sid, data):
         print(f"Error: Client {client_id} not found in client_info_store")
         return
 
-    client_info_store[client_id].position_x = data.get("position_x")
-    client_info_store[client_id].position_y = data.get("position_y")
-    client_info_store[client_id].direction = data.get("direction")
+    # 좌표는 여기서 한 번만 정수로 변환하고, 이후 처리는 변환된 값을 사용
+    client = client_info_store[client_id]
+    previous = (client.position_x, client.position_y, client.direction)
+    if not client.set_position(
+        data.get("position_x"), data.get("position_y"), data.get("direction")
+    ):
+        print(f"Error: Invalid position data from {client_id}")
+        return
+
+    # 위치와 방향이 그대로면 전달하지 않음
+    if (client.position_x, client.position_y, client.direction) == previous:
+        return
+
+    # 틱 모드에서는 최신 위치만 보관하고 다음 틱에서 묶어서 전송
+    if movement_ticker.enabled:
+        movement_ticker.submit(client_id, data)
+        return
+
+    # 클라이언트별로 최신 패킷만 처리하고 초과 빈도는 합쳐서 처리
+    async def process_movement(latest_data):
+        await handle_view_list_update(
+            sid=sid,
+            data=latest_data,
+            emit_callback=emit_to_client,
+            client_info_store=client_info_store,
+        )
+        await update_movement(
+            sid=sid,
+            data=latest_data,
+            emit_callback=emit_to_client,
+            client_info_store=client_info_store,
+        )
+
+    await movement_coalescer.submit(client_id, data, process_movement)
+
+
+# 클라이언트 한 명에게 전송 (전송 대기열을 사용하면 대기열에 넣고 바로 반환)
+# kind 가 MOVEMENT 인 메시지는 클라이언트가 느릴 때 버려질 수 있고, key 가 같으면 최신 값으로 대체됨
+async def send_to_sid(sid, event, data, kind=RELIABLE, key=None):
+    if outbound.enabled:
+        outbound.send(sid, event, data, kind, key)
+    else:
+        await broadcaster.send(sid, event, data)
+
+
+# 방에 있는 모든 연결에 전송 (skip_sid 제외)
+# 전송 대기열을 사용하면 수신자별 대기열에 RELIABLE 로 넣어, 먼저 넣은 이동/시야 메시지보다
+# 앞서 도착하지 않도록 함 (같은 데이터 객체이므로 인코딩은 broadcaster.send 에서 한 번만)
+# 다중 노드 모드에서는 다른 노드의 연결에도 보내야 하므로 broadcaster.emit 사용
+async def emit_to_room(event, data, room_id, skip_sid=None):
+    if not outbound.enabled or not broadcaster.local:
+        await broadcaster.emit(event, data, room=sio_room(room_id), skip_sid=skip_sid)
+        return
+
+    if "/" not in sio_server.manager.rooms:
+        return
+    for sid, _ in sio_server.manager.get_participants("/", sio_room(room_id)):
+        if sid != skip_sid:
+            outbound.send(sid, event, data)
+
+
+async def emit_to_client(target_client, packet, event="SC_MOVEMENT_INFO"):
+    if target_client not in client_info_store:
+        print(f"Error: Target client {target_client} not found in client_info_store")
+        return
+
+    client = client_info_store[target_client]
+    if not client.sid:
+        return
+    if event == "SC_MOVEMENT_INFO":
+        if client.protocol == PROTOCOL_BINARY:
+            await emit_binary_movements(target_client, client.sid, (packet,))
+        elif client.delta:
+            await emit_delta_movements(target_client, client.sid, (packet,))
+        else:
+            await send_to_sid(
+                client.sid, event, packet, MOVEMENT, packet.get("client_id")
+            )
+        return
+
+    # delta 연결은 시야 변경에 맞춰 기준 상태를 갱신
+    if client.delta:
+        if event == "SC_ENTER_VIEW":
+            delta_encoder.observe(target_client, packet)
+        elif event == "SC_LEAVE_VIEW":
+            delta_encoder.forget(target_client, packet["client_id"])
+    await send_to_sid(client.sid, event, packet)
+
+
+async def emit_batch_to_client(target_client, packets):
+    if target_client not in client_info_store:
+        return
+
+    client = client_info_store[target_client]
+    if not client.sid:
+        return
+    if client.protocol == PROTOCOL_BINARY:
+        await emit_binary_movements(target_client, client.sid, packets)
+    elif client.delta:
+        await emit_delta_movements(target_client, client.sid, packets)
+    else:
+        await send_to_sid(
+            client.sid, "SC_MOVEMENT_INFO_BATCH", {"movements": packets}, MOVEMENT
+        )
+
+
+# 바이너리 프로토콜 연결에 이동 정보 전송
+# 처음 보는 클라이언트는 SC_PEER_INFO 로 먼저 소개하고, 이동 정보는 SC_MOVEMENT_BIN 프레임으로 전송
+async def emit_binary_movements(target_client, client_sid, packets):
+    peers, frames = binary_protocol.encode_for(target_client, packets)
+    if peers:
+        await send_to_sid(client_sid, "SC_PEER_INFO", {"peers": peers})
+    for frame in frames:
+        await send_to_sid(client_sid, "SC_MOVEMENT_BIN", frame, MOVEMENT)
+
+
+# delta 연결에 이동 정보 전송
+# 변화가 없는 대상은 건너뛰고, 기준 상태가 없거나 keyframe 주기가 된 대상은 전체 좌표로,
+# 나머지는 SC_MOVEMENT_DELTA 로 변화량만 전송
+async def emit_delta_movements(target_client, client_sid, packets):
+    keyframes, deltas = delta_encoder.encode_for(target_client, packets)
+    if len(keyframes) == 1:
+        await send_to_sid(client_sid, "SC_MOVEMENT_INFO", keyframes[0], MOVEMENT)
+    elif keyframes:
+        await send_to_sid(
+            client_sid, "SC_MOVEMENT_INFO_BATCH", {"movements": keyframes}, MOVEMENT
+        )
+    if deltas:
+        await send_to_sid(
+            client_sid, "SC_MOVEMENT_DELTA", {"movements": deltas}, MOVEMENT
+        )
+
+
+# 클라이언트가 상태 불일치를 감지했을 때 시야 안 모든 클라이언트의 전체 좌표를 다시 요청
+@sio_server.event
+@timed_handler
+async def CS_MOVEMENT_RESYNC(sid, data=None):
+    client_id = find_key_by_sid(sid)
+    if client_id:
+        await resync_movements(client_id)
+
+
+# 시야 안 모든 클라이언트의 전체 좌표를 다시 전송 (delta 기준 상태도 초기화)
+async def resync_movements(client_id):
+    delta_encoder.reset(client_id)
+    packets = [
+        build_movement_packet(target, client_info_store[target])
+        for target in interest_manager.get_view(client_id)
+        if target in client_info_store
+        and client_info_store[target].position_x is not None
+    ]
+    if packets:
+        await emit_batch_to_client(client_id, packets)
+
+
+# 전송 대기열 콜백
+# 전송 계층 버퍼 길이는 engine.io 소켓의 송신 큐 길이로 판단 (emit 은 이 큐에 넣기만 하고 바로 반환)
+def outbound_backlog(sid):
+    eio_sid = sio_server.manager.eio_sid_from_sid(sid, "/")
+    socket = sio_server.eio.sockets.get(eio_sid) if eio_sid else None
+    return socket.queue.qsize() if socket is not None else 0
+
+
+# 같은 데이터를 여러 연결에 보낼 때 인코딩은 한 번만 하도록 broadcaster 로 전송
+async def outbound_send(sid, event, data):
+    await broadcaster.send(sid, event, data)
+
+
+# 이동 메시지를 버린 연결에는 대기열이 빈 뒤 전체 좌표를 다시 전송
+async def outbound_resync(sid):
+    client_id = find_key_by_sid(sid)
+    if client_id:
+        await resync_movements(client_id)
+
+
+outbound.configure(
+    send=outbound_send,
+    backlog=outbound_backlog,
+    disconnect=sio_server.disconnect,
+    resync=outbound_resync,
+)
+
 
-    await handle_view_list_update(
-        sid=sid,
-        data=data,
+# 상태 지표 (조회 시점에 계산)
+# 섹터 인덱스는 방 수가 많을 수 있으므로 방별 라벨 대신 전체 합계와 최댓값만 기록
+def sector_stats():
+    indexes = list(sector_registry.rooms.values())
+    return {
+        "rooms": len(indexes),
+        "sectors": sum(len(index.sectors) for index in indexes),
+        "max_clients": max(
+            (len(clients) for index in indexes for clients in index.sectors.values()),
+            default=0,
+        ),
+    }
+
+
+metrics.gauge(
+    "connected_clients", "Clients in client_info_store", lambda: len(client_info_store)
+)
+metrics.gauge(
+    "connection_queue_depth",
+    "Connection requests waiting for an admission worker",
+    connection_queue.qsize,
+)
+metrics.gauge(
+    "connection_admission_pending",
+    "Connections waiting for admission",
+    lambda: len(asyncio_event_store),
+)
+metrics.gauge(
+    "interest_views",
+    "Clients with a non-empty view list",
+    lambda: len(interest_manager.views),
+)
+metrics.register_stats("sector", "Sector index size", sector_stats)
+
+
+# 틱 모드에서 이동 정보를 주기적으로 모아서 전송
+async def process_movement_ticks():
+    await movement_ticker.run(
         emit_callback=emit_to_client,
+        emit_batch_callback=emit_batch_to_client,
         client_info_store=client_info_store,
-        client_view_list=client_view_list
     )
-    await update_movement(
-        sid=sid,
-        data=data,
-        emit_callback=emit_to_client,
-        client_info_store=client_info_store
+
+
+# 다중 노드 모드: 이 노드의 주소와, 이 노드에 구성원이 있는 방을 주기적으로 다시 기록해 보관 시간 연장
+# 구성원이 모두 나간 방은 연장하지 않으므로 room_owner_ttl 후 다른 노드가 맡을 수 있음
+async def refresh_room_ownership():
+    room_ids = list(
+        {client.room_id for client in client_info_store.values() if client.room_id}
     )
+    owners = {}
+    async for redis_client in get_redis():
+        if settings.node_address:
+            await set_node_address(
+                NODE_ID, settings.node_address, settings.room_owner_ttl, redis_client
+            )
+        if room_ids:
+            owners = await claim_rooms(
+                room_ids, NODE_ID, settings.room_owner_ttl, redis_client
+            )
+    for room_id, owner in owners.items():
+        if owner != NODE_ID:
+            print(f"Room {room_id} was taken over by node {owner}")
 
-async def emit_to_client(target_client, packet):
-    if target_client not in client_info_store:
-        print(f"Error: Target client {target_client} not found in client_info_store")
-        return
 
-    client_sid = client_info_store[target_client].sid
-    if client_sid:
-        await sio_server.emit("SC_MOVEMENT_INFO", packet, to=client_sid)
+async def process_room_ownership():
+    if not settings.node_address:
+        print(
+            "NODE_ADDRESS is not set: rooms owned by this node cannot be redirected to it"
+        )
+    while True:
+        try:
+            await refresh_room_ownership()
+        except Exception as e:
+            print(f"Room ownership refresh error: {e}")
+        await asyncio.sleep(settings.room_owner_ttl / 3)
+
 
 @sio_server.event
+@timed_handler
 async def disconnect(sid):
+    # 전송 대기열은 클라이언트 정리가 모두 끝난 뒤 제거
+    # (정리 중에는 대기열이 남아 있고, 제거한 뒤에 이 sid 로 보내는 메시지는 버려짐)
+    try:
+        await disconnect_client(sid)
+    finally:
+        outbound.close(sid)
+
+
+# 연결이 끊긴 클라이언트 정리 (Redis 재접속 정보 저장, 방/섹터/시야에서 제거)
+async def disconnect_client(sid):
     async for redis_client in get_redis():
         try:
             client_id = find_key_by_sid(sid)
@@ -381,25 +1010,6 @@ async def disconnect(sid):
 
             print(f"watching {client_id} for reconnection")
 
-            # 클라이언트 정보 삭제
-            await remove_from_room(room_id, client_id, redis_client)
-
-            # 방에 있는 모든 클라이언트에게 퇴장 정보 전송
-            for client in await get_room_clients(room_id, redis_client):
-                client_sid = client_info_store[client].sid
-                if client_sid:
-                    await sio_server.emit(
-                        "SC_LEAVE_USER",
-                        {"client_id": client_id},
-                        to=client_sid,
-                    )
-
-                    await sio_server.emit(
-                        "SC_LEAVE_ROOM",
-                        {"client_id": client_id},
-                        to=client_sid,
-                    )
-
             disconnected_client_data = {
                 "client_id": client_id,
                 "user_name": client_info_store[client_id].user_name,
@@ -408,23 +1018,42 @@ async def disconnect(sid):
                 "direction": client_info_store[client_id].direction,
             }
 
-            await set_disconnected_client(client_id, disconnected_client_data, redis_client)
-            client_info_store.pop(client_id)
-
-            # client_view_list에서 클라이언트 삭제
-            if client_id in client_view_list:
-                client_view_list.pop(client_id)
+            # 방에서 제거, 재접속 정보 저장, 소유 정보 해제를 한 번의 트랜잭션으로 처리
+            # Redis 장애 중이어도 이 노드의 상태 정리는 계속 진행 (재접속 정보는 유실)
+            try:
+                async with redis_batch(redis_client) as batch:
+                    queue_remove_from_room(batch, room_id, client_id)
+                    batch.set_disconnected_client(client_id, disconnected_client_data)
+                    if settings.cluster_mode:
+                        batch.release_client(client_id, sid)
+            except RedisError as e:
+                print(f"Redis unavailable while disconnecting {client_id}: {e}")
+            room_cache.discard(room_id, client_id)
+
+            # 방에 있는 다른 클라이언트에게 퇴장 정보 전송
+            # (연결 해제 처리 중에도 socket.io room 에는 남아 있으므로 본인 제외)
+            await emit_to_room(
+                "SC_LEAVE_USER",
+                {"client_id": client_id},
+                room_id,
+                skip_sid=sid,
+            )
+            await emit_to_room(
+                "SC_LEAVE_ROOM",
+                {"client_id": client_id},
+                room_id,
+                skip_sid=sid,
+            )
 
-            # client_view_list 값에서 클라이언트 제거
-            for key, value in client_view_list.items():
-                if client_id in value:
-                    value.remove(client_id)
+            pop_client(client_id)
 
-            # 섹터에서 클라이언트 제거
-            sector_manager.remove_client_from_sector(client_id)
+            # 섹터와 시야 목록에서 클라이언트 제거 (나를 보던 클라이언트에게만 알림)
+            entered, left = remove_client(client_id)
+            await emit_view_events(entered, left, emit_to_client, client_info_store)
+            movement_coalescer.discard(client_id)
+            movement_ticker.discard(client_id)
+            binary_protocol.remove_client(client_id)
+            delta_encoder.reset(client_id)
 
         except Exception as e:
             print(f"Disconnect handler error: {e}")
-
-
-
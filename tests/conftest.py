@@ -0,0 +1,21 @@
+import pytest
+
+from tests.env import apply_test_env
+
+apply_test_env()
+
+
+# 모듈 전역 섹터 인덱스와 시야 목록을 테스트마다 비움
+@pytest.fixture(autouse=True)
+def reset_movement_state():
+    from core import movement
+
+    def clear():
+        movement.sector_registry.rooms.clear()
+        movement.sector_registry.client_rooms.clear()
+        movement.interest_manager.views.clear()
+        movement.interest_manager.viewers.clear()
+
+    clear()
+    yield
+    clear()
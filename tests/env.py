@@ -0,0 +1,33 @@
+import os
+
+# core.config 의 필수 설정값 (테스트에서는 실제 AWS/DB 에 연결하지 않음)
+TEST_ENV = {
+    "SECRET_KEY": "test",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_HOURS": "1",
+    "DB_POOL_SIZE": "1",
+    "DB_MAX_OVERFLOW": "0",
+    "DB_POOL_TIMEOUT": "1",
+    "AWS_REGION": "test",
+    "AWS_ACCESS_KEY_ID": "test",
+    "AWS_SECRET_ACCESS_KEY": "test",
+    "AWS_RDS_DB_NAME": "test",
+    "AWS_RDS_DB_USERNAME": "test",
+    "AWS_RDS_DB_PASSWORD": "test",
+    "AWS_RDS_DB_HOST": "localhost",
+    "AWS_RDS_DB_PORT": "5432",
+    "AWS_ELASTICACHE_ENDPOINT": "localhost",
+    "AWS_ELASTICACHE_PORT": "6379",
+    "ROOMS_KEY_TEMPLATE": "room:{room_id}",
+    "CLIENT_KEY_TEMPLATE": "client:{client_id}",
+    "SID_KEY_TEMPLATE": "sid:{sid}",
+    "DISCONNECTED_CLIENT_KEY_TEMPLATE": "disconnected:{client_id}",
+    "MEETING_ROOM_KEY_TEMPLATE": "meeting_room:{room_id}",
+    "CLIENT_SID_KEY_TEMPLATE": "client_sid:{client_id}",
+}
+
+
+# 설정되지 않은 항목만 채움 (core 모듈을 import 하기 전에 호출)
+def apply_test_env():
+    for name, value in TEST_ENV.items():
+        os.environ.setdefault(name, value)
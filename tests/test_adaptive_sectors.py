@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from core import movement
+from core.movement import AdaptiveSectorManager
+
+
+@pytest.fixture
+def adaptive_registry(monkeypatch):
+    monkeypatch.setattr(
+        movement.sector_registry,
+        "index_factory",
+        lambda: AdaptiveSectorManager(sector_size=300, split_threshold=4, max_depth=3),
+    )
+
+
+def assert_views_match_index(room_id):
+    index = movement.sector_registry.get(room_id)
+    for client_id in index.client_sectors:
+        expected = set(index.get_client_nearby_clients(client_id)) - {client_id}
+        assert movement.interest_manager.get_view(client_id) == expected, client_id
+
+
+def test_crowded_sector_splits_and_shrinks_views(adaptive_registry):
+    for number in range(8):
+        movement.apply_movement(f"c{number}", "r", 10 + number * 35, 10 + number * 35)
+
+    index = movement.sector_registry.get("r")
+    assert index.split_sectors
+    assert_views_match_index("r")
+
+
+def test_remove_client_refreshes_views_after_merge(adaptive_registry):
+    rng = random.Random(7)
+    clients = [f"c{number}" for number in range(20)]
+    for client_id in clients:
+        movement.apply_movement(
+            client_id, "r", rng.randrange(0, 600), rng.randrange(0, 600)
+        )
+    assert movement.sector_registry.get("r").split_sectors
+
+    # 제거로 섹터가 합쳐지면 남은 클라이언트의 시야도 넓어져야 함
+    for client_id in clients[:12]:
+        movement.remove_client(client_id)
+        assert_views_match_index("r")
+
+
+def test_remove_client_reports_entered_views_after_merge(adaptive_registry):
+    # c0~c4 가 몰려 있어 가장 작은 섹터까지 나뉘고, c5 는 c0 의 시야 밖에 있음
+    for number, x in enumerate((5, 15, 25, 35, 45)):
+        movement.apply_movement(f"c{number}", "r", x, 5)
+    movement.apply_movement("c5", "r", 200, 5)
+    assert "c5" not in movement.interest_manager.get_view("c0")
+
+    movement.remove_client("c1")
+    movement.remove_client("c2")
+    entered, left = movement.remove_client("c3")
+
+    # 섹터가 합쳐져 c0 의 시야가 넓어짐
+    assert ("c0", "c5") in entered
+    assert ("c0", "c3") in left
+    assert "c5" in movement.interest_manager.get_view("c0")
+    assert_views_match_index("r")
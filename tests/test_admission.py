@@ -0,0 +1,219 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+from redis.exceptions import ConnectionError
+
+import sockets.sockets as ss
+from core.movement import apply_movement, interest_manager, sector_registry
+from core.redis import CLIENT_OWNER_KEY_TEMPLATE, DISCONNECTED_CLIENT_KEY_TEMPLATE
+
+
+@pytest.fixture(autouse=True)
+def admission_state(monkeypatch):
+    async def fake_get_redis():
+        yield None
+
+    monkeypatch.setattr(ss, "get_redis", fake_get_redis)
+    monkeypatch.setattr(ss.settings, "connection_admission_timeout", 5.0)
+    monkeypatch.setattr(ss, "connection_queue", asyncio.Queue())
+    yield
+    ss.asyncio_event_store.clear()
+    ss.client_info_store.clear()
+    ss.sid_to_client_id.clear()
+
+
+def environ(client_id):
+    return {"QUERY_STRING": f"client_id={client_id}&user_name=tester"}
+
+
+async def connect_with_worker(sid, client_id):
+    ss.connection_queue = asyncio.Queue()
+    worker = asyncio.create_task(ss.admission_worker())
+    try:
+        started = time.perf_counter()
+        result = await ss.connect(sid, environ(client_id))
+        return result, time.perf_counter() - started
+    finally:
+        worker.cancel()
+
+
+def test_connect_admits_new_client(monkeypatch):
+    async def no_disconnected_clients(client_ids, redis_client):
+        return {}
+
+    monkeypatch.setattr(ss, "pop_disconnected_clients", no_disconnected_clients)
+
+    result, _ = asyncio.run(connect_with_worker("sid-1", "c1"))
+
+    assert result is None
+    client = ss.client_info_store["c1"]
+    assert (client.sid, client.position_x, client.position_y) == ("sid-1", 350, 170)
+    assert ss.find_key_by_sid("sid-1") == "c1"
+    assert "sid-1" not in ss.asyncio_event_store
+
+
+def test_connect_rejected_immediately_on_admission_error(monkeypatch):
+    async def redis_down(client_ids, redis_client):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(ss, "pop_disconnected_clients", redis_down)
+
+    result, elapsed = asyncio.run(connect_with_worker("sid-1", "c1"))
+
+    assert result is False
+    assert elapsed < 1.0
+    assert "c1" not in ss.client_info_store
+    assert ss.find_key_by_sid("sid-1") is None
+    assert "sid-1" not in ss.asyncio_event_store
+
+
+def test_superseded_request_is_rejected_without_waiting():
+    async def scenario():
+        ss.client_info_store["c1"] = ss.client_info("sid-new")
+        ss.bind_sid("c1", "sid-new")
+        future = asyncio.get_running_loop().create_future()
+        ss.asyncio_event_store["sid-old"] = future
+
+        await ss.admit_connections(
+            [{"sid": "sid-old", "client_id": "c1", "user_name": "tester"}], None
+        )
+        return future.result()
+
+    assert asyncio.run(scenario()) is False
+    assert ss.client_info_store["c1"].sid == "sid-new"
+
+
+def test_duplicate_connection_joins_previous_room(monkeypatch):
+    async def no_disconnected_clients(client_ids, redis_client):
+        return {}
+
+    emitted, disconnected, entered = [], [], []
+
+    async def fake_emit(event, data=None, to=None, **kwargs):
+        emitted.append((event, to))
+
+    async def fake_disconnect(sid, **kwargs):
+        disconnected.append(sid)
+
+    monkeypatch.setattr(ss, "pop_disconnected_clients", no_disconnected_clients)
+    monkeypatch.setattr(ss.sio_server, "emit", fake_emit)
+    monkeypatch.setattr(ss.sio_server, "disconnect", fake_disconnect)
+    monkeypatch.setattr(
+        ss.sio_server,
+        "enter_room",
+        lambda sid, room, **kwargs: entered.append((sid, room)),
+    )
+
+    ss.client_info_store["c1"] = ss.client_info("sid-old")
+    ss.bind_sid("c1", "sid-old")
+    ss.client_info_store["c1"].room_id = "r1"
+
+    result, _ = asyncio.run(connect_with_worker("sid-new", "c1"))
+
+    assert result is None
+    assert emitted == [("SC_DUPLICATE_CONNECTION", "sid-old")]
+    assert disconnected == ["sid-old"]
+    assert entered == [("sid-new", ss.sio_room("r1"))]
+    assert ss.find_key_by_sid("sid-new") == "c1"
+
+
+def test_rejected_takeover_cleans_up_previous_state(monkeypatch):
+    redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    async def fake_get_redis():
+        yield redis_client
+
+    async def redis_down(client_ids, redis_client):
+        raise ConnectionError("redis down")
+
+    room_events, view_events = [], []
+
+    async def fake_emit_to_room(event, data, room_id, skip_sid=None):
+        room_events.append((event, data["client_id"], room_id))
+
+    async def fake_emit_to_client(target_client, packet, event="SC_MOVEMENT_INFO"):
+        view_events.append((target_client, event, packet["client_id"]))
+
+    async def no_op(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(ss, "get_redis", fake_get_redis)
+    monkeypatch.setattr(ss, "pop_disconnected_clients", redis_down)
+    monkeypatch.setattr(ss, "emit_to_room", fake_emit_to_room)
+    monkeypatch.setattr(ss, "emit_to_client", fake_emit_to_client)
+    monkeypatch.setattr(ss.sio_server, "emit", no_op)
+    monkeypatch.setattr(ss.sio_server, "disconnect", no_op)
+    monkeypatch.setattr(ss.sio_server, "enter_room", lambda *args, **kwargs: None)
+
+    for client_id, sid in (("c1", "sid-old"), ("c2", "sid-2")):
+        ss.client_info_store[client_id] = ss.client_info(sid)
+        ss.bind_sid(client_id, sid)
+        ss.client_info_store[client_id].room_id = "r1"
+        ss.client_info_store[client_id].set_position(100, 100, 1)
+        apply_movement(client_id, "r1", 100, 100)
+    asyncio.run(redis_client.sadd("room:r1", "c1", "c2"))
+    assert "c1" in interest_manager.get_view("c2")
+
+    result, _ = asyncio.run(connect_with_worker("sid-new", "c1"))
+
+    assert result is False
+    assert "c1" not in ss.client_info_store
+    assert ss.find_key_by_sid("sid-new") is None
+    assert "c1" not in sector_registry.client_rooms
+    assert "c1" not in interest_manager.get_view("c2")
+    assert ("SC_LEAVE_USER", "c1", "r1") in room_events
+    assert ("c2", "SC_LEAVE_VIEW", "c1") in view_events
+    assert asyncio.run(redis_client.smembers("room:r1")) == {"c2"}
+
+
+def test_disconnect_writes_redis_state_in_one_transaction(monkeypatch):
+    redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    pipelines = []
+    pipeline = redis_client.pipeline
+
+    def recording_pipeline(transaction=True):
+        pipelines.append(transaction)
+        return pipeline(transaction=transaction)
+
+    async def fake_get_redis():
+        yield redis_client
+
+    async def no_op(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(redis_client, "pipeline", recording_pipeline)
+    monkeypatch.setattr(ss, "get_redis", fake_get_redis)
+    monkeypatch.setattr(ss, "emit_to_room", no_op)
+    monkeypatch.setattr(ss.settings, "cluster_mode", True)
+
+    ss.client_info_store["c1"] = ss.client_info("sid-1")
+    ss.bind_sid("c1", "sid-1")
+    ss.client_info_store["c1"].room_id = "r1"
+    ss.client_info_store["c1"].set_position(100, 200, 1)
+    apply_movement("c1", "r1", 100, 200)
+
+    async def scenario():
+        await redis_client.sadd("room:r1", "c1", "c2")
+        await redis_client.hset(
+            CLIENT_OWNER_KEY_TEMPLATE.format(client_id="c1"),
+            mapping={"node_id": ss.NODE_ID, "sid": "sid-1"},
+        )
+        await ss.disconnect_client("sid-1")
+        return (
+            await redis_client.smembers("room:r1"),
+            await redis_client.hgetall(
+                DISCONNECTED_CLIENT_KEY_TEMPLATE.format(client_id="c1")
+            ),
+            await redis_client.exists(CLIENT_OWNER_KEY_TEMPLATE.format(client_id="c1")),
+        )
+
+    members, disconnected, owned = asyncio.run(scenario())
+
+    assert pipelines == [True]
+    assert members == {"c2"}
+    assert disconnected["position_x"] == "100"
+    assert disconnected["position_y"] == "200"
+    assert owned == 0
+    assert "c1" not in ss.client_info_store
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+import sockets.sockets as ss
+from core.broadcast import Broadcaster
+
+
+class FakeSocket:
+    closed = False
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, packet):
+        self.sent.append(packet.data)
+
+
+@pytest.fixture
+def room():
+    server = ss.sio_server
+    sids = []
+    for number in range(3):
+        eio_sid = f"eio-test-{number}"
+        server.eio.sockets[eio_sid] = FakeSocket()
+        sid = server.manager.connect(eio_sid, "/")
+        server.enter_room(sid, "test-room")
+        sids.append((sid, eio_sid))
+    yield sids
+
+    async def disconnect_all():
+        for sid, _ in sids:
+            await server.manager.disconnect(sid, "/")
+
+    asyncio.run(disconnect_all())
+    for _, eio_sid in sids:
+        server.eio.sockets.pop(eio_sid, None)
+
+
+def sent_frames(sids):
+    frames = [list(ss.sio_server.eio.sockets[eio_sid].sent) for _, eio_sid in sids]
+    for _, eio_sid in sids:
+        ss.sio_server.eio.sockets[eio_sid].sent.clear()
+    return frames
+
+
+def make_broadcaster(max_entries=8, max_bytes=1000):
+    broadcaster = Broadcaster(max_entries=max_entries, max_bytes=max_bytes, local=True)
+    broadcaster.configure(ss.sio_server)
+    return broadcaster
+
+
+def test_room_emit_matches_socketio_and_is_not_cached(room):
+    broadcaster = make_broadcaster()
+    data = {"client_id": "c1", "message": "hi"}
+
+    async def scenario():
+        await ss.sio_server.emit("SC_CHAT", data, room="test-room", skip_sid=room[0][0])
+        expected = sent_frames(room)
+        await broadcaster.emit("SC_CHAT", data, room="test-room", skip_sid=room[0][0])
+        return expected, sent_frames(room)
+
+    expected, actual = asyncio.run(scenario())
+
+    assert actual == expected
+    assert actual[0] == [] and len(actual[1]) == 1
+    assert broadcaster.stats()["size"] == 0
+
+
+def test_send_reuses_encoding_for_same_object(room):
+    broadcaster = make_broadcaster()
+    data = {"client_id": "c1", "position_x": 1, "position_y": 2}
+
+    async def scenario():
+        for sid, _ in room:
+            await broadcaster.send(sid, "SC_MOVEMENT_INFO", data)
+        return sent_frames(room)
+
+    frames = asyncio.run(scenario())
+
+    assert frames[0] == frames[1] == frames[2]
+    assert broadcaster.stats()["hits"] == 2
+    assert broadcaster.stats()["misses"] == 1
+
+
+def test_send_cache_bounded_by_bytes(room):
+    broadcaster = make_broadcaster(max_entries=100, max_bytes=200)
+    sid = room[0][0]
+
+    async def scenario():
+        for number in range(20):
+            await broadcaster.send(
+                sid, "SC_MOVEMENT_INFO", {"n": number, "pad": "x" * 30}
+            )
+        await broadcaster.send(sid, "SC_PICTURE_INFO", {"picture": "x" * 500})
+
+    asyncio.run(scenario())
+
+    stats = broadcaster.stats()
+    assert 0 < stats["bytes"] <= 200
+    assert stats["size"] < 20
+    assert all(key[0] != "SC_PICTURE_INFO" for key in broadcaster.entries)
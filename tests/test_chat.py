@@ -0,0 +1,196 @@
+import asyncio
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+
+import core.chat as chat
+import sockets.sockets as ss
+
+
+class StopWriter(BaseException):
+    pass
+
+
+def test_writer_retries_table_creation(monkeypatch):
+    attempts = []
+
+    def create_all(engine, tables):
+        attempts.append(tables)
+        if len(attempts) < 3:
+            raise ConnectionRefusedError("database starting")
+
+    async def stop_at_redis():
+        raise StopWriter()
+        yield
+
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(
+        chat,
+        "SQLModel",
+        SimpleNamespace(metadata=SimpleNamespace(create_all=create_all)),
+    )
+    monkeypatch.setattr(chat, "get_redis", stop_at_redis)
+    monkeypatch.setattr(chat.asyncio, "sleep", no_sleep)
+    writer = chat.ChatHistoryWriter("group", "consumer", 10, 0.01, 60.0)
+
+    with pytest.raises(StopWriter):
+        asyncio.run(writer.run())
+
+    assert len(attempts) == 3
+    assert writer.errors == 2
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+def test_full_outbox_refuses_append_without_trimming(monkeypatch, redis_client):
+    monkeypatch.setattr(chat.settings, "chat_outbox_maxlen", 3)
+    refused_before = chat.chat_outbox_full.values.get((), 0)
+
+    async def scenario():
+        ids = [
+            await chat.append_chat_message("r1", "c1", "user", f"m{i}", redis_client)
+            for i in range(5)
+        ]
+        return (
+            ids,
+            await redis_client.xlen(chat.CHAT_OUTBOX_KEY),
+            await redis_client.xlen("chat:r1"),
+        )
+
+    ids, outbox_length, room_length = asyncio.run(scenario())
+
+    assert all(ids[:3]) and ids[3:] == [None, None]
+    assert (outbox_length, room_length) == (3, 3)
+    assert chat.chat_outbox_full.values[()] - refused_before == 2
+
+
+def test_flush_saves_rows_and_counts_deleted_entries(monkeypatch, redis_client):
+    saved = []
+    monkeypatch.setattr(chat, "insert_chat_messages", saved.extend)
+    writer = chat.ChatHistoryWriter("group", "consumer", 10, 0.01, 60.0)
+
+    async def scenario():
+        await writer.ensure_group(redis_client)
+        for i in range(3):
+            await chat.append_chat_message("r1", "c1", "user", f"m{i}", redis_client)
+        entries = await writer.read(">", redis_client)
+        await writer.flush(entries + [("0-1", {})], redis_client)
+        return await redis_client.xlen(chat.CHAT_OUTBOX_KEY)
+
+    remaining = asyncio.run(scenario())
+
+    assert [row["message"] for row in saved] == ["m0", "m1", "m2"]
+    assert remaining == 0
+    assert writer.stats()["skipped"] == 1
+    assert writer.stats()["flushed"] == 3
+
+
+def test_entry_that_keeps_failing_moves_to_dead_letter(monkeypatch, redis_client):
+    saved = []
+    monkeypatch.setattr(chat, "insert_chat_messages", saved.extend)
+    writer = chat.ChatHistoryWriter(
+        "group", "consumer", 10, 0.01, 60.0, max_deliveries=3
+    )
+
+    async def scenario():
+        await writer.ensure_group(redis_client)
+        await chat.append_chat_message("r1", "c1", "user", "m0", redis_client)
+        bad_id = await redis_client.xadd(chat.CHAT_OUTBOX_KEY, {"room_id": "r1"})
+        await chat.append_chat_message("r1", "c1", "user", "m1", redis_client)
+
+        entries = await writer.read(">", redis_client)
+        with pytest.raises(KeyError):
+            await writer.flush(entries, redis_client)
+
+        failures = 0
+        while True:
+            try:
+                while entries := await writer.read("0", redis_client):
+                    await writer.flush_redelivered(entries, redis_client)
+                break
+            except KeyError:
+                failures += 1
+        dead = await redis_client.xrange(chat.CHAT_DEAD_LETTER_KEY)
+        return bad_id, failures, dead, await redis_client.xlen(chat.CHAT_OUTBOX_KEY)
+
+    bad_id, failures, dead, remaining = asyncio.run(scenario())
+
+    assert failures == 1
+    assert [row["message"] for row in saved] == ["m0", "m1"]
+    assert len(dead) == 1 and dead[0][1]["entry_id"] == bad_id
+    assert remaining == 0
+    assert writer.stats()["dead_lettered"] == 1
+
+
+def test_history_continues_from_db_after_stream_trim(monkeypatch, redis_client):
+    async def write_messages():
+        return [
+            await chat.append_chat_message("r1", "c1", "user", f"m{i}", redis_client)
+            for i in range(7)
+        ]
+
+    message_ids = asyncio.run(write_messages())
+    # 오래된 메시지는 스트림에서 잘려 나가고 DB 에만 남음
+    asyncio.run(redis_client.xtrim("chat:r1", maxlen=3))
+    db_rows = [
+        {
+            "message_id": message_id,
+            "client_id": "c1",
+            "user_name": "user",
+            "message": f"m{i}",
+            "ts": 0,
+        }
+        for i, message_id in enumerate(message_ids)
+    ]
+
+    def fake_db_history(room_id, before, limit):
+        rows = [
+            row
+            for row in reversed(db_rows)
+            if before is None
+            or chat.parse_message_id(row["message_id"]) < chat.parse_message_id(before)
+        ]
+        return rows[:limit]
+
+    monkeypatch.setattr(chat, "get_db_history", fake_db_history)
+
+    first = asyncio.run(chat.get_chat_history("r1", None, 5, redis_client))
+    second = asyncio.run(
+        chat.get_chat_history("r1", first["next_before"], 5, redis_client)
+    )
+
+    assert [m["message"] for m in first["messages"]] == ["m2", "m3", "m4", "m5", "m6"]
+    assert first["next_before"] == message_ids[2]
+    assert [m["message"] for m in second["messages"]] == ["m0", "m1"]
+    assert second["next_before"] is None
+
+
+def test_chat_outside_room_is_ignored(monkeypatch, redis_client):
+    sent = []
+
+    async def fake_get_redis():
+        yield redis_client
+
+    async def fake_emit_to_room(event, data, room_id, skip_sid=None):
+        sent.append((event, room_id))
+
+    monkeypatch.setattr(ss, "get_redis", fake_get_redis)
+    monkeypatch.setattr(ss, "emit_to_room", fake_emit_to_room)
+    monkeypatch.setattr(ss.settings, "chat_history_enabled", True)
+    ss.client_info_store["c1"] = ss.client_info("sid-1")
+    ss.bind_sid("c1", "sid-1")
+
+    try:
+        asyncio.run(ss.CS_CHAT("sid-1", {"client_id": "c1", "message": "hi"}))
+    finally:
+        ss.client_info_store.clear()
+        ss.sid_to_client_id.clear()
+
+    assert sent == []
+    assert asyncio.run(redis_client.keys("*")) == []
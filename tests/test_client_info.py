@@ -0,0 +1,37 @@
+import pytest
+
+from core.movement import MAX_COORDINATE
+from sockets.sockets import client_info
+
+
+def test_set_position_normalizes_to_ints():
+    client = client_info("sid")
+    assert client.set_position("12.7", 30.2, "3")
+    assert (client.position_x, client.position_y, client.direction) == (12, 30, 3)
+    assert not hasattr(client, "__dict__")
+
+
+@pytest.mark.parametrize(
+    "position_x, position_y, direction",
+    [
+        (None, 1, 1),
+        ("abc", 1, 1),
+        ("NaN", 1, 1),
+        ("Infinity", 1, 1),
+        (1, float("-inf"), 1),
+        (10**12, 1, 1),
+        (1, -(MAX_COORDINATE + 1), 1),
+        (1, 1, 128),
+        (1, 1, "1e400"),
+    ],
+)
+def test_set_position_rejects_invalid_values(position_x, position_y, direction):
+    client = client_info("sid")
+    client.set_position(1, 2, 3)
+    assert not client.set_position(position_x, position_y, direction)
+    assert (client.position_x, client.position_y, client.direction) == (1, 2, 3)
+
+
+def test_set_position_accepts_limits():
+    client = client_info("sid")
+    assert client.set_position(MAX_COORDINATE, -MAX_COORDINATE, -128)
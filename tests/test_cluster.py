@@ -0,0 +1,166 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+import sockets.sockets as ss
+from core.redis import (
+    claim_client,
+    claim_room,
+    claim_rooms,
+    get_node_address,
+    release_client,
+    set_node_address,
+)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+def test_claim_client_returns_previous_owner(redis_client):
+    async def scenario():
+        first = await claim_client("c1", "sid-1", "node-a", redis_client)
+        second = await claim_client("c1", "sid-2", "node-b", redis_client)
+        return first, second, await redis_client.hgetall("client_owner:c1")
+
+    first, second, owner = run(scenario())
+
+    assert first is None
+    assert second == {"node_id": "node-a", "sid": "sid-1"}
+    assert owner == {"node_id": "node-b", "sid": "sid-2"}
+
+
+def test_release_client_keeps_newer_owner(redis_client):
+    async def scenario():
+        await claim_client("c1", "sid-1", "node-a", redis_client)
+        await claim_client("c1", "sid-2", "node-b", redis_client)
+        await release_client("c1", "sid-1", redis_client)
+        kept = await redis_client.hgetall("client_owner:c1")
+        await release_client("c1", "sid-2", redis_client)
+        return kept, await redis_client.exists("client_owner:c1")
+
+    kept, exists = run(scenario())
+
+    assert kept == {"node_id": "node-b", "sid": "sid-2"}
+    assert exists == 0
+
+
+def test_claim_room_is_exclusive_until_expiry(redis_client):
+    async def scenario():
+        first = await claim_room("r1", "node-a", 30, redis_client)
+        other = await claim_room("r1", "node-b", 30, redis_client)
+        again = await claim_room("r1", "node-a", 30, redis_client)
+        ttl = await redis_client.ttl("room_owner:r1")
+        await redis_client.delete("room_owner:r1")
+        after_expiry = await claim_room("r1", "node-b", 30, redis_client)
+        return first, other, again, ttl, after_expiry
+
+    first, other, again, ttl, after_expiry = run(scenario())
+
+    assert (first, other, again) == ("node-a", "node-a", "node-a")
+    assert 0 < ttl <= 30
+    assert after_expiry == "node-b"
+
+
+def test_claim_rooms_reports_each_owner(redis_client):
+    async def scenario():
+        await claim_room("r2", "node-b", 30, redis_client)
+        return await claim_rooms(["r1", "r2"], "node-a", 30, redis_client)
+
+    assert run(scenario()) == {"r1": "node-a", "r2": "node-b"}
+
+
+@pytest.fixture
+def cluster_node(monkeypatch, redis_client):
+    emitted, entered = [], []
+
+    async def fake_get_redis():
+        yield redis_client
+
+    async def fake_emit(event, data=None, to=None, **kwargs):
+        emitted.append((event, data, to))
+
+    monkeypatch.setattr(ss, "get_redis", fake_get_redis)
+    monkeypatch.setattr(ss.settings, "cluster_mode", True)
+    monkeypatch.setattr(ss.sio_server, "emit", fake_emit)
+    monkeypatch.setattr(
+        ss.sio_server,
+        "enter_room",
+        lambda sid, room, **kwargs: entered.append((sid, room)),
+    )
+    ss.client_info_store["c1"] = ss.client_info("sid-1")
+    ss.bind_sid("c1", "sid-1")
+    yield emitted, entered
+    ss.client_info_store.clear()
+    ss.sid_to_client_id.clear()
+
+
+def join_room(redis_client):
+    async def scenario():
+        await claim_room("r1", "other-node", 30, redis_client)
+        await ss.CS_JOIN_ROOM(
+            "sid-1", {"client_id": "c1", "room_type": "lobby", "room_id": "r1"}
+        )
+        return await redis_client.smembers("room:r1")
+
+    return run(scenario())
+
+
+def test_join_room_owned_by_other_node_is_redirected(cluster_node, redis_client):
+    emitted, entered = cluster_node
+    run(set_node_address("other-node", "wss://node-2.example.com", 30, redis_client))
+
+    members = join_room(redis_client)
+
+    assert emitted == [
+        (
+            "SC_ROOM_REDIRECT",
+            {
+                "room_id": "r1",
+                "node_id": "other-node",
+                "address": "wss://node-2.example.com",
+            },
+            "sid-1",
+        )
+    ]
+    assert entered == []
+    assert members == set()
+
+
+def test_join_room_owned_by_node_without_address_is_admitted(
+    cluster_node, redis_client
+):
+    emitted, entered = cluster_node
+
+    members = join_room(redis_client)
+
+    assert emitted == []
+    assert entered == [("sid-1", ss.sio_room("r1"))]
+    assert members == {"c1"}
+
+
+def test_ownership_refresh_publishes_address_and_extends_rooms(
+    monkeypatch, cluster_node, redis_client
+):
+    monkeypatch.setattr(ss.settings, "node_address", "wss://node-1.example.com")
+    ss.client_info_store["c1"].room_id = "r1"
+
+    async def scenario():
+        await ss.refresh_room_ownership()
+        return (
+            await get_node_address(ss.NODE_ID, redis_client),
+            await redis_client.get("room_owner:r1"),
+            await redis_client.ttl("node_address:" + ss.NODE_ID),
+        )
+
+    address, owner, ttl = run(scenario())
+
+    assert address == "wss://node-1.example.com"
+    assert owner == ss.NODE_ID
+    assert 0 < ttl <= ss.settings.room_owner_ttl
@@ -0,0 +1,70 @@
+from core.metrics import MetricsRegistry
+
+
+def test_counter_and_gauge_render_with_escaped_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events", ("event",))
+    counter.inc(("CS_CHAT",))
+    counter.inc(("CS_CHAT",), 2)
+    counter.inc(('say "hi"',))
+    registry.gauge("queue_depth", "Queue depth", lambda: 7)
+
+    lines = registry.render().splitlines()
+
+    assert lines == [
+        "# HELP events_total Events",
+        "# TYPE events_total counter",
+        'events_total{event="CS_CHAT"} 3',
+        'events_total{event="say \\"hi\\""} 1',
+        "# HELP queue_depth Queue depth",
+        "# TYPE queue_depth gauge",
+        "queue_depth 7",
+    ]
+
+
+def test_histogram_buckets_are_cumulative_with_inf():
+    registry = MetricsRegistry()
+    histogram = registry.histogram(
+        "latency_seconds", "Latency", ("op",), buckets=(0.1, 1.0)
+    )
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, ("get",))
+
+    lines = registry.render().splitlines()
+
+    assert lines == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        # 구간 경계값은 해당 구간에 포함 (le 는 이하)
+        'latency_seconds_bucket{op="get",le="0.1"} 2',
+        'latency_seconds_bucket{op="get",le="1.0"} 3',
+        'latency_seconds_bucket{op="get",le="+Inf"} 4',
+        'latency_seconds_sum{op="get"} 3.65',
+        'latency_seconds_count{op="get"} 4',
+    ]
+
+
+def test_stats_sources_flattened_and_failures_skipped():
+    registry = MetricsRegistry()
+
+    def broken():
+        raise RuntimeError("boom")
+
+    registry.gauge("broken_gauge", "Broken", broken)
+    registry.register_stats(
+        "pool",
+        "Pool",
+        lambda: {"size": 4, "ready": True, "state": "open", "inner": {"waits": 1}},
+    )
+    registry.register_stats("broken", "Broken", broken)
+
+    lines = registry.render().splitlines()
+
+    assert "broken_gauge" not in "\n".join(lines)
+    assert [line for line in lines if not line.startswith("#")] == [
+        "pool_size 4",
+        "pool_ready 1",
+        'pool_state{value="open"} 1',
+        "pool_inner_waits 1",
+    ]
+    assert "# TYPE pool_inner_waits gauge" in lines
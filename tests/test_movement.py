@@ -0,0 +1,234 @@
+import asyncio
+
+from core import movement
+
+
+class Client:
+    def __init__(self, room_id, x, y, direction=1):
+        self.sid = None
+        self.user_name = "user"
+        self.room_id = room_id
+        self.position_x = x
+        self.position_y = y
+        self.direction = direction
+
+
+def test_apply_movement_builds_symmetric_views():
+    movement.apply_movement("a", "r", 10, 10)
+    entered, left = movement.apply_movement("b", "r", 20, 20)
+
+    assert set(entered) == {("b", "a"), ("a", "b")}
+    assert left == []
+    # 본인은 시야에 포함하지 않음
+    assert movement.interest_manager.get_view("a") == {"b"}
+    assert movement.interest_manager.get_viewers("a") == {"b"}
+
+
+def test_apply_movement_within_sector_produces_no_events():
+    movement.apply_movement("a", "r", 10, 10)
+    assert movement.apply_movement("a", "r", 20, 20) == ([], [])
+
+
+def test_leaving_range_emits_leave_for_both_sides():
+    movement.apply_movement("a", "r", 10, 10)
+    movement.apply_movement("b", "r", 20, 20)
+    entered, left = movement.apply_movement("b", "r", 2000, 2000)
+
+    assert ("b", "a") in left and ("a", "b") in left
+    assert "b" not in movement.interest_manager.get_view("a")
+
+
+def test_changing_rooms_leaves_old_room_views():
+    movement.apply_movement("a", "r1", 10, 10)
+    movement.apply_movement("b", "r1", 10, 10)
+    entered, left = movement.apply_movement("b", "r2", 10, 10)
+
+    assert ("a", "b") in left
+    assert movement.interest_manager.get_view("a") == set()
+    assert movement.sector_registry.client_rooms["b"] == "r2"
+
+
+def test_remove_client_clears_index_and_views():
+    movement.apply_movement("a", "r", 10, 10)
+    movement.apply_movement("b", "r", 10, 10)
+    entered, left = movement.remove_client("b")
+
+    assert entered == []
+    assert left == [("a", "b")]
+    assert "b" not in movement.sector_registry.client_rooms
+    assert movement.interest_manager.get_view("a") == set()
+    assert movement.interest_manager.get_view("b") == set()
+
+
+def test_handle_view_list_update_emits_enter_events():
+    store = {"a": Client("r", 10, 10), "b": Client("r", 20, 20)}
+    sent = []
+
+    async def emit(target, packet, event="SC_MOVEMENT_INFO"):
+        sent.append((target, event, packet["client_id"]))
+
+    async def run():
+        await movement.handle_view_list_update(None, {"client_id": "a"}, emit, store)
+        await movement.handle_view_list_update(None, {"client_id": "b"}, emit, store)
+
+    asyncio.run(run())
+    assert ("a", "SC_ENTER_VIEW", "b") in sent
+    assert ("b", "SC_ENTER_VIEW", "a") in sent
+
+
+def test_update_movement_sends_to_viewers_only():
+    store = {
+        "a": Client("r", 10, 10),
+        "b": Client("r", 20, 20),
+        "far": Client("r", 5000, 5000),
+    }
+    for client_id, client in store.items():
+        movement.apply_movement(client_id, "r", client.position_x, client.position_y)
+    sent = []
+
+    async def emit(target, packet, event="SC_MOVEMENT_INFO"):
+        sent.append((target, packet["client_id"]))
+
+    asyncio.run(movement.update_movement(None, {"client_id": "a"}, emit, store))
+    assert sent == [("b", "a")]
+
+
+def test_ticker_sends_one_batch_per_recipient_per_tick():
+    store = {
+        "a": Client("r", 10, 10),
+        "b": Client("r", 20, 20),
+        "c": Client("r", 30, 30),
+        "far": Client("r", 5000, 5000),
+    }
+    for client_id, client in store.items():
+        movement.apply_movement(client_id, "r", client.position_x, client.position_y)
+    ticker = movement.MovementTicker(tick_rate=10)
+    batches = []
+
+    async def emit(target, packet, event="SC_MOVEMENT_INFO"):
+        pass
+
+    async def emit_batch(target, packets):
+        batches.append((target, sorted(packet["client_id"] for packet in packets)))
+
+    ticker.submit("a", {"client_id": "a"})
+    store["a"].position_x = 15
+    ticker.submit("a", {"client_id": "a"})
+    ticker.submit("b", {"client_id": "b"})
+
+    asyncio.run(ticker.tick(emit, emit_batch, store))
+
+    assert sorted(batches) == [("a", ["b"]), ("b", ["a"]), ("c", ["a", "b"])]
+    assert ticker.stats() == {"received": 3, "coalesced": 1}
+    assert ticker.pending == {}
+
+    batches.clear()
+    asyncio.run(ticker.tick(emit, emit_batch, store))
+    assert batches == []
+
+
+def test_ticker_skips_discarded_and_unknown_clients():
+    store = {"a": Client("r", 10, 10), "b": Client("r", 20, 20)}
+    for client_id, client in store.items():
+        movement.apply_movement(client_id, "r", client.position_x, client.position_y)
+    ticker = movement.MovementTicker(tick_rate=10)
+    batches = []
+
+    async def emit(target, packet, event="SC_MOVEMENT_INFO"):
+        pass
+
+    async def emit_batch(target, packets):
+        batches.append(target)
+
+    ticker.submit("a", {"client_id": "a"})
+    ticker.submit("gone", {"client_id": "gone"})
+    ticker.discard("a")
+
+    asyncio.run(ticker.tick(emit, emit_batch, store))
+    assert batches == []
+
+
+def test_coalescer_processes_latest_packet_at_capped_rate():
+    coalescer = movement.MovementCoalescer(max_rate=20)
+    processed = []
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+
+        async def process(data):
+            processed.append((data["n"], loop.time()))
+            await asyncio.sleep(0.01)
+
+        first = asyncio.create_task(coalescer.submit("a", {"n": 0}, process))
+        await asyncio.sleep(0)
+        for number in (1, 2, 3):
+            await coalescer.submit("a", {"n": number}, process)
+        await first
+
+    asyncio.run(scenario())
+
+    assert [number for number, _ in processed] == [0, 3]
+    assert processed[1][1] - processed[0][1] >= 0.05 - 1e-3
+    assert coalescer.stats() == {"received": 4, "processed": 2, "coalesced": 2}
+    assert coalescer.active == set()
+
+
+def test_coalescer_discard_drops_pending_packet():
+    coalescer = movement.MovementCoalescer(max_rate=20)
+    processed = []
+
+    async def scenario():
+        async def process(data):
+            processed.append(data["n"])
+            await asyncio.sleep(0.01)
+
+        first = asyncio.create_task(coalescer.submit("a", {"n": 0}, process))
+        await asyncio.sleep(0)
+        await coalescer.submit("a", {"n": 1}, process)
+        coalescer.discard("a")
+        await first
+
+    asyncio.run(scenario())
+
+    assert processed == [0]
+
+
+def test_room_snapshot_lists_self_and_known_members():
+    store = {
+        "a": Client("r", 10, 10),
+        "b": Client("r", 20, 30, direction=2),
+        "far": Client("r", 5000, 5000),
+    }
+
+    snapshot = movement.build_room_snapshot(
+        "a", "r", ["a", "b", "far", "other-node"], store
+    )
+
+    assert snapshot["room_id"] == "r"
+    assert snapshot["client"] == {
+        "client_id": "a",
+        "position_x": 10,
+        "position_y": 10,
+        "direction": 1,
+        "user_name": "user",
+    }
+    # 본인과 이 노드에 상태가 없는 클라이언트는 목록에서 제외
+    assert [packet["client_id"] for packet in snapshot["clients"]] == ["b", "far"]
+    assert snapshot["clients"][0]["direction"] == 2
+
+
+def test_room_snapshot_limits_large_rooms_to_nearby_clients():
+    store = {
+        "a": Client("r", 10, 10),
+        "b": Client("r", 20, 20),
+        "far": Client("r", 5000, 5000),
+    }
+    for client_id, client in store.items():
+        movement.apply_movement(client_id, "r", client.position_x, client.position_y)
+    members = ["a", "b", "far"]
+
+    limited = movement.build_room_snapshot("a", "r", members, store, max_clients=2)
+    unlimited = movement.build_room_snapshot("a", "r", members, store, max_clients=3)
+
+    assert [packet["client_id"] for packet in limited["clients"]] == ["b"]
+    assert [packet["client_id"] for packet in unlimited["clients"]] == ["b", "far"]
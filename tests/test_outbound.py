@@ -0,0 +1,186 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import fakeredis
+
+import sockets.sockets as ss
+from core.outbound import MOVEMENT, OutboundManager
+from core.redis import RedisBatch
+
+
+def make_manager(sent):
+    manager = OutboundManager(
+        max_size=8, high_water=16, slow_timeout=1.0, max_reliable=8
+    )
+
+    async def send(sid, event, data):
+        sent.append((sid, event, data))
+
+    async def no_op(sid):
+        pass
+
+    manager.configure(send=send, backlog=lambda sid: 0, disconnect=no_op, resync=no_op)
+    return manager
+
+
+def test_send_to_unopened_sid_is_discarded():
+    sent = []
+
+    async def scenario():
+        manager = make_manager(sent)
+        manager.send("sid-1", "SC_CHAT", {"message": "hi"})
+        await asyncio.sleep(0)
+        return manager
+
+    manager = asyncio.run(scenario())
+
+    assert sent == []
+    assert manager.queues == {}
+    assert manager.stats()["discarded"] == 1
+
+
+def test_open_send_close():
+    sent = []
+
+    async def scenario():
+        manager = make_manager(sent)
+        manager.open("sid-1")
+        manager.send("sid-1", "SC_CHAT", {"message": "hi"})
+        manager.send("sid-1", "SC_MOVEMENT_INFO", {"x": 1}, MOVEMENT, key="c2")
+        manager.send("sid-1", "SC_MOVEMENT_INFO", {"x": 2}, MOVEMENT, key="c2")
+        await asyncio.sleep(0.01)
+        task = manager.queues["sid-1"].task
+
+        manager.close("sid-1")
+        manager.send("sid-1", "SC_CHAT", {"message": "late"})
+        await asyncio.sleep(0.01)
+        return manager, task
+
+    manager, task = asyncio.run(scenario())
+
+    assert sent == [
+        ("sid-1", "SC_CHAT", {"message": "hi"}),
+        ("sid-1", "SC_MOVEMENT_INFO", {"x": 2}),
+    ]
+    assert task.cancelled()
+    assert manager.queues == {}
+    assert manager.stats()["discarded"] == 1
+
+
+def test_disconnect_closes_queue_after_cleanup(monkeypatch):
+    redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    async def fake_get_redis():
+        yield redis_client
+
+    # 연결 해제 처리 중 Redis 를 기다리는 동안 다른 핸들러가 이 sid 로 전송
+    @asynccontextmanager
+    async def batch_with_concurrent_send(client, transaction=True):
+        yield RedisBatch(client, transaction=transaction)
+        await ss.send_to_sid("sid-1", "SC_CHAT", {"message": "during disconnect"})
+        await asyncio.sleep(0)
+
+    async def no_room_emit(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(ss, "get_redis", fake_get_redis)
+    monkeypatch.setattr(ss, "redis_batch", batch_with_concurrent_send)
+    monkeypatch.setattr(ss, "emit_to_room", no_room_emit)
+
+    ss.client_info_store["c1"] = ss.client_info("sid-1")
+    ss.bind_sid("c1", "sid-1")
+    ss.client_info_store["c1"].room_id = "r1"
+
+    async def scenario():
+        ss.outbound.open("sid-1")
+        task = ss.outbound.queues["sid-1"].task
+        await ss.disconnect("sid-1")
+        await ss.send_to_sid("sid-1", "SC_CHAT", {"message": "after disconnect"})
+        await asyncio.sleep(0)
+        return task
+
+    try:
+        task = asyncio.run(scenario())
+    finally:
+        ss.client_info_store.clear()
+        ss.sid_to_client_id.clear()
+
+    assert "sid-1" not in ss.outbound.queues
+    assert task.cancelled()
+
+
+class FakeSocket:
+    closed = False
+
+    def __init__(self):
+        self.sent = []
+        self.queue = asyncio.Queue()
+
+    async def send(self, packet):
+        self.sent.append(packet.data)
+
+
+def test_room_event_sent_after_earlier_queued_movement():
+    server = ss.sio_server
+    socket = server.eio.sockets["eio-order"] = FakeSocket()
+
+    async def scenario():
+        sid = server.manager.connect("eio-order", "/")
+        server.enter_room(sid, ss.sio_room("r1"))
+        ss.outbound.open(sid)
+        try:
+            ss.outbound.send(
+                sid, "SC_MOVEMENT_INFO", {"client_id": "c2"}, MOVEMENT, key="c2"
+            )
+            await ss.emit_to_room(
+                "SC_LEAVE_USER", {"client_id": "c2"}, "r1", skip_sid="sid-c2"
+            )
+            await asyncio.sleep(0.01)
+        finally:
+            ss.outbound.close(sid)
+            await server.manager.disconnect(sid, "/")
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        server.eio.sockets.pop("eio-order", None)
+
+    events = [frame.split('"')[1] for frame in socket.sent]
+    assert events == ["SC_MOVEMENT_INFO", "SC_LEAVE_USER"]
+
+
+def test_slow_disconnect_task_is_kept_until_done():
+    sent, disconnected = [], []
+    manager = OutboundManager(
+        max_size=8, high_water=16, slow_timeout=1.0, max_reliable=1
+    )
+
+    async def send(sid, event, data):
+        sent.append(sid)
+
+    async def failing_disconnect(sid):
+        await asyncio.sleep(0)
+        disconnected.append(sid)
+        raise RuntimeError("already gone")
+
+    async def no_op(sid):
+        pass
+
+    manager.configure(
+        send=send, backlog=lambda sid: 100, disconnect=failing_disconnect, resync=no_op
+    )
+
+    async def scenario():
+        manager.open("sid-1")
+        manager.send("sid-1", "SC_CHAT", {"message": "1"})
+        manager.send("sid-1", "SC_CHAT", {"message": "2"})
+        pending = set(manager.disconnect_tasks)
+        await asyncio.gather(*pending)
+        return pending
+
+    pending = asyncio.run(scenario())
+
+    assert len(pending) == 1
+    assert disconnected == ["sid-1"]
+    assert manager.disconnect_tasks == set()
+    assert "sid-1" not in manager.queues
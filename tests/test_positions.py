@@ -0,0 +1,132 @@
+import asyncio
+import random
+
+import numpy as np
+
+from core.movement import VectorizedMovementTicker
+from core.positions import PositionStore, coordinate_limit
+
+
+class Client:
+    def __init__(self, room_id, x, y):
+        self.sid = None
+        self.user_name = "user"
+        self.room_id = room_id
+        self.position_x = x
+        self.position_y = y
+        self.direction = 1
+
+
+def brute_force_pairs(store, client_ids):
+    pairs = set()
+    for client_id in client_ids:
+        slot = store.slots[client_id]
+        for other, other_slot in store.slots.items():
+            if other == client_id or store.room[other_slot] != store.room[slot]:
+                continue
+            if (
+                abs(
+                    store.position_x[other_slot] // store.cell_size
+                    - store.position_x[slot] // store.cell_size
+                )
+                <= 1
+                and abs(
+                    store.position_y[other_slot] // store.cell_size
+                    - store.position_y[slot] // store.cell_size
+                )
+                <= 1
+            ):
+                pairs.add((client_id, other))
+    return pairs
+
+
+def test_neighbour_pairs_match_brute_force():
+    rng = random.Random(3)
+    store = PositionStore(cell_size=100, capacity=4)
+    client_ids = [f"c{number}" for number in range(60)]
+    slots = store.set_many(
+        client_ids,
+        [rng.choice(("r1", "r2")) for _ in client_ids],
+        [rng.randrange(-400, 400) for _ in client_ids],
+        [rng.randrange(-400, 400) for _ in client_ids],
+    )
+    store.update_cells(slots)
+
+    owners, neighbours = store.neighbour_pairs(slots)
+    pairs = {
+        (client_ids[owner], store.client_ids[neighbour])
+        for owner, neighbour in zip(owners.tolist(), neighbours.tolist())
+    }
+    assert len(pairs) == len(owners)
+    assert pairs == brute_force_pairs(store, client_ids)
+
+
+def test_update_cells_reports_crossings_and_removed_slots_are_reused():
+    store = PositionStore(cell_size=100)
+    slot = store.set("a", "r", 10, 10)
+    assert store.update_cells(np.array([slot])).tolist() == [True]
+    store.set("a", "r", 20, 20)
+    assert store.update_cells(np.array([slot])).tolist() == [False]
+
+    store.remove("a")
+    assert store.set("b", "r", 0, 0) == slot
+    assert len(store) == 1
+
+
+def test_coordinate_limit_fits_int32_and_cell_bits():
+    assert coordinate_limit(300) == (1 << 20) * 300 - 1
+    assert coordinate_limit(10_000) == 2**31 - 1
+
+    store = PositionStore(cell_size=300)
+    limit = store.max_coordinate
+    assert store.in_range(limit, -limit)
+    assert not store.in_range(limit + 1, 0)
+    assert not store.in_range(0, 10**12)
+
+    slots = store.set_many(["a", "b"], ["r", "r"], [limit, -limit], [limit, -limit])
+    store.update_cells(slots)
+    owners, _ = store.neighbour_pairs(slots)
+    assert len(owners) == 0
+
+
+def test_vectorized_tick_skips_only_out_of_range_clients():
+    store = PositionStore(cell_size=300)
+    ticker = VectorizedMovementTicker(tick_rate=10, store=store)
+    client_info_store = {
+        "a": Client("r", 10, 10),
+        "b": Client("r", 20, 20),
+        "bad": Client("r", 10**12, 10),
+    }
+    batches = {}
+
+    async def emit(target, packet, event="SC_MOVEMENT_INFO"):
+        pass
+
+    async def emit_batch(recipient, movements):
+        batches[recipient] = [movement["client_id"] for movement in movements]
+
+    for client_id in client_info_store:
+        ticker.submit(client_id, {"client_id": client_id})
+    asyncio.run(ticker.tick(emit, emit_batch, client_info_store))
+
+    assert batches == {"a": ["b"], "b": ["a"]}
+    assert "bad" not in store.slots
+
+
+def test_room_codes_released_and_reused():
+    store = PositionStore(cell_size=100)
+    for number in range(1000):
+        store.set("a", f"room{number}", 10, 10)
+        store.set("b", f"room{number}", 20, 20)
+    assert set(store.room_codes) == {"room999"}
+    assert store.room_codes["room999"] <= 1
+
+    store.remove("a")
+    assert store.room_codes == {"room999": store.room[store.slots["b"]]}
+    store.remove("b")
+    assert store.room_codes == {} and store.room_ids == {} and store.room_slots == {}
+
+    slots = store.set_many(["a", "b", "c"], ["x", "y", "x"], [0, 0, 0], [0, 0, 0])
+    assert len(store.room_codes) == 2
+    assert store.room[slots[0]] == store.room[slots[2]] != store.room[slots[1]]
+    assert max(store.room_codes.values()) <= 1
@@ -0,0 +1,209 @@
+import pytest
+
+import core.protocol as protocol
+from core.protocol import (
+    BinaryMovementProtocol,
+    DeltaMovementEncoder,
+    decode_movements,
+    encode_movements,
+)
+
+
+def movement(client_id, x, y, direction=1):
+    return {
+        "client_id": client_id,
+        "user_name": f"user-{client_id}",
+        "position_x": x,
+        "position_y": y,
+        "direction": direction,
+    }
+
+
+def test_frame_round_trip_including_field_limits():
+    records = [
+        (1, 0, 0, 0),
+        (2, -(2**31), 2**31 - 1, -128),
+        (0xFFFFFFFF, 12345, -678, 127),
+    ]
+    frame = encode_movements(records)
+
+    assert len(frame) == 2 + 13 * len(records)
+    assert decode_movements(frame) == records
+
+
+def test_empty_frame_round_trip():
+    assert decode_movements(encode_movements([])) == []
+
+
+@pytest.mark.parametrize("frame", [b"", b"\x01"])
+def test_truncated_header_rejected(frame):
+    with pytest.raises(ValueError):
+        decode_movements(frame)
+
+
+def test_truncated_record_rejected():
+    frame = encode_movements([(1, 10, 20, 1), (2, 30, 40, 2)])
+    with pytest.raises(ValueError):
+        decode_movements(frame[:-1])
+
+
+def test_count_mismatch_rejected():
+    frame = bytearray(encode_movements([(1, 10, 20, 1)]))
+    frame[0] = 2
+    with pytest.raises(ValueError):
+        decode_movements(bytes(frame))
+    with pytest.raises(ValueError):
+        decode_movements(encode_movements([(1, 10, 20, 1)]) + b"\x00")
+
+
+def test_binary_protocol_introduces_peers_once_per_viewer():
+    binary = BinaryMovementProtocol()
+    packets = [movement("a", 10, 20, 1), movement("b", -5, 7, -1)]
+
+    peers, frames = binary.encode_for("viewer", packets)
+    assert [peer["client_id"] for peer in peers] == ["a", "b"]
+    short_ids = {peer["client_id"]: peer["id"] for peer in peers}
+    assert decode_movements(frames[0]) == [
+        (short_ids["a"], 10, 20, 1),
+        (short_ids["b"], -5, 7, -1),
+    ]
+
+    peers, frames = binary.encode_for("viewer", [movement("a", 11, 21, 2)])
+    assert peers == []
+    assert decode_movements(frames[0]) == [(short_ids["a"], 11, 21, 2)]
+
+    peers, _ = binary.encode_for("other", [movement("a", 11, 21, 2)])
+    assert [peer["id"] for peer in peers] == [short_ids["a"]]
+
+
+def test_binary_protocol_skips_unencodable_values():
+    binary = BinaryMovementProtocol()
+    peers, frames = binary.encode_for(
+        "viewer",
+        [movement("a", 2**31, 0), movement("b", 0, 0, 128), movement("c", 1, 2)],
+    )
+
+    assert [peer["client_id"] for peer in peers] == ["c"]
+    assert len(decode_movements(frames[0])) == 1
+
+
+def test_binary_protocol_reintroduces_reconnected_client():
+    binary = BinaryMovementProtocol()
+    peers, _ = binary.encode_for("viewer", [movement("a", 1, 2)])
+    first_id = peers[0]["id"]
+
+    binary.remove_client("a")
+    peers, _ = binary.encode_for("viewer", [movement("a", 1, 2)])
+
+    assert peers[0]["id"] != first_id
+
+
+def test_binary_protocol_splits_large_batches(monkeypatch):
+    monkeypatch.setattr(protocol, "MAX_FRAME_RECORDS", 2)
+    binary = BinaryMovementProtocol()
+    _, frames = binary.encode_for("viewer", [movement(str(i), i, i) for i in range(5)])
+
+    assert [len(decode_movements(frame)) for frame in frames] == [2, 2, 1]
+
+
+def test_delta_encoder_keyframe_then_deltas():
+    encoder = DeltaMovementEncoder(quantum=4, keyframe_interval=60.0)
+
+    keyframes, deltas = encoder.encode_for("viewer", [movement("a", 101, 52, 1)])
+    assert deltas == []
+    assert (keyframes[0]["position_x"], keyframes[0]["position_y"]) == (100, 52)
+
+    keyframes, deltas = encoder.encode_for("viewer", [movement("a", 109, 52, 2)])
+    assert keyframes == []
+    assert deltas == [["a", 8, 0, 2]]
+
+    # 양자화 단위보다 작은 움직임은 보내지 않음
+    keyframes, deltas = encoder.encode_for("viewer", [movement("a", 108, 53, 2)])
+    assert (keyframes, deltas) == ([], [])
+    assert encoder.stats() == {
+        "viewers": 1,
+        "keyframes": 1,
+        "deltas": 1,
+        "suppressed": 1,
+    }
+
+
+def test_delta_encoder_deltas_reconstruct_position():
+    encoder = DeltaMovementEncoder(quantum=2, keyframe_interval=60.0)
+    path = [(0, 0), (10, -4), (13, -9), (40, 40), (-20, 6)]
+
+    keyframes, _ = encoder.encode_for("viewer", [movement("a", *path[0])])
+    x, y = keyframes[0]["position_x"], keyframes[0]["position_y"]
+    for target_x, target_y in path[1:]:
+        _, deltas = encoder.encode_for("viewer", [movement("a", target_x, target_y)])
+        x += deltas[0][1]
+        y += deltas[0][2]
+        assert abs(x - target_x) <= 1 and abs(y - target_y) <= 1
+
+
+def test_delta_encoder_sends_keyframe_after_interval(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(protocol.time, "monotonic", lambda: now[0])
+    encoder = DeltaMovementEncoder(quantum=1, keyframe_interval=5.0)
+
+    encoder.encode_for("viewer", [movement("a", 0, 0)])
+    now[0] += 5.0
+    keyframes, deltas = encoder.encode_for("viewer", [movement("a", 3, 4)])
+
+    assert deltas == []
+    assert (keyframes[0]["position_x"], keyframes[0]["position_y"]) == (3, 4)
+
+
+def test_delta_encoder_forget_and_reset_force_keyframes():
+    encoder = DeltaMovementEncoder(quantum=1, keyframe_interval=60.0)
+    encoder.observe("viewer", movement("a", 0, 0))
+    encoder.observe("viewer", movement("b", 0, 0))
+
+    _, deltas = encoder.encode_for("viewer", [movement("a", 1, 0)])
+    assert deltas == [["a", 1, 0, 1]]
+
+    encoder.forget("viewer", "a")
+    keyframes, _ = encoder.encode_for("viewer", [movement("a", 2, 0)])
+    assert [packet["client_id"] for packet in keyframes] == ["a"]
+
+    encoder.reset("viewer")
+    keyframes, _ = encoder.encode_for("viewer", [movement("b", 1, 1)])
+    assert [packet["client_id"] for packet in keyframes] == ["b"]
+
+
+def test_delta_encoder_sends_keyframe_for_stationary_target(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(protocol.time, "monotonic", lambda: now[0])
+    encoder = DeltaMovementEncoder(quantum=1, keyframe_interval=5.0)
+
+    encoder.encode_for("viewer", [movement("a", 7, 8)])
+    now[0] += 1.0
+    assert encoder.encode_for("viewer", [movement("a", 7, 8)]) == ([], [])
+
+    now[0] += 4.0
+    keyframes, deltas = encoder.encode_for("viewer", [movement("a", 7, 8)])
+    assert deltas == []
+    assert (keyframes[0]["position_x"], keyframes[0]["position_y"]) == (7, 8)
+
+    now[0] += 1.0
+    assert encoder.encode_for("viewer", [movement("a", 7, 8)]) == ([], [])
+
+
+def test_binary_protocol_forgets_removed_client_in_every_viewer():
+    binary = BinaryMovementProtocol()
+    peers, _ = binary.encode_for("v1", [movement("a", 1, 2), movement("b", 3, 4)])
+    binary.encode_for("v2", [movement("a", 1, 2)])
+    binary.encode_for("a", [movement("b", 3, 4)])
+    short_id_a = peers[0]["id"]
+
+    binary.remove_client("a")
+
+    assert short_id_a not in binary.known_peers["v1"]
+    assert short_id_a not in binary.known_peers["v2"]
+    assert "a" not in binary.known_peers
+    assert binary.introduced == {binary.short_ids["b"]: {"v1"}}
+
+    # short id 가 한 바퀴 돌아 재사용되어도 다시 소개됨
+    binary.next_short_id = short_id_a
+    peers, _ = binary.encode_for("v1", [movement("c", 5, 6)])
+    assert [(peer["id"], peer["client_id"]) for peer in peers] == [(short_id_a, "c")]
@@ -0,0 +1,111 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from core.redis import (
+    MEETING_ROOM_REGISTRY_KEY,
+    SID_REGISTRY_KEY,
+    add_to_meeting_room,
+    delete_meeting_room,
+    delete_sid_mapping,
+    get_all_meeting_rooms,
+    get_all_sids,
+    get_sid_by_client_id,
+    rebuild_registries,
+    scan_meeting_rooms,
+    set_sid_mapping,
+)
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+def test_meeting_rooms_listed_from_registry(redis_client):
+    async def scenario():
+        await add_to_meeting_room("m1", "standup", "c1", redis_client)
+        await add_to_meeting_room("m1", "", "c2", redis_client)
+        await add_to_meeting_room("m2", "retro", "c3", redis_client)
+        return await get_all_meeting_rooms(redis_client)
+
+    rooms = asyncio.run(scenario())
+
+    rooms = {room["room_id"]: room for room in rooms}
+    assert rooms["m1"]["title"] == "standup"
+    assert sorted(rooms["m1"]["clients"]) == ["c1", "c2"]
+    assert rooms["m2"] == {"room_id": "m2", "title": "retro", "clients": ["c3"]}
+
+
+def test_deleted_and_expired_meeting_rooms_leave_registry(redis_client):
+    async def scenario():
+        for room_id in ("m1", "m2", "m3"):
+            await add_to_meeting_room(room_id, room_id, "c1", redis_client)
+        await delete_meeting_room("m1", redis_client)
+        # 목록에는 남았지만 해시가 사라진 미팅룸
+        await redis_client.delete("meeting_room:m2")
+        rooms = await get_all_meeting_rooms(redis_client)
+        return rooms, await redis_client.smembers(MEETING_ROOM_REGISTRY_KEY)
+
+    rooms, registry = asyncio.run(scenario())
+
+    assert [room["room_id"] for room in rooms] == ["m3"]
+    assert registry == {"m3"}
+
+
+def test_scan_meeting_rooms_pages_through_registry(redis_client):
+    async def scenario():
+        for number in range(25):
+            await add_to_meeting_room(f"m{number}", "", "c1", redis_client)
+        seen = []
+        cursor = 0
+        while True:
+            cursor, rooms = await scan_meeting_rooms(redis_client, cursor, count=10)
+            seen.extend(room["room_id"] for room in rooms)
+            if cursor == 0:
+                return seen
+
+    seen = asyncio.run(scenario())
+
+    assert sorted(seen) == sorted(f"m{number}" for number in range(25))
+
+
+def test_sid_mapping_kept_in_registry(redis_client):
+    async def scenario():
+        await set_sid_mapping("c1", "sid-1", redis_client)
+        await set_sid_mapping("c2", "sid-2", redis_client)
+        listed = await get_all_sids(redis_client)
+        removed = await delete_sid_mapping("sid-1", redis_client)
+        missing = await delete_sid_mapping("sid-unknown", redis_client)
+        return (
+            listed,
+            removed,
+            missing,
+            await get_all_sids(redis_client),
+            await get_sid_by_client_id("c1", redis_client),
+            await get_sid_by_client_id("c2", redis_client),
+        )
+
+    listed, removed, missing, remaining, c1_sid, c2_sid = asyncio.run(scenario())
+
+    assert sorted(listed) == ["sid-1", "sid-2"]
+    assert (removed, missing) == ("c1", None)
+    assert remaining == ["sid-2"]
+    assert (c1_sid, c2_sid) == (None, "sid-2")
+
+
+def test_rebuild_registers_keys_created_before_registry(redis_client):
+    async def scenario():
+        await redis_client.hset("meeting_room:old", mapping={"title": "t", "c1": ""})
+        await redis_client.set("sid:old-sid", "c1")
+        await rebuild_registries(redis_client)
+        return (
+            await redis_client.smembers(MEETING_ROOM_REGISTRY_KEY),
+            await redis_client.smembers(SID_REGISTRY_KEY),
+        )
+
+    meeting_rooms, sids = asyncio.run(scenario())
+
+    assert meeting_rooms == {"old"}
+    assert sids == {"old-sid"}
@@ -0,0 +1,240 @@
+import asyncio
+import time
+
+import pytest
+from redis.exceptions import ConnectionError, ResponseError, TimeoutError
+
+import core.redis as redis_module
+import core.resilience as resilience
+from core.databases import redis_pool
+from core.health import RedisHealthMonitor
+from core.redis import with_redis_retry
+from core.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    backoff_delay,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=5.0)
+    monkeypatch.setattr(redis_module, "redis_breaker", breaker)
+    monkeypatch.setattr(redis_module.settings, "redis_retry_attempts", 3)
+    monkeypatch.setattr(redis_module.settings, "redis_retry_base_delay", 0.001)
+    monkeypatch.setattr(redis_module.settings, "redis_retry_max_delay", 0.002)
+    monkeypatch.setattr(redis_module.settings, "redis_call_deadline", 1.0)
+    return breaker
+
+
+# 호출 횟수를 기록하고 정해진 결과(예외 또는 값)를 차례로 돌려주는 가짜 Redis 작업
+def fake_operation(*outcomes, retryable=True):
+    calls = []
+
+    async def operation():
+        outcome = outcomes[min(len(calls), len(outcomes) - 1)]
+        calls.append(outcome)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        if callable(outcome):
+            return await outcome()
+        return outcome
+
+    return with_redis_retry(operation, retryable=retryable), calls
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=5.0)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["opened"] == 1
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_half_open_allows_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5.0)
+    breaker.record_failure()
+
+    clock.now += 5.0
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=5.0)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now += 5.0
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["opened"] == 2
+
+
+def test_abandoned_probe_is_replaced_after_reset_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5.0)
+    breaker.record_failure()
+    clock.now += 5.0
+    assert breaker.allow()
+
+    clock.now += 5.0
+    assert breaker.allow()
+
+
+@pytest.mark.parametrize("attempt", [1, 2, 3, 4, 10])
+def test_backoff_delay_within_bounds(attempt):
+    bound = min(0.5, 0.05 * 2 ** (attempt - 1))
+    delays = [backoff_delay(attempt, 0.05, 0.5) for _ in range(200)]
+    assert all(0 <= delay <= bound for delay in delays)
+    assert max(delays) > bound / 2
+
+
+def test_retry_recovers_after_connection_errors(breaker):
+    operation, calls = fake_operation(
+        ConnectionError("down"), ConnectionError("down"), "ok"
+    )
+
+    assert asyncio.run(operation()) == "ok"
+    assert len(calls) == 3
+    assert breaker.state == CLOSED and breaker.failures == 0
+
+
+def test_retry_gives_up_after_max_attempts(breaker):
+    operation, calls = fake_operation(ConnectionError("down"))
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(operation())
+    assert len(calls) == 3
+
+
+def test_non_retryable_operation_tried_once(breaker):
+    operation, calls = fake_operation(ConnectionError("down"), "ok", retryable=False)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(operation())
+    assert len(calls) == 1
+
+
+def test_open_circuit_fails_fast_without_calling_redis(breaker):
+    operation, calls = fake_operation(ConnectionError("down"))
+    with pytest.raises(ConnectionError):
+        asyncio.run(operation())
+    assert breaker.state == OPEN
+
+    operation, calls = fake_operation("ok")
+    started = time.perf_counter()
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(operation())
+    assert calls == []
+    assert time.perf_counter() - started < 0.1
+
+
+def test_deadline_becomes_timeout_error(breaker, monkeypatch):
+    monkeypatch.setattr(redis_module.settings, "redis_call_deadline", 0.05)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    operation, calls = fake_operation(hang)
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        asyncio.run(operation())
+
+    assert time.perf_counter() - started < 1.0
+    assert len(calls) == 1
+    assert breaker.failures == 1
+
+
+def test_response_error_not_counted_as_failure(breaker):
+    breaker.record_failure()
+    operation, calls = fake_operation(ResponseError("WRONGTYPE"))
+
+    with pytest.raises(ResponseError):
+        asyncio.run(operation())
+
+    assert len(calls) == 1
+    assert breaker.state == CLOSED and breaker.failures == 0
+
+
+# ping 결과를 up 값으로 정하는 가짜 Redis 클라이언트
+class FakePingClient:
+    def __init__(self):
+        self.up = True
+
+    async def ping(self):
+        if not self.up:
+            raise ConnectionError("redis down")
+        return True
+
+
+def test_health_monitor_needs_consecutive_failures_to_become_unready():
+    client = FakePingClient()
+    monitor = RedisHealthMonitor(client, redis_pool, interval=1.0, failure_threshold=2)
+    assert monitor.ready is False
+
+    assert asyncio.run(monitor.check()) is True
+    assert monitor.last_latency is not None
+
+    client.up = False
+    assert asyncio.run(monitor.check()) is True
+    assert monitor.consecutive_failures == 1
+    assert monitor.last_error == "redis down"
+    assert asyncio.run(monitor.check()) is False
+
+    client.up = True
+    assert asyncio.run(monitor.check()) is True
+    assert monitor.consecutive_failures == 0
+    assert monitor.last_error is None
+
+
+def test_ready_endpoint_follows_health_monitor(monkeypatch):
+    import main
+
+    client = FakePingClient()
+    monitor = RedisHealthMonitor(client, redis_pool, interval=1.0, failure_threshold=1)
+    monkeypatch.setattr(main, "redis_health", monitor)
+
+    assert asyncio.run(main.ready()).status_code == 503
+
+    asyncio.run(monitor.check())
+    response = asyncio.run(main.ready())
+    assert response.status_code == 200
+    assert b'"ready":true' in response.body
+
+    client.up = False
+    asyncio.run(monitor.check())
+    response = asyncio.run(main.ready())
+    assert response.status_code == 503
+    assert b'"last_error":"redis down"' in response.body
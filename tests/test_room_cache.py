@@ -0,0 +1,61 @@
+import asyncio
+
+import fakeredis
+
+import core.room_cache as room_cache_module
+from core.room_cache import RoomMembershipCache
+
+
+def test_writes_to_uncached_rooms_do_not_grow_generations():
+    cache = RoomMembershipCache(max_rooms=2)
+    for i in range(1000):
+        cache.add(f"room-{i}", "c1")
+        cache.discard(f"room-{i}", "c1")
+        cache.invalidate(f"room-{i}")
+
+    assert cache.generations == {}
+    assert cache.loading == {}
+
+
+def test_generations_bounded_by_cached_rooms():
+    cache = RoomMembershipCache(max_rooms=2)
+    for i in range(10):
+        room_id = f"room-{i}"
+        generation = cache.begin_load(room_id)
+        cache.put(room_id, {"c1"}, generation)
+        cache.end_load(room_id)
+        cache.add(room_id, "c2")
+
+    assert list(cache.rooms) == ["room-8", "room-9"]
+    assert set(cache.generations) <= {"room-8", "room-9"}
+
+
+def test_write_during_load_discards_fetched_members():
+    cache = RoomMembershipCache(max_rooms=4)
+    generation = cache.begin_load("room")
+    cache.add("room", "c2")
+    cache.put("room", {"c1"}, generation)
+    cache.end_load("room")
+
+    assert cache.get("room") is None
+    assert cache.generations == {}
+    assert cache.loading == {}
+
+
+def test_get_room_clients_caches_and_releases_load_state(monkeypatch):
+    cache = RoomMembershipCache(max_rooms=4)
+    monkeypatch.setattr(room_cache_module, "room_cache", cache)
+
+    async def scenario():
+        redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        await room_cache_module.add_to_room("room", "c1", redis_client)
+        members = await room_cache_module.get_room_clients("room", redis_client)
+        await room_cache_module.add_to_room("room", "c2", redis_client)
+        return members, await room_cache_module.get_room_clients("room", redis_client)
+
+    first, second = asyncio.run(scenario())
+
+    assert first == {"c1"}
+    assert second == {"c1", "c2"}
+    assert cache.hits == 1
+    assert cache.loading == {}
@@ -0,0 +1,105 @@
+import random
+
+from core.movement import SectorManager, SectorRegistry
+
+
+def brute_force_nearby(positions, sector_size, x, y):
+    sector_x, sector_y = x // sector_size, y // sector_size
+    return {
+        client_id
+        for client_id, (other_x, other_y) in positions.items()
+        if abs(other_x // sector_size - sector_x) <= 1
+        and abs(other_y // sector_size - sector_y) <= 1
+    }
+
+
+def test_update_reports_only_sector_crossings():
+    manager = SectorManager(sector_size=100)
+    assert manager.update_client_sector("a", 10, 10) is True
+    assert manager.update_client_sector("a", 90, 50) is False
+    assert manager.update_client_sector("a", 110, 50) is True
+    assert manager.client_sectors["a"] == (1, 0)
+    assert manager.sectors == {(1, 0): {"a"}}
+
+
+def test_nearby_clients_cover_3x3_sectors():
+    manager = SectorManager(sector_size=100)
+    manager.update_client_sector("center", 150, 150)
+    manager.update_client_sector("corner", 250, 250)
+    manager.update_client_sector("far", 350, 150)
+
+    assert set(manager.get_nearby_clients(150, 150)) == {"center", "corner"}
+    assert set(manager.get_client_nearby_clients("center")) == {"center", "corner"}
+    assert manager.is_nearby("center", "corner")
+    assert not manager.is_nearby("center", "far")
+
+
+def test_nearby_cache_is_invalidated_on_move_and_remove():
+    manager = SectorManager(sector_size=100)
+    manager.update_client_sector("a", 50, 50)
+    manager.update_client_sector("b", 150, 50)
+    assert set(manager.get_nearby_clients(50, 50)) == {"a", "b"}
+
+    manager.update_client_sector("b", 450, 50)
+    assert set(manager.get_nearby_clients(50, 50)) == {"a"}
+
+    manager.update_client_sector("c", 60, 60)
+    assert set(manager.get_client_nearby_clients("a")) == {"a", "c"}
+
+    manager.remove_client_from_sector("c")
+    assert set(manager.get_client_nearby_clients("a")) == {"a"}
+    assert manager.get_client_nearby_clients("c") == ()
+
+
+def test_remove_deletes_empty_sectors():
+    manager = SectorManager(sector_size=100)
+    manager.update_client_sector("a", 50, 50)
+    manager.remove_client_from_sector("a")
+    manager.remove_client_from_sector("a")
+    assert manager.sectors == {}
+    assert manager.client_sectors == {}
+
+
+def test_negative_coordinates_use_floor_division():
+    manager = SectorManager(sector_size=100)
+    manager.update_client_sector("a", -1, -1)
+    manager.update_client_sector("b", 0, 0)
+    assert manager.client_sectors["a"] == (-1, -1)
+    assert set(manager.get_nearby_clients(-1, -1)) == {"a", "b"}
+
+
+def test_matches_brute_force_after_random_moves():
+    rng = random.Random(1)
+    manager = SectorManager(sector_size=100)
+    positions = {}
+    for _ in range(2000):
+        client_id = f"c{rng.randrange(50)}"
+        if rng.random() < 0.1:
+            manager.remove_client_from_sector(client_id)
+            positions.pop(client_id, None)
+            continue
+        x, y = rng.randrange(-500, 500), rng.randrange(-500, 500)
+        manager.update_client_sector(client_id, x, y)
+        positions[client_id] = (x, y)
+
+        query_x, query_y = rng.randrange(-500, 500), rng.randrange(-500, 500)
+        nearby = manager.get_nearby_clients(query_x, query_y)
+        assert len(nearby) == len(set(nearby))
+        assert set(nearby) == brute_force_nearby(positions, 100, query_x, query_y)
+
+
+def test_registry_isolates_rooms_and_releases_empty_rooms():
+    registry = SectorRegistry(sector_size=100)
+    registry.update_client_sector("a", "room1", 50, 50)
+    registry.update_client_sector("b", "room2", 50, 50)
+    assert registry.get_nearby_clients("room1", 50, 50) == ("a",)
+
+    # 다른 방으로 옮기면 이전 방에서 제거됨
+    assert registry.update_client_sector("a", "room2", 50, 50) is True
+    assert "room1" not in registry.rooms
+    assert set(registry.get_nearby_clients("room2", 50, 50)) == {"a", "b"}
+
+    registry.remove_client("a")
+    registry.remove_client("b")
+    assert registry.rooms == {}
+    assert registry.get_nearby_clients("room2", 50, 50) == ()
@@ -0,0 +1,80 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+import core.whiteboard as whiteboard
+from core.whiteboard import append_stroke, get_whiteboard_snapshot, reset_whiteboard
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    monkeypatch.setattr(whiteboard.settings, "whiteboard_compact_threshold", 3)
+    monkeypatch.setattr(whiteboard.settings, "whiteboard_max_stroke_bytes", 400)
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+def stroke(number):
+    return {"points": [number, number + 1]}
+
+
+def test_strokes_compact_into_snapshot_in_order(redis_client):
+    async def scenario():
+        seqs = [
+            await append_stroke("r1", "c1", stroke(i), redis_client) for i in range(5)
+        ]
+        log_length = await redis_client.llen("whiteboard_strokes:r1")
+        return seqs, log_length, await get_whiteboard_snapshot("r1", redis_client)
+
+    seqs, log_length, snapshot = asyncio.run(scenario())
+
+    assert seqs == [1, 2, 3, 4, 5]
+    assert log_length == 2
+    assert snapshot["seq"] == 5
+    assert snapshot["picture"] is None
+    assert snapshot["strokes"] == [
+        {"client_id": "c1", "stroke": stroke(i)} for i in range(5)
+    ]
+
+
+def test_full_board_rejects_strokes_until_reset(redis_client):
+    async def scenario():
+        accepted = []
+        while True:
+            seq = await append_stroke("r1", "c1", stroke(len(accepted)), redis_client)
+            if seq is None:
+                break
+            accepted.append(seq)
+        size = int(await redis_client.hget("whiteboard_snapshot:r1", "size"))
+        snapshot = await get_whiteboard_snapshot("r1", redis_client)
+
+        reset_seq = await reset_whiteboard("r1", {"image": "full"}, redis_client)
+        after_reset = await append_stroke("r1", "c1", stroke(0), redis_client)
+        return accepted, size, snapshot, reset_seq, after_reset
+
+    accepted, size, snapshot, reset_seq, after_reset = asyncio.run(scenario())
+
+    assert 0 < len(accepted) < 100
+    assert size <= 400
+    assert snapshot["seq"] == len(accepted)
+    assert len(snapshot["strokes"]) == len(accepted)
+    assert reset_seq == len(accepted) + 1
+    assert after_reset == reset_seq + 1
+
+
+def test_reset_replaces_strokes_with_picture(redis_client):
+    async def scenario():
+        for i in range(4):
+            await append_stroke("r1", "c1", stroke(i), redis_client)
+        await reset_whiteboard("r1", {"image": "full"}, redis_client)
+        return await get_whiteboard_snapshot("r1", redis_client)
+
+    snapshot = asyncio.run(scenario())
+
+    assert snapshot["picture"] == {"image": "full"}
+    assert snapshot["strokes"] == []
+    assert snapshot["seq"] == 5
+
+
+def test_missing_board_has_no_snapshot(redis_client):
+    assert asyncio.run(get_whiteboard_snapshot("none", redis_client)) is None